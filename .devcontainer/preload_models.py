@@ -4,19 +4,34 @@ PaddleOCR model pre-download script for Docker build.
 
 This script initializes PaddleOCR to download all required models
 during Docker image build, so they are available at runtime.
+
+Models are stored in OCR_MODELS_DIR (default: models/paddlex), the same
+directory the API loads them from without any network access.
+
+Usage:
+    python preload_models.py [lang ...]   (default: japan)
 """
 
+import os
+import sys
+
+models_dir = os.path.abspath(os.environ.get("OCR_MODELS_DIR") or "models/paddlex")
+os.environ["PADDLE_PDX_CACHE_HOME"] = models_dir
+
 from paddleocr import PaddleOCR
 
+langs = sys.argv[1:] or ["japan"]
+
 print("Starting PaddleOCR model download...")
 print("This may take a few minutes on first run...")
 
 # Initialize PaddleOCR with the same settings used in production
 # This will download detection, recognition, and angle classification models
-ocr = PaddleOCR(
-    lang="japan",
-    use_textline_orientation=True,
-)
+for lang in langs:
+    ocr = PaddleOCR(
+        lang=lang,
+        use_textline_orientation=True,
+    )
+    print(f"✓ PaddleOCR models for {lang} successfully downloaded")
 
-print("✓ PaddleOCR models successfully downloaded and cached")
-print("Models are stored in: ~/.paddlex/official_models/")
+print(f"Models are stored in: {models_dir}/official_models/")
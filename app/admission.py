@@ -0,0 +1,251 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+# Priority classes, highest first. Interactive single-image calls are admitted
+# ahead of bulk batch and document jobs whenever both are waiting.
+PRIORITIES = ("interactive", "batch")
+
+
+class AdmissionError(Exception):
+    """The request was not admitted; retry after ``retry_after`` seconds."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionError):
+    """The inference queue is full (the server is overloaded)."""
+
+
+class PriorityQueueFullError(AdmissionError):
+    """The queue share of this priority class is used up."""
+
+    status_code = 429
+
+
+class DeadlineExceededError(Exception):
+    """The request's deadline passed before its work could start."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    sequence: int
+    priority: str = field(compare=False)
+    cost: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class AdmissionController:
+    """Bounded, prioritized admission in front of the inference workers.
+
+    At most ``capacity`` units of work (images) are in flight. Further
+    requests wait in a priority queue of at most ``max_queue`` entries and
+    are rejected immediately once it is full, so overload turns into fast
+    errors instead of unbounded memory and latency. Waiters whose deadline
+    passes are dropped without running.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_queue: int = 256,
+        queue_limits: dict[str, int] | None = None,
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            capacity: Maximum units of work (images) in flight
+            max_queue: Maximum number of waiting requests
+            queue_limits: Maximum waiting requests per priority class
+                (classes not listed may use the whole queue)
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.queue_limits = queue_limits or {}
+        self._in_use = 0
+        self._waiters: list[_Waiter] = []
+        self._queued: Counter[str] = Counter()
+        self._sequence = itertools.count()
+        # Moving average of how long one admission holds its slot
+        self._hold_seconds = 1.0
+
+        # Statistics
+        self._admitted: Counter[str] = Counter()
+        self._rejected: Counter[str] = Counter()
+        self._expired: Counter[str] = Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = "interactive",
+        cost: int = 1,
+        deadline: float | None = None,
+    ) -> AsyncIterator[None]:
+        """
+        Hold capacity for one unit of inference work.
+
+        Args:
+            priority: Priority class (see PRIORITIES)
+            cost: Number of images the work processes
+            deadline: time.monotonic() value after which the work is dropped
+
+        Raises:
+            QueueFullError: The queue is full
+            PriorityQueueFullError: The queue share of ``priority`` is used up
+            DeadlineExceededError: The deadline passed while waiting
+        """
+        cost = self._clamp(cost)
+        await self.acquire(priority, cost, deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(cost, time.monotonic() - start)
+
+    def check(self, priority: str = "interactive") -> None:
+        """Raise the error acquire() would raise if this request had to wait."""
+        limit = self.queue_limits.get(priority)
+        if limit is not None and self._queued[priority] >= limit:
+            self._rejected[priority] += 1
+            raise PriorityQueueFullError(
+                f"Too many queued {priority} requests", self.retry_after()
+            )
+        if len(self._waiters) >= self.max_queue:
+            self._rejected[priority] += 1
+            raise QueueFullError("Inference queue is full", self.retry_after())
+
+    async def acquire(
+        self,
+        priority: str = "interactive",
+        cost: int = 1,
+        deadline: float | None = None,
+    ) -> None:
+        """
+        Wait until ``cost`` units of capacity are granted.
+
+        Every acquire() must be paired with release(). Prefer slot().
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        cost = self._clamp(cost)
+        rank = PRIORITIES.index(priority)
+
+        if deadline is not None and deadline <= time.monotonic():
+            self._expired[priority] += 1
+            raise DeadlineExceededError("Request deadline exceeded before admission")
+
+        # Admit at once unless someone of the same or higher priority is waiting
+        if self._in_use + cost <= self.capacity and not (
+            self._waiters and self._waiters[0].rank <= rank
+        ):
+            self._in_use += cost
+            self._record(priority, 0.0)
+            return
+
+        self.check(priority)
+        waiter = _Waiter(
+            rank=rank,
+            sequence=next(self._sequence),
+            priority=priority,
+            cost=cost,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._queued[priority] += 1
+
+        timeout = None if deadline is None else deadline - time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                await waiter.future
+        except BaseException as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller gave up: hand the capacity back
+                self.release(cost)
+            else:
+                self._remove(waiter)
+            if isinstance(e, TimeoutError):
+                self._expired[priority] += 1
+                raise DeadlineExceededError(
+                    "Request deadline exceeded while queued"
+                ) from None
+            raise
+
+    def release(self, cost: int = 1, held_seconds: float | None = None) -> None:
+        """Return capacity taken by acquire() and admit waiters that now fit."""
+        self._in_use -= self._clamp(cost)
+        if held_seconds is not None:
+            self._hold_seconds += 0.2 * (held_seconds - self._hold_seconds)
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Estimated seconds until the queued work has drained."""
+        queued = sum(waiter.cost for waiter in self._waiters)
+        return max(
+            1,
+            math.ceil(self._hold_seconds * (queued + self._in_use) / self.capacity),
+        )
+
+    def _dispatch(self) -> None:
+        # Strict priority order: a large head request is never starved by
+        # smaller ones behind it
+        while self._waiters and self._in_use + self._waiters[0].cost <= self.capacity:
+            waiter = heapq.heappop(self._waiters)
+            self._queued[waiter.priority] -= 1
+            if waiter.future.done():
+                # Cancelled caller whose cleanup has not run yet
+                continue
+            self._in_use += waiter.cost
+            waiter.future.set_result(None)
+            self._record(waiter.priority, time.monotonic() - waiter.enqueued_at)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter not in self._waiters:
+            return
+        self._waiters.remove(waiter)
+        heapq.heapify(self._waiters)
+        self._queued[waiter.priority] -= 1
+        # The removed waiter may have been blocking smaller ones behind it
+        self._dispatch()
+
+    def _clamp(self, cost: int) -> int:
+        return min(max(1, cost), self.capacity)
+
+    def _record(self, priority: str, wait: float) -> None:
+        self._admitted[priority] += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> dict:
+        """Return capacity, queue depth and admission counters per priority."""
+        admitted = sum(self._admitted.values())
+        return {
+            "capacity": self.capacity,
+            "in_flight": self._in_use,
+            "max_queue": self.max_queue,
+            "queue_depth": len(self._waiters),
+            "queue_depth_by_priority": {p: self._queued[p] for p in PRIORITIES},
+            "admitted": {p: self._admitted[p] for p in PRIORITIES},
+            "rejected": {p: self._rejected[p] for p in PRIORITIES},
+            "expired": {p: self._expired[p] for p in PRIORITIES},
+            "avg_wait_ms": self._wait_total / admitted * 1000 if admitted else 0.0,
+            "max_wait_observed_ms": self._wait_max * 1000,
+            "retry_after_seconds": self.retry_after(),
+        }
@@ -0,0 +1,104 @@
+import io
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from pathlib import PurePosixPath
+
+ARCHIVE_CONTENT_TYPES = [
+    "application/zip",
+    "application/x-zip-compressed",
+    "application/x-tar",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-gtar",
+]
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp")
+
+
+class ArchiveError(ValueError):
+    """Raised when an uploaded archive cannot be read."""
+
+
+class TooManyImagesError(ArchiveError):
+    """Raised when an archive holds more images than allowed."""
+
+
+def is_archive(filename: str | None, content_type: str | None) -> bool:
+    """Check whether an upload is a zip or tar archive."""
+    if content_type in ARCHIVE_CONTENT_TYPES:
+        return True
+    return bool(filename) and filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_archive_images(
+    data: bytes, max_files: int, max_member_bytes: int = 0
+) -> Iterator[tuple[str, bytes | ArchiveError]]:
+    """
+    Yield image members of a zip or tar archive.
+
+    Non-image members and directories are skipped. Members are checked
+    against max_member_bytes by their uncompressed size before they are
+    read, so a small archive cannot expand into unbounded memory.
+
+    Args:
+        data: Archive bytes
+        max_files: Maximum number of images to extract
+        max_member_bytes: Maximum uncompressed size of one image (0 is unlimited)
+
+    Yields:
+        (member name, image bytes) tuples; oversized members carry an
+        ArchiveError instead of their bytes
+    """
+    buffer = io.BytesIO(data)
+    if zipfile.is_zipfile(buffer):
+        members = _iter_zip(buffer)
+    else:
+        buffer.seek(0)
+        members = _iter_tar(buffer)
+
+    for count, (name, size, read) in enumerate(members):
+        if count >= max_files:
+            raise TooManyImagesError(f"Archive contains more than {max_files} images")
+        if max_member_bytes and size > max_member_bytes:
+            yield (
+                name,
+                ArchiveError(
+                    f"File too large: {size} bytes uncompressed "
+                    f"(maximum is {max_member_bytes} bytes)"
+                ),
+            )
+        else:
+            yield name, read()
+
+
+def _is_image_name(name: str) -> bool:
+    path = PurePosixPath(name)
+    return not path.name.startswith(".") and path.suffix.lower() in IMAGE_EXTENSIONS
+
+
+def _iter_zip(buffer: io.BytesIO):
+    with zipfile.ZipFile(buffer) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and _is_image_name(info.filename):
+                yield (
+                    info.filename,
+                    info.file_size,
+                    lambda info=info: archive.read(info),
+                )
+
+
+def _iter_tar(buffer: io.BytesIO):
+    try:
+        with tarfile.open(fileobj=buffer, mode="r:*") as archive:
+            for member in archive:
+                if member.isfile() and _is_image_name(member.name):
+                    yield (
+                        member.name,
+                        member.size,
+                        lambda member=member: archive.extractfile(member).read(),
+                    )
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Unsupported archive: {e!s}") from e
@@ -0,0 +1,206 @@
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.admission import DeadlineExceededError
+
+
+@dataclass
+class _PendingRequest:
+    image_bytes: bytes
+    future: asyncio.Future
+    deadline: float | None = None
+    options: Any = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchScheduler:
+    """Micro-batching scheduler between the API handlers and OCRService.
+
+    Concurrent submissions are gathered into one ``process_images`` call
+    once ``max_batch_size`` images are queued or the oldest one has waited
+    ``max_wait_ms``. Each caller receives only its own result. Images
+    submitted with different options are gathered together but sent in one
+    call per distinct options.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 1,
+        method_kwargs: dict | None = None,
+    ):
+        """
+        Initialize batch scheduler.
+
+        Args:
+            service: Object providing ``run("process_images", images)``
+                (normally OCRService)
+            max_batch_size: Maximum number of images per predict() call
+            max_wait_ms: Maximum time the first queued image waits for others
+            max_concurrent_batches: Number of batches allowed in flight
+            method_kwargs: Extra keyword arguments for ``process_images``
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.method_kwargs = method_kwargs or {}
+        self._queue: asyncio.Queue[_PendingRequest] = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, max_concurrent_batches))
+        self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+        # Statistics
+        self._batch_sizes: Counter[int] = Counter()
+        self._requests = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._dropped = 0
+
+    def start(self) -> None:
+        """Start the dispatch loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self) -> None:
+        """Stop dispatching and wait for in-flight batches."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    async def submit(
+        self, image_bytes: bytes, deadline: float | None = None, options: Any = None
+    ) -> list:
+        """
+        Queue an image for batched OCR and wait for its result.
+
+        Args:
+            image_bytes: Binary image data
+            deadline: time.monotonic() value after which the image is dropped
+                instead of being sent to the model
+            options: Hashable value passed as ``options`` to
+                ``process_images`` (None passes nothing)
+
+        Returns:
+            This image's entry of the ``process_images`` output
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(image_bytes, future, deadline, options))
+        return await future
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _collect_batch(self) -> list[_PendingRequest]:
+        batch = [await self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except TimeoutError:
+                break
+
+        return batch
+
+    async def _run_batch(self, batch: list[_PendingRequest]) -> None:
+        try:
+            groups: dict[Any, list[_PendingRequest]] = {}
+            for request in self._drop_abandoned(batch):
+                groups.setdefault(request.options, []).append(request)
+            for options, group in groups.items():
+                await self._run_group(group, options)
+        finally:
+            self._slots.release()
+
+    async def _run_group(self, batch: list[_PendingRequest], options: Any) -> None:
+        dispatched_at = time.perf_counter()
+        self._record(batch, dispatched_at)
+
+        kwargs = self.method_kwargs
+        if options is not None:
+            kwargs = {**kwargs, "options": options}
+        try:
+            outputs = await self.service.run(
+                "process_images", [request.image_bytes for request in batch], **kwargs
+            )
+        except Exception as e:
+            outputs = [e] * len(batch)
+
+        for request, output in zip(batch, outputs):
+            if request.future.done():
+                continue
+            if isinstance(output, Exception):
+                request.future.set_exception(output)
+            else:
+                request.future.set_result(output)
+
+    def _drop_abandoned(self, batch: list[_PendingRequest]) -> list[_PendingRequest]:
+        """Skip images whose caller was cancelled or whose deadline has passed."""
+        now = time.monotonic()
+        live = []
+        for request in batch:
+            if request.future.done():
+                self._dropped += 1
+            elif request.deadline is not None and request.deadline <= now:
+                self._dropped += 1
+                request.future.set_exception(
+                    DeadlineExceededError("Request deadline exceeded while batching")
+                )
+            else:
+                live.append(request)
+        return live
+
+    def _record(self, batch: list[_PendingRequest], dispatched_at: float) -> None:
+        self._batch_sizes[len(batch)] += 1
+        for request in batch:
+            wait = dispatched_at - request.enqueued_at
+            self._requests += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self) -> dict:
+        """Return queue depth, batch-size histogram and wait time statistics."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": sum(self._batch_sizes.values()),
+            "requests": self._requests,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "avg_wait_ms": (
+                self._wait_total / self._requests * 1000 if self._requests else 0.0
+            ),
+            "max_wait_observed_ms": self._wait_max * 1000,
+            "dropped": self._dropped,
+        }
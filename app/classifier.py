@@ -0,0 +1,292 @@
+import asyncio
+import functools
+import io
+import json
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Upper bound for candidates per image; callers slice to the top_k they need
+MAX_TOP_K = 20
+
+MODEL_FILE = "final_model.keras"
+CLASS_NAMES_FILE = "class_names.json"
+
+# Model formats: the Keras model or a TFLite export (see app/export_classifier.py)
+MODEL_FORMATS = ("keras", "float32", "fp16", "int8")
+
+# Batch sizes TFLite interpreters are allocated for. Batches are zero-padded
+# up to the next size (and split at the largest), so micro-batches of varying
+# size never reallocate tensors.
+TFLITE_BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64)
+
+
+def tflite_filename(model_format: str) -> str:
+    """File name of a TFLite export ("float32", "fp16" or "int8")."""
+    return f"classifier_{model_format}.tflite"
+
+
+class CharacterClassifier:
+    """Single-character classifier trained by ``app/train_classifier.py``.
+
+    Much cheaper than full detection and recognition for images that
+    contain exactly one character.
+    """
+
+    def __init__(
+        self,
+        model: Callable[[np.ndarray], Any],
+        class_names: list[str],
+        image_size: tuple[int, int] = (30, 30),
+    ):
+        """
+        Initialize character classifier.
+
+        Args:
+            model: Callable mapping a (N, height, width, 3) float32 batch to
+                (N, classes) probabilities (normally a Keras model)
+            class_names: Class directory names (Unicode code points such as "4E00")
+            image_size: Model input size (width, height)
+        """
+        self._model = model
+        self.class_names = class_names
+        self.chars = [_class_to_char(name) for name in class_names]
+        # Characters the model can output (refinement only touches these)
+        self.char_set = frozenset(self.chars)
+        self.image_size = image_size
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, model_dir: str, model_format: str = "int8") -> "CharacterClassifier":
+        """
+        Load a model and the class names saved by train_classifier.
+
+        TFLite exports run on the LiteRT interpreter without importing
+        TensorFlow. If the requested export does not exist, the Keras model
+        is loaded instead (requires TensorFlow).
+
+        Args:
+            model_dir: Directory containing class_names.json and the model
+            model_format: "keras", "float32", "fp16" or "int8"
+        """
+        if model_format not in MODEL_FORMATS:
+            raise ValueError(
+                f"Unsupported model format: {model_format}. "
+                f"Allowed formats: {', '.join(MODEL_FORMATS)}"
+            )
+
+        with open(Path(model_dir) / CLASS_NAMES_FILE, "r", encoding="utf-8") as f:
+            index_to_class = json.load(f)["index_to_class"]
+        class_names = [index_to_class[str(i)] for i in range(len(index_to_class))]
+
+        tflite_path = Path(model_dir) / tflite_filename(model_format)
+        if model_format != "keras" and tflite_path.exists():
+            model = TFLiteModel(str(tflite_path))
+            height, width = model.input_shape[1:3]
+        else:
+            from tensorflow import keras
+
+            keras_model = keras.models.load_model(Path(model_dir) / MODEL_FILE)
+            _, height, width, _ = keras_model.input_shape
+
+            def model(batch: np.ndarray) -> np.ndarray:
+                return keras_model(batch, training=False).numpy()
+
+        classifier = cls(model, class_names, image_size=(width, height))
+        # Build the inference graph now instead of on the first request
+        classifier.predict(np.zeros((1, height, width, 3), dtype=np.float32))
+        return classifier
+
+    async def run(self, method: str, *args, **kwargs):
+        """Run a classifier method off the event loop (BatchScheduler interface)."""
+        return await asyncio.to_thread(self._call_locked, method, *args, **kwargs)
+
+    def _call_locked(self, method: str, *args, **kwargs):
+        with self._lock:
+            return getattr(self, method)(*args, **kwargs)
+
+    def process_images(
+        self, images: list[bytes], top_k: int = 5
+    ) -> list[list[tuple[str, float]] | Exception]:
+        """
+        Classify several single-character images with one model call.
+
+        Args:
+            images: List of binary image data
+            top_k: Number of candidates per image
+
+        Returns:
+            One entry per input image: [(character, score), ...] sorted by
+            descending score, or the exception raised while decoding it
+        """
+        outputs: list = [None] * len(images)
+        arrays = []
+        indices = []
+        for i, image_bytes in enumerate(images):
+            try:
+                arrays.append(self.preprocess(image_bytes))
+            except Exception as e:
+                outputs[i] = e
+                continue
+            indices.append(i)
+
+        if arrays:
+            probabilities = self.predict(np.stack(arrays))
+            for i, row in zip(indices, probabilities):
+                outputs[i] = self.top_k(row, top_k)
+
+        return outputs
+
+    def classify(
+        self, images: list[Image.Image], top_k: int = 1
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Classify already decoded character images with one model call.
+
+        Args:
+            images: RGB character crops
+            top_k: Number of candidates per image
+
+        Returns:
+            [(character, score), ...] per image, sorted by descending score
+        """
+        if not images:
+            return []
+        probabilities = self.predict(np.stack([self.prepare(i) for i in images]))
+        return [self.top_k(row, top_k) for row in probabilities]
+
+    def preprocess(self, image_bytes: bytes) -> np.ndarray:
+        """Decode an image into a model input."""
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            return self.prepare(ImageOps.exif_transpose(image).convert("RGB"))
+
+    def prepare(self, image: Image.Image) -> np.ndarray:
+        """
+        Convert an RGB image into a model input.
+
+        The character is padded to a square on a white background, matching
+        the centered glyphs of the training images.
+        """
+        image = ImageOps.pad(
+            image, self.image_size, Image.Resampling.BILINEAR, color="white"
+        )
+        return np.asarray(image, dtype=np.float32)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Return class probabilities for a (N, height, width, 3) batch."""
+        return np.asarray(self._model(batch))
+
+    def top_k(self, probabilities: np.ndarray, k: int) -> list[tuple[str, float]]:
+        """Return the k most likely characters with their scores."""
+        k = min(k, len(probabilities))
+        best = np.argpartition(probabilities, -k)[-k:]
+        best = best[np.argsort(probabilities[best])[::-1]]
+        return [(self.chars[i], float(probabilities[i])) for i in best]
+
+
+def _class_to_char(name: str) -> str:
+    """Convert a class name ("4E00") back to its character."""
+    try:
+        return chr(int(name, 16))
+    except ValueError:
+        return name
+
+
+class TFLiteModel:
+    """TFLite classifier callable running on LiteRT (no TensorFlow import).
+
+    Quantized (int8/uint8) inputs and outputs are converted with the tensor
+    quantization parameters, so callers always pass and receive float32.
+
+    One interpreter is kept per batch size in ``batch_sizes`` (created on
+    first use), so tensors are allocated once per size rather than whenever
+    the batch size changes.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: int | None = None,
+        batch_sizes: tuple[int, ...] = TFLITE_BATCH_SIZES,
+    ):
+        """
+        Load a TFLite model.
+
+        Args:
+            model_path: Path to the .tflite file
+            num_threads: Interpreter threads (None uses the runtime default)
+            batch_sizes: Ascending batch sizes to pad batches up to
+        """
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                # Training environment: TensorFlow bundles the interpreter
+                from tensorflow.lite import Interpreter
+
+        self._create_interpreter = functools.partial(
+            Interpreter, model_path=model_path, num_threads=num_threads
+        )
+        interpreter = self._create_interpreter()
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self.input_shape = tuple(self._input["shape"])
+        self.batch_sizes = tuple(sorted(batch_sizes))
+        self._interpreters: dict[int, Any] = {}
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        largest = self.batch_sizes[-1]
+        outputs = [np.empty((0, *self._output["shape"][1:]), dtype=np.float32)]
+        for start in range(0, len(batch), largest):
+            chunk = batch[start : start + largest]
+            size = _padded_size(len(chunk), self.batch_sizes)
+            padded = np.zeros((size, *chunk.shape[1:]), dtype=chunk.dtype)
+            padded[: len(chunk)] = chunk
+
+            interpreter = self._interpreter(size)
+            interpreter.set_tensor(self._input["index"], _quantize(padded, self._input))
+            interpreter.invoke()
+            output = interpreter.get_tensor(self._output["index"])[: len(chunk)]
+            outputs.append(_dequantize(output, self._output))
+        return np.concatenate(outputs)
+
+    def _interpreter(self, batch_size: int) -> Any:
+        """Interpreter with tensors allocated for batch_size (kept for reuse)."""
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            interpreter = self._create_interpreter()
+            interpreter.resize_tensor_input(
+                self._input["index"], [batch_size, *self.input_shape[1:]]
+            )
+            interpreter.allocate_tensors()
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+
+def _padded_size(count: int, batch_sizes: tuple[int, ...]) -> int:
+    """Smallest of the ascending batch_sizes holding count items."""
+    return next(size for size in batch_sizes if size >= count)
+
+
+def _quantize(values: np.ndarray, details: dict) -> np.ndarray:
+    dtype = details["dtype"]
+    if not np.issubdtype(dtype, np.integer):
+        return values.astype(dtype, copy=False)
+    scale, zero_point = details["quantization"]
+    info = np.iinfo(dtype)
+    return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(
+        dtype
+    )
+
+
+def _dequantize(values: np.ndarray, details: dict) -> np.ndarray:
+    if not np.issubdtype(details["dtype"], np.integer):
+        return values
+    scale, zero_point = details["quantization"]
+    return (values.astype(np.float32) - zero_point) * scale
@@ -0,0 +1,177 @@
+"""Runtime configuration read from environment variables."""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name) or default
+
+
+# Local PaddleOCR model directory populated by .devcontainer/preload_models.py.
+# When present, models are loaded from it without any network access. When
+# OCR_MODELS_DIR is set explicitly, startup fails if the directory is missing
+# instead of downloading models.
+MODELS_DIR = _env_str("OCR_MODELS_DIR", "models/paddlex")
+MODELS_DIR_REQUIRED = bool(os.environ.get("OCR_MODELS_DIR"))
+
+# Dummy inferences per model instance at startup (0 disables warm-up)
+WARMUP_RUNS = _env_int("OCR_WARMUP_RUNS", 1)
+
+# Default OCR language
+OCR_LANG = _env_str("OCR_LANG", "japan")
+
+# Inference executor: "thread" or "process"
+INFERENCE_EXECUTOR = _env_str("OCR_INFERENCE_EXECUTOR", "thread")
+
+# How process workers start: "spawn" (each loads its own models) or
+# "forkserver" (forked from a server that preloaded the models of OCR_LANG and
+# OCR_PINNED_LANGS, so all workers share one copy of their weights)
+INFERENCE_START_METHOD = _env_str("OCR_INFERENCE_START_METHOD", "spawn")
+
+# CPU threads per PaddleOCR instance (0 keeps PaddleOCR's default), and cores
+# available for inference; with both set, the default worker count is
+# OCR_INFERENCE_CPU_BUDGET // OCR_INFERENCE_CPU_THREADS
+INFERENCE_CPU_THREADS = _env_int("OCR_INFERENCE_CPU_THREADS", 0)
+INFERENCE_CPU_BUDGET = _env_int("OCR_INFERENCE_CPU_BUDGET", 0)
+
+# Number of inference workers (each worker owns its own PaddleOCR instance)
+INFERENCE_WORKERS = _env_int(
+    "OCR_INFERENCE_WORKERS",
+    max(1, INFERENCE_CPU_BUDGET // INFERENCE_CPU_THREADS)
+    if INFERENCE_CPU_BUDGET and INFERENCE_CPU_THREADS
+    else 1,
+)
+
+# Micro-batching: maximum images per predict() call and maximum wait time
+BATCH_MAX_SIZE = _env_int("OCR_BATCH_MAX_SIZE", 16)
+BATCH_MAX_WAIT_MS = _env_int("OCR_BATCH_MAX_WAIT_MS", 10)
+
+# Admission control: images in flight across all requests (by default one
+# running and one filling micro-batch per worker), waiting requests before
+# 503, and waiting batch/document requests before 429
+ADMISSION_MAX_INFLIGHT = _env_int(
+    "OCR_ADMISSION_MAX_INFLIGHT", 2 * BATCH_MAX_SIZE * INFERENCE_WORKERS
+)
+ADMISSION_MAX_QUEUE = _env_int("OCR_ADMISSION_MAX_QUEUE", 256)
+ADMISSION_MAX_BATCH_QUEUE = _env_int("OCR_ADMISSION_MAX_BATCH_QUEUE", 32)
+
+# Deadline for interactive requests without an X-Request-Timeout header
+# (seconds, 0 disables); work still queued after it is dropped
+REQUEST_TIMEOUT_SECONDS = _env_float("OCR_REQUEST_TIMEOUT_SECONDS", 30.0)
+
+# Maximum number of images accepted by a single /ocr/batch request
+BATCH_MAX_FILES = _env_int("OCR_BATCH_MAX_FILES", 1000)
+
+# Result cache: in-memory entries (0 disables), TTL and optional on-disk tier
+CACHE_MAX_ENTRIES = _env_int("OCR_CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL_SECONDS = _env_int("OCR_CACHE_TTL_SECONDS", 3600)
+CACHE_DIR = os.environ.get("OCR_CACHE_DIR") or None
+# Entries kept in the on-disk tier (0 is unlimited); expired and excess ones
+# are swept hourly, oldest first
+CACHE_DISK_MAX_ENTRIES = _env_int("OCR_CACHE_DISK_MAX_ENTRIES", 100_000)
+
+# Near-duplicate reuse for re-scanned or re-compressed images: maximum pHash
+# distance in bits (0 disables; about 8 suits most scans), changed pixels of
+# the 1600 px page bitmap marking a 32x32 tile as different, share of changed
+# tiles above which the page is OCRed again in full, and indexed images
+# (saved next to the on-disk cache tier)
+NEAR_DUPLICATE_MAX_DISTANCE = _env_int("OCR_NEAR_DUPLICATE_MAX_DISTANCE", 0)
+NEAR_DUPLICATE_TILE_PIXELS = _env_int("OCR_NEAR_DUPLICATE_TILE_PIXELS", 6)
+NEAR_DUPLICATE_MAX_CHANGED = _env_float("OCR_NEAR_DUPLICATE_MAX_CHANGED", 0.3)
+NEAR_DUPLICATE_MAX_ENTRIES = _env_int("OCR_NEAR_DUPLICATE_MAX_ENTRIES", 1024)
+NEAR_DUPLICATE_INDEX_PATH = os.environ.get("OCR_NEAR_DUPLICATE_INDEX") or (
+    os.path.join(CACHE_DIR, "near_duplicates.npz") if CACHE_DIR else None
+)
+
+# Upload limits: size of a single file, size of a whole request body, and
+# pixels of a decoded image (checked from the header before decoding)
+MAX_UPLOAD_BYTES = _env_int("OCR_MAX_UPLOAD_MB", 20) * 1024 * 1024
+MAX_REQUEST_BYTES = _env_int("OCR_MAX_REQUEST_MB", 512) * 1024 * 1024
+MAX_IMAGE_PIXELS = _env_int("OCR_MAX_IMAGE_PIXELS", 50_000_000)
+
+# Asynchronous jobs (/jobs): directory of the persistent queue and results
+# (unset disables the API), background worker count and result retention
+JOBS_DIR = os.environ.get("OCR_JOBS_DIR") or None
+JOB_WORKERS = _env_int("OCR_JOB_WORKERS", INFERENCE_WORKERS)
+JOB_TTL_SECONDS = _env_int("OCR_JOB_TTL_SECONDS", 7 * 24 * 3600)
+# Maximum number of images and document pages in a single job
+JOB_MAX_ITEMS = _env_int("OCR_JOB_MAX_ITEMS", 10000)
+
+# Region-of-interest OCR: directory of saved form templates, and the text
+# recognition model for single-line zones (empty uses the pipeline's model)
+TEMPLATES_DIR = _env_str("OCR_TEMPLATES_DIR", "templates")
+REC_MODEL_NAME = os.environ.get("OCR_REC_MODEL") or None
+
+# Recognition batch sizes requests may choose with rec_batch_size
+# (comma-separated; empty allows none). Each one builds another PaddleOCR
+# instance per worker on first use, holding its own copy of the weights.
+REC_BATCH_SIZES = tuple(
+    int(size)
+    for size in os.environ.get("OCR_REC_BATCH_SIZES", "").split(",")
+    if size.strip()
+)
+
+# Downscale images so their longest side is at most this many pixels before
+# OCR (0 disables). Recognition then also runs on the downscaled text lines,
+# so small text in large scans may lose accuracy; off unless opted into.
+MAX_SIDE = _env_int("OCR_MAX_SIDE", 0)
+
+# Documents: PDF rasterization resolution and maximum number of pages
+PDF_DPI = _env_int("OCR_PDF_DPI", 200)
+DOCUMENT_MAX_PAGES = _env_int("OCR_DOCUMENT_MAX_PAGES", 500)
+
+# Model registry: memory budget for loaded languages (0 is unlimited),
+# estimated memory per PaddleOCR instance and languages never evicted
+MODEL_MEMORY_BUDGET_MB = _env_int("OCR_MODEL_MEMORY_BUDGET_MB", 0)
+MODEL_MEMORY_MB = _env_int("OCR_MODEL_MEMORY_MB", 1024)
+PINNED_LANGS = tuple(
+    lang.strip()
+    for lang in os.environ.get("OCR_PINNED_LANGS", "").split(",")
+    if lang.strip()
+)
+
+# Languages requests may select with ?lang= (comma-separated); OCR_LANG and
+# OCR_PINNED_LANGS are always allowed. Others are rejected with 400 rather
+# than loading a model for every value a client sends.
+LANGS = tuple(
+    dict.fromkeys(
+        lang.strip()
+        for lang in (
+            OCR_LANG,
+            *PINNED_LANGS,
+            *os.environ.get("OCR_LANGS", "japan,ch,chinese_cht,en,korean").split(","),
+        )
+        if lang.strip()
+    )
+)
+
+# Single-character classifier (trained by app/train_classifier.py; empty disables),
+# minimum top-1 score before /classify falls back to full OCR, and batching
+CLASSIFIER_MODEL_DIR = os.environ.get(
+    "OCR_CLASSIFIER_MODEL_DIR", "models/character_classifier"
+)
+# Classifier model format: "int8", "fp16" or "float32" TFLite export (served
+# without TensorFlow; the Keras model is used if the export is missing) or "keras"
+CLASSIFIER_MODEL_FORMAT = _env_str("OCR_CLASSIFIER_MODEL_FORMAT", "int8")
+CLASSIFIER_MIN_CONFIDENCE = _env_float("OCR_CLASSIFIER_MIN_CONFIDENCE", 0.9)
+CLASSIFIER_BATCH_MAX_SIZE = _env_int("OCR_CLASSIFIER_BATCH_MAX_SIZE", 64)
+CLASSIFIER_BATCH_MAX_WAIT_MS = _env_int("OCR_CLASSIFIER_BATCH_MAX_WAIT_MS", 2)
+
+# Re-recognize characters of regions scoring below this threshold with the
+# classifier (0 disables), minimum classifier score and crops per image
+REFINE_THRESHOLD = _env_float("OCR_REFINE_THRESHOLD", 0.0)
+REFINE_MIN_CONFIDENCE = _env_float("OCR_REFINE_MIN_CONFIDENCE", 0.9)
+REFINE_MAX_CROPS = _env_int("OCR_REFINE_MAX_CROPS", 64)
+
+# Emit OpenTelemetry spans for requests and pipeline stages (needs opentelemetry-api)
+TRACING_ENABLED = _env_str("OCR_TRACING", "0").lower() in ("1", "true", "yes")
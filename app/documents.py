@@ -0,0 +1,105 @@
+import io
+from contextlib import contextmanager
+
+from PIL import Image
+
+from app.preprocess import check_pixels
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+DOCUMENT_CONTENT_TYPES = [
+    PDF_CONTENT_TYPE,
+    "image/tiff",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/bmp",
+    "image/webp",
+]
+
+
+class DocumentError(ValueError):
+    """Raised when a document cannot be read."""
+
+
+def is_pdf(data: bytes) -> bool:
+    """Check for the PDF file signature."""
+    return data[:5] == b"%PDF-"
+
+
+def count_pages(data: bytes) -> int:
+    """
+    Count pages of a PDF or frames of a multi-page image (TIFF, GIF, ...).
+
+    Args:
+        data: Document bytes
+
+    Returns:
+        Number of pages
+    """
+    if is_pdf(data):
+        with _open_pdf(data) as pdf:
+            return len(pdf)
+
+    with Image.open(io.BytesIO(data)) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def load_page(
+    data: bytes, page_index: int, dpi: int = 200, max_pixels: int = 0
+) -> Image.Image:
+    """
+    Decode a single page of a document.
+
+    Only the requested page is decoded, so callers can walk large documents
+    one page at a time.
+
+    Args:
+        data: Document bytes
+        page_index: 0-based page index
+        dpi: Rasterization resolution for PDF pages
+        max_pixels: Maximum width x height of the page image, checked before
+            rendering or decoding (0 disables the limit)
+
+    Returns:
+        Page image (PIL Image)
+    """
+    if is_pdf(data):
+        with _open_pdf(data) as pdf:
+            page = pdf[page_index]
+            try:
+                width, height = page.get_size()
+                check_pixels(
+                    round(width * dpi / 72), round(height * dpi / 72), max_pixels
+                )
+                return page.render(scale=dpi / 72).to_pil()
+            finally:
+                page.close()
+
+    image = Image.open(io.BytesIO(data))
+    try:
+        image.seek(page_index)
+    except EOFError as e:
+        raise DocumentError(f"Page {page_index + 1} does not exist") from e
+    check_pixels(image.width, image.height, max_pixels)
+    # Materialize the frame so it no longer depends on the file position
+    return image.copy()
+
+
+@contextmanager
+def _open_pdf(data: bytes):
+    """Open a PDF with pypdfium2 (optional dependency)."""
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise DocumentError("PDF support requires pypdfium2") from e
+
+    try:
+        pdf = pypdfium2.PdfDocument(data)
+    except pypdfium2.PdfiumError as e:
+        raise DocumentError(f"Invalid PDF: {e!s}") from e
+
+    try:
+        yield pdf
+    finally:
+        pdf.close()
@@ -0,0 +1,214 @@
+"""
+文字分類モデル CPU推論用エクスポートスクリプト
+Kerasモデルを TFLite (float32 / fp16 / int8) に変換し、
+検証データで Keras モデルとの精度・レイテンシ比較レポートを作成
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from app.classifier import TFLiteModel, tflite_filename
+
+# 設定
+QUANTIZATIONS = ("float32", "fp16", "int8")
+REPRESENTATIVE_SAMPLES = 200
+LATENCY_BATCH_SIZES = (1, 32)
+LATENCY_REPEATS = 200
+REPORT_FILE = "export_report.json"
+
+
+def convert(
+    model: keras.Model,
+    quantization: str,
+    representative_images: np.ndarray,
+) -> bytes:
+    """KerasモデルをTFLiteに変換
+
+    Args:
+        model: 学習済みモデル
+        quantization: "float32"（量子化なし）、"fp16"（重みを float16）、
+            "int8"（重み・活性化を int8、入出力は float32 のまま）
+        representative_images: int8 量子化の較正に使う画像 (N, height, width, 3)
+
+    Returns:
+        TFLite モデル
+    """
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        # Keras 3 のモデルは SavedModel を経由して変換する
+        model.export(saved_model_dir)
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+
+        if quantization == "fp16":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization == "int8":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = lambda: (
+                [image[np.newaxis].astype(np.float32)]
+                for image in representative_images
+            )
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        elif quantization != "float32":
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        return converter.convert()
+
+
+def collect(dataset: tf.data.Dataset, limit: int | None = None):
+    """tf.data のバッチを NumPy 配列にまとめる"""
+    images, labels = [], []
+    count = 0
+    for batch_images, batch_labels in dataset.as_numpy_iterator():
+        images.append(batch_images)
+        labels.append(batch_labels)
+        count += len(batch_labels)
+        if limit is not None and count >= limit:
+            break
+    return np.concatenate(images)[:limit], np.concatenate(labels)[:limit]
+
+
+def evaluate(predict, images: np.ndarray, labels: np.ndarray) -> dict:
+    """検証データの精度とバッチサイズごとのレイテンシを測定
+
+    Args:
+        predict: (N, height, width, 3) float32 -> (N, classes) の推論関数
+        images: 検証画像
+        labels: 正解ラベル
+
+    Returns:
+        精度・予測ラベル・レイテンシ（ミリ秒）
+    """
+    predictions = np.concatenate(
+        [
+            np.argmax(predict(images[start : start + 32]), axis=1)
+            for start in range(0, len(images), 32)
+        ]
+    )
+
+    latency = {}
+    for batch_size in LATENCY_BATCH_SIZES:
+        batch = images[:batch_size]
+        predict(batch)  # ウォームアップ
+        times = []
+        for _ in range(LATENCY_REPEATS):
+            start = time.perf_counter()
+            predict(batch)
+            times.append((time.perf_counter() - start) * 1000)
+        latency[f"batch_{batch_size}"] = {
+            "p50_ms": float(np.percentile(times, 50)),
+            "p95_ms": float(np.percentile(times, 95)),
+            "per_image_ms": float(np.mean(times) / len(batch)),
+        }
+
+    return {
+        "accuracy": float(np.mean(predictions == labels)),
+        "predictions": predictions,
+        "latency": latency,
+    }
+
+
+def export_classifier(
+    model: keras.Model,
+    train_ds: tf.data.Dataset,
+    val_ds: tf.data.Dataset,
+    save_dir: str,
+) -> dict:
+    """TFLite モデルを書き出し、Keras モデルとの比較レポートを保存
+
+    Args:
+        model: 学習済みモデル
+        train_ds: 学習データ（int8 量子化の較正に使う）
+        val_ds: 検証データ
+        save_dir: 保存先ディレクトリ
+
+    Returns:
+        比較レポート
+    """
+    representative_images, _ = collect(train_ds, REPRESENTATIVE_SAMPLES)
+    val_images, val_labels = collect(val_ds)
+
+    keras_result = evaluate(
+        lambda batch: model(batch, training=False).numpy(), val_images, val_labels
+    )
+    report = {
+        "validation_samples": len(val_labels),
+        "models": {
+            "keras": {
+                "file": "final_model.keras",
+                "size_bytes": os.path.getsize(
+                    os.path.join(save_dir, "final_model.keras")
+                ),
+                "accuracy": keras_result["accuracy"],
+                "latency": keras_result["latency"],
+            }
+        },
+    }
+
+    for quantization in QUANTIZATIONS:
+        path = os.path.join(save_dir, tflite_filename(quantization))
+        with open(path, "wb") as f:
+            f.write(convert(model, quantization, representative_images))
+        print(f"TFLiteモデルを保存: {path}")
+
+        result = evaluate(TFLiteModel(path), val_images, val_labels)
+        report["models"][quantization] = {
+            "file": tflite_filename(quantization),
+            "size_bytes": os.path.getsize(path),
+            "accuracy": result["accuracy"],
+            # Keras モデルと同じ予測になった割合
+            "agreement": float(
+                np.mean(result["predictions"] == keras_result["predictions"])
+            ),
+            "latency": result["latency"],
+        }
+
+    with open(os.path.join(save_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"比較レポートを保存: {save_dir}/{REPORT_FILE}")
+
+    return report
+
+
+def print_report(report: dict):
+    """比較レポートを表形式で表示"""
+    print(f"\n検証サンプル数: {report['validation_samples']}")
+    header = f"{'model':<8} {'size (KB)':>10} {'accuracy':>9} {'agree':>7}"
+    for batch_size in LATENCY_BATCH_SIZES:
+        header += f" {f'b{batch_size} p50 (ms)':>14}"
+    print(header)
+
+    for name, model in report["models"].items():
+        agreement = model.get("agreement")
+        line = (
+            f"{name:<8} {model['size_bytes'] / 1024:>10.1f} "
+            f"{model['accuracy']:>9.4f} "
+            f"{'-' if agreement is None else f'{agreement:.4f}':>7}"
+        )
+        for batch_size in LATENCY_BATCH_SIZES:
+            line += f" {model['latency'][f'batch_{batch_size}']['p50_ms']:>14.3f}"
+        print(line)
+
+
+def main():
+    from app.train_classifier import MODEL_SAVE_PATH, load_dataset
+
+    print("=" * 60)
+    print("文字分類モデル エクスポート")
+    print("=" * 60)
+
+    model = keras.models.load_model(os.path.join(MODEL_SAVE_PATH, "final_model.keras"))
+    train_ds, val_ds, _ = load_dataset()
+    export_classifier(model, train_ds, val_ds, MODEL_SAVE_PATH)
+
+    print("\n完了!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import asyncio
+import multiprocessing
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import asynccontextmanager, contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+EXECUTOR_MODES = ("thread", "process")
+
+# How process workers are started: "spawn" runs a fresh interpreter per
+# worker; "forkserver" forks workers from a server process that imported the
+# preload modules first, so memory they allocated is shared copy-on-write
+START_METHODS = ("spawn", "forkserver")
+
+# Binary arguments at least this large reach process workers through shared
+# memory instead of being pickled through the task queue
+SHARE_MIN_BYTES = 64 * 1024
+
+# Worker-owned service instance. Thread workers each get their own slot;
+# process workers run tasks on their main thread, so the same storage works.
+_worker_state = threading.local()
+
+
+# Longest time a started worker waits for the others in InferencePool.start()
+START_TIMEOUT_SECONDS = 600
+
+
+def _init_worker(factory: Callable[[], Any], start_barrier: Any) -> None:
+    """Create the worker-owned service once per worker."""
+    _worker_state.start_barrier = start_barrier
+    _worker_state.service = factory()
+
+
+def _call_worker(method: str, args: tuple, kwargs: dict) -> Any:
+    """Invoke a method on the service owned by the current worker."""
+    args = tuple(_resolve(arg) for arg in args)
+    kwargs = {key: _resolve(value) for key, value in kwargs.items()}
+    return getattr(_worker_state.service, method)(*args, **kwargs)
+
+
+class SharedBuffer:
+    """Picklable handle to binary data placed in a shared memory block.
+
+    The block belongs to the process that created it (see
+    InferencePool.shared); workers attach, copy the data out and detach.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+    @classmethod
+    def create(cls, data: Any) -> tuple["SharedBuffer", SharedMemory]:
+        """
+        Copy bytes or a binary file object (from the start) into a new block.
+
+        Returns:
+            (handle to send to workers, block to unlink once they are done)
+        """
+        if hasattr(data, "readinto"):
+            data.seek(0, 2)
+            size = data.tell()
+            data.seek(0)
+        else:
+            size = len(data)
+        block = SharedMemory(create=True, size=max(size, 1))
+        try:
+            if hasattr(data, "readinto"):
+                view = block.buf[:size]
+                try:
+                    offset = 0
+                    while offset < size:
+                        count = data.readinto(view[offset:])
+                        if not count:
+                            break
+                        offset += count
+                finally:
+                    view.release()
+            else:
+                block.buf[:size] = data
+        except BaseException:
+            _release(block)
+            raise
+        return cls(block.name, size), block
+
+    def read(self) -> bytes:
+        """Copy the data out of shared memory (in a worker)."""
+        block = SharedMemory(name=self.name)
+        try:
+            return bytes(block.buf[: self.size])
+        finally:
+            block.close()
+
+
+def _resolve(value: Any) -> Any:
+    """Turn shared memory handles (also inside lists) back into bytes."""
+    if isinstance(value, SharedBuffer):
+        return value.read()
+    if isinstance(value, list | tuple):
+        return type(value)(_resolve(item) for item in value)
+    return value
+
+
+def _release(block: SharedMemory) -> None:
+    block.close()
+    block.unlink()
+
+
+def _cancel_submitted(submitting: asyncio.Future) -> None:
+    """Cancel the job submitted for a caller that went away meanwhile."""
+    if not submitting.cancelled() and submitting.exception() is None:
+        submitting.result().cancel()
+
+
+def _start_worker(attribute: str) -> Any:
+    """Hold this worker until every worker has started, then report back."""
+    try:
+        _worker_state.start_barrier.wait(START_TIMEOUT_SECONDS)
+    except threading.BrokenBarrierError:
+        pass
+    return getattr(_worker_state.service, attribute)
+
+
+class InferencePool:
+    """Executor that runs OCR work off the event loop.
+
+    Each worker builds its own service instance with ``factory`` so that
+    PaddleOCR objects are never shared between threads or processes. Process
+    workers receive large binary arguments through shared memory.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        mode: str = "thread",
+        workers: int = 1,
+        start_method: str = "spawn",
+        preload: tuple[str, ...] = (),
+    ):
+        """
+        Initialize inference pool.
+
+        Args:
+            factory: Picklable callable returning a worker-owned service
+            mode: Executor type ("thread" or "process")
+            workers: Number of workers
+            start_method: How process workers start ("spawn" or "forkserver")
+            preload: Modules the fork server imports before forking workers
+                (forkserver only; the first pool to start the server sets them)
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(
+                f"Unsupported executor mode: {mode}. "
+                f"Allowed modes: {', '.join(EXECUTOR_MODES)}"
+            )
+        if start_method not in START_METHODS:
+            raise ValueError(
+                f"Unsupported start method: {start_method}. "
+                f"Allowed methods: {', '.join(START_METHODS)}"
+            )
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+
+        self.mode = mode
+        self.workers = workers
+        self.start_method = start_method
+        self.preload = preload
+        self._executor = self._create_executor(factory)
+        # Shared memory blocks by name and the number of holders of each
+        # (shared() blocks and submitted jobs), so a block outlives a
+        # cancelled caller until the worker is done with it
+        self._blocks: dict[str, SharedMemory] = {}
+        self._block_refs: dict[str, int] = {}
+        self._blocks_lock = threading.Lock()
+
+    def _create_executor(self, factory: Callable[[], Any]) -> Executor:
+        if self.mode == "process":
+            context = multiprocessing.get_context(self.start_method)
+            if self.start_method == "forkserver" and self.preload:
+                context.set_forkserver_preload(list(self.preload))
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(factory, context.Barrier(self.workers)),
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="ocr-worker",
+            initializer=_init_worker,
+            initargs=(factory, threading.Barrier(self.workers)),
+        )
+
+    async def run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a service method on a worker and await its result.
+
+        Args:
+            method: Name of the method to call on the worker-owned service
+            *args: Positional arguments (must be picklable in process mode)
+            **kwargs: Keyword arguments (must be picklable in process mode)
+
+        Returns:
+            Return value of the method
+        """
+        if self.mode != "process":
+            return await asyncio.wrap_future(self._submit(method, args, kwargs))
+
+        # Copying arguments into shared memory reads whole (spooled) files
+        submitting = asyncio.ensure_future(
+            asyncio.to_thread(self._submit, method, args, kwargs)
+        )
+        try:
+            future = await asyncio.shield(submitting)
+        except asyncio.CancelledError:
+            # The job is submitted regardless; drop it unless it already started
+            submitting.add_done_callback(_cancel_submitted)
+            raise
+        return await asyncio.wrap_future(future)
+
+    def run_sync(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a service method on a worker and block until it completes."""
+        return self._submit(method, args, kwargs).result()
+
+    @contextmanager
+    def shared(self, data: Any) -> Iterator[Any]:
+        """
+        Place data in shared memory once for several calls.
+
+        Yields a handle to pass as a method argument instead of the data
+        (process mode), or the data itself (thread mode). The shared memory
+        is released once the block has exited and every job submitted with
+        the handle has finished. The data is copied in the calling thread;
+        use shared_async() on the event loop.
+        """
+        if self.mode != "process":
+            yield data
+            return
+        names: list[str] = []
+        handle = self._create_block(data, names)
+        try:
+            yield handle
+        finally:
+            self._release_blocks(names)
+
+    @asynccontextmanager
+    async def shared_async(self, data: Any) -> AsyncIterator[Any]:
+        """shared() copying the data into shared memory in a worker thread."""
+        if self.mode != "process":
+            yield data
+            return
+        names: list[str] = []
+        creating = asyncio.ensure_future(
+            asyncio.to_thread(self._create_block, data, names)
+        )
+        try:
+            handle = await asyncio.shield(creating)
+        except asyncio.CancelledError:
+            # Release the block once the copy that is still running finishes
+            creating.add_done_callback(lambda _: self._release_blocks(names))
+            raise
+        try:
+            yield handle
+        finally:
+            self._release_blocks(names)
+
+    def _submit(self, method: str, args: tuple, kwargs: dict) -> Future:
+        if self.mode != "process":
+            return self._executor.submit(_call_worker, method, args, kwargs)
+        names: list[str] = []
+        try:
+            args = tuple(self._share(arg, names) for arg in args)
+            kwargs = {key: self._share(value, names) for key, value in kwargs.items()}
+            future = self._executor.submit(_call_worker, method, args, kwargs)
+        except BaseException:
+            self._release_blocks(names)
+            raise
+        # Released when the job finishes or is cancelled, not when the
+        # awaiting caller goes away
+        future.add_done_callback(lambda _: self._release_blocks(names))
+        return future
+
+    def _share(self, value: Any, names: list[str]) -> Any:
+        """Replace large binary data (also inside lists) by shared memory handles."""
+        if isinstance(value, list | tuple):
+            return type(value)(self._share(item, names) for item in value)
+        if isinstance(value, SharedBuffer):
+            with self._blocks_lock:
+                if value.name in self._block_refs:
+                    self._block_refs[value.name] += 1
+                    names.append(value.name)
+            return value
+        if isinstance(value, bytes | bytearray) and len(value) < SHARE_MIN_BYTES:
+            return value
+        if isinstance(value, bytes | bytearray) or hasattr(value, "readinto"):
+            return self._create_block(value, names)
+        return value
+
+    def _create_block(self, data: Any, names: list[str]) -> SharedBuffer:
+        handle, block = SharedBuffer.create(data)
+        with self._blocks_lock:
+            self._blocks[block.name] = block
+            self._block_refs[block.name] = 1
+        names.append(block.name)
+        return handle
+
+    def _release_blocks(self, names: list[str]) -> None:
+        """Drop one hold on each block, unlinking blocks nobody holds."""
+        with self._blocks_lock:
+            for name in names:
+                self._block_refs[name] -= 1
+                if self._block_refs[name] == 0:
+                    del self._block_refs[name]
+                    _release(self._blocks.pop(name))
+
+    def start(self, attribute: str = "is_ready") -> list[Any]:
+        """
+        Start every worker now instead of on first use.
+
+        One job is submitted per worker, and each job holds its worker until
+        all of them are running, so every worker builds its service now.
+
+        Args:
+            attribute: Service attribute reported back by each worker
+
+        Returns:
+            The attribute value of each started worker's service
+        """
+        futures = [
+            self._executor.submit(_start_worker, attribute) for _ in range(self.workers)
+        ]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        """Stop all workers."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def iter_completed(
+    jobs: Iterator[tuple[Any, Awaitable]],
+    limit: int,
+) -> AsyncIterator[tuple[Any, Any]]:
+    """
+    Run awaitables with bounded concurrency, yielding results as they finish.
+
+    Jobs are pulled from the iterator only when a slot is free, so lazily
+    produced inputs are never all held in memory at once.
+
+    Args:
+        jobs: Iterator of (key, awaitable) pairs
+        limit: Maximum number of awaitables in flight
+
+    Yields:
+        (key, result or the exception raised by the awaitable)
+    """
+    pending: dict[asyncio.Future, Any] = {}
+
+    def schedule() -> None:
+        while len(pending) < max(1, limit):
+            job = next(jobs, None)
+            if job is None:
+                return
+            key, awaitable = job
+            pending[asyncio.ensure_future(awaitable)] = key
+
+    schedule()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                yield key, result
+            schedule()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,448 @@
+import asyncio
+import json
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+DATABASE_FILE = "jobs.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    lang TEXT NOT NULL,
+    dpi INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    input TEXT,
+    page INTEGER,
+    state TEXT NOT NULL,
+    result TEXT,
+    message TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (state, job_id, idx);
+"""
+
+
+@dataclass
+class Job:
+    """Progress of an asynchronous OCR job."""
+
+    id: str
+    lang: str
+    dpi: int
+    created_at: float
+    finished_at: float | None
+    total: int
+    pending: int
+    running: int
+    succeeded: int
+    failed: int
+
+    @property
+    def status(self) -> str:
+        """Job state: "queued", "running" or "completed"."""
+        if self.finished_at is not None:
+            return "completed"
+        if self.pending == self.total:
+            return "queued"
+        return "running"
+
+
+@dataclass
+class JobItem:
+    """One image or document page of a job."""
+
+    job_id: str
+    index: int
+    filename: str
+    input_path: str | None
+    page: int | None = None
+
+
+class JobInput:
+    """Builder for the inputs of a new job (see JobStore.create())."""
+
+    def __init__(self, input_dir: Path):
+        self._input_dir = input_dir
+        self.items: list[tuple[str, str | None, int | None, str | None]] = []
+
+    def add_file(self, filename: str, source: bytes | BinaryIO, pages: int = 0) -> None:
+        """
+        Store an input file.
+
+        Args:
+            filename: Name reported with the results
+            source: Image or document data, or a binary file object copied
+                in chunks
+            pages: Number of document pages (0 for a single image)
+        """
+        path = self._input_dir / str(len(self.items))
+        with open(path, "wb") as f:
+            if isinstance(source, bytes):
+                f.write(source)
+            else:
+                source.seek(0)
+                shutil.copyfileobj(source, f)
+
+        if pages == 0:
+            self.items.append((filename, str(path), None, None))
+        for page in range(pages):
+            self.items.append((filename, str(path), page, None))
+
+    def add_error(self, filename: str, message: str) -> None:
+        """Record an input that failed before processing."""
+        self.items.append((filename, None, None, message))
+
+
+class JobStore:
+    """Persistent job queue backed by SQLite.
+
+    Inputs are written to files under ``data_dir`` and results to the
+    database, so queued work survives restarts and finished results are read
+    back page by page instead of being held in memory. Items that were being
+    processed when the server stopped are queued again by recover().
+
+    All methods block; call them with asyncio.to_thread from async code.
+    """
+
+    def __init__(self, data_dir: str):
+        """
+        Initialize job store.
+
+        Args:
+            data_dir: Directory for the database and input files
+        """
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.data_dir / DATABASE_FILE, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def create(
+        self, lang: str, dpi: int, add_inputs: Callable[[JobInput], None]
+    ) -> str:
+        """
+        Create a job and queue its items.
+
+        Args:
+            lang: OCR language
+            dpi: Rasterization resolution for PDF pages
+            add_inputs: Callback adding the job's files to a JobInput
+
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        input_dir = self._input_dir(job_id)
+        input_dir.mkdir(parents=True)
+        inputs = JobInput(input_dir)
+        try:
+            add_inputs(inputs)
+        except BaseException:
+            shutil.rmtree(self.data_dir / job_id, ignore_errors=True)
+            raise
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, lang, dpi, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, lang, dpi, time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO items (job_id, idx, filename, input, page, state, message)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        job_id,
+                        i,
+                        filename,
+                        path,
+                        page,
+                        "pending" if message is None else "failed",
+                        message,
+                    )
+                    for i, (filename, path, page, message) in enumerate(inputs.items)
+                ),
+            )
+            finished = self._finish_if_done(job_id)
+        if finished:
+            shutil.rmtree(input_dir, ignore_errors=True)
+        return job_id
+
+    def get(self, job_id: str) -> Job | None:
+        """Return the progress of a job, or None if it does not exist."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            counts = dict(
+                self._db.execute(
+                    "SELECT state, COUNT(*) FROM items WHERE job_id = ? GROUP BY state",
+                    (job_id,),
+                ).fetchall()
+            )
+        return Job(
+            id=row["id"],
+            lang=row["lang"],
+            dpi=row["dpi"],
+            created_at=row["created_at"],
+            finished_at=row["finished_at"],
+            total=sum(counts.values()),
+            pending=counts.get("pending", 0),
+            running=counts.get("running", 0),
+            succeeded=counts.get("done", 0),
+            failed=counts.get("failed", 0),
+        )
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> list[dict]:
+        """
+        Read one page of item results.
+
+        Returns:
+            Items in input order with "index", "filename", "page", "state",
+            "result" (OCR results of finished items, else None) and "message"
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, filename, page, state, result, message FROM items"
+                " WHERE job_id = ? ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, limit, offset),
+            ).fetchall()
+        return [
+            {
+                "index": row["idx"],
+                "filename": row["filename"],
+                "page": row["page"],
+                "state": row["state"],
+                "result": None if row["result"] is None else json.loads(row["result"]),
+                "message": row["message"],
+            }
+            for row in rows
+        ]
+
+    def claim(self, limit: int) -> list[JobItem]:
+        """
+        Take up to ``limit`` pending items of the oldest job for processing.
+
+        Returns:
+            Claimed items (empty when nothing is pending)
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT job_id FROM items WHERE state = 'pending'"
+                " ORDER BY rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return []
+            rows = self._db.execute(
+                "SELECT job_id, idx, filename, input, page FROM items"
+                " WHERE job_id = ? AND state = 'pending' ORDER BY idx LIMIT ?",
+                (row["job_id"], limit),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE items SET state = 'running' WHERE job_id = ? AND idx = ?",
+                ((r["job_id"], r["idx"]) for r in rows),
+            )
+        return [
+            JobItem(r["job_id"], r["idx"], r["filename"], r["input"], r["page"])
+            for r in rows
+        ]
+
+    def complete(self, item: JobItem, result: Any) -> None:
+        """
+        Store the outcome of a claimed item.
+
+        Args:
+            item: Item returned by claim()
+            result: JSON-serializable OCR results, or the exception raised
+        """
+        if isinstance(result, Exception):
+            values = ("failed", None, str(result))
+        else:
+            values = ("done", json.dumps(result, default=float), None)
+
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE items SET state = ?, result = ?, message = ?"
+                " WHERE job_id = ? AND idx = ? AND state = 'running'",
+                (*values, item.job_id, item.index),
+            )
+            finished = self._finish_if_done(item.job_id)
+        if finished:
+            # Inputs are no longer needed once every item has a result
+            shutil.rmtree(self._input_dir(item.job_id), ignore_errors=True)
+
+    def read_input(self, item: JobItem) -> bytes:
+        """Read the image or document data of an item."""
+        return Path(item.input_path).read_bytes()
+
+    def delete(self, job_id: str) -> bool:
+        """Delete a job, its results and inputs; return whether it existed."""
+        with self._lock, self._db:
+            deleted = self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        shutil.rmtree(self.data_dir / job_id, ignore_errors=True)
+        return deleted.rowcount > 0
+
+    def recover(self) -> int:
+        """Queue items left running by a previous process again."""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "UPDATE items SET state = 'pending' WHERE state = 'running'"
+            )
+        return cursor.rowcount
+
+    def purge(self, ttl_seconds: float) -> int:
+        """Delete jobs that finished more than ``ttl_seconds`` ago."""
+        with self._lock:
+            job_ids = [
+                row["id"]
+                for row in self._db.execute(
+                    "SELECT id FROM jobs WHERE finished_at < ?",
+                    (time.time() - ttl_seconds,),
+                )
+            ]
+        for job_id in job_ids:
+            self.delete(job_id)
+        return len(job_ids)
+
+    def stats(self) -> dict:
+        """Return the number of jobs and items per state."""
+        with self._lock:
+            jobs = self._db.execute(
+                "SELECT COUNT(*), COUNT(finished_at) FROM jobs"
+            ).fetchone()
+            items = dict(
+                self._db.execute(
+                    "SELECT state, COUNT(*) FROM items GROUP BY state"
+                ).fetchall()
+            )
+        return {
+            "jobs": jobs[0],
+            "completed_jobs": jobs[1],
+            "pending_items": items.get("pending", 0),
+            "running_items": items.get("running", 0),
+        }
+
+    def _input_dir(self, job_id: str) -> Path:
+        return self.data_dir / job_id / "inputs"
+
+    def _finish_if_done(self, job_id: str) -> bool:
+        cursor = self._db.execute(
+            "UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL"
+            " AND NOT EXISTS (SELECT 1 FROM items WHERE job_id = ?"
+            " AND state IN ('pending', 'running'))",
+            (time.time(), job_id, job_id),
+        )
+        return cursor.rowcount > 0
+
+
+class JobRunner:
+    """Background workers draining a JobStore.
+
+    Each worker claims a chunk of items of one job and hands it to
+    ``process``, which returns one result (or exception) per item.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        process: Callable[[Job, list[JobItem]], Awaitable[list]],
+        workers: int = 1,
+        chunk_size: int = 16,
+        ttl_seconds: float = 7 * 24 * 3600,
+        poll_seconds: float = 5.0,
+    ):
+        """
+        Initialize job runner.
+
+        Args:
+            store: Job queue
+            process: Coroutine function computing the results of claimed items
+            workers: Number of chunks processed concurrently
+            chunk_size: Maximum items per chunk
+            ttl_seconds: Finished jobs are deleted after this long
+            poll_seconds: Idle workers check the queue at least this often
+        """
+        self.store = store
+        self._process = process
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.ttl = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._purged_at: float | None = None
+
+    def start(self) -> None:
+        """Queue interrupted items again and start the workers."""
+        if self._tasks:
+            return
+        self.store.recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; unfinished items are resumed by the next start()."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.store.recover)
+
+    def notify(self) -> None:
+        """Wake idle workers after new items were queued."""
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            items = await asyncio.to_thread(self.store.claim, self.chunk_size)
+            if not items:
+                await self._idle()
+                continue
+
+            job = await asyncio.to_thread(self.store.get, items[0].job_id)
+            if job is None:
+                # Deleted while its items were being claimed
+                continue
+            try:
+                outputs = await self._process(job, items)
+            except Exception as e:
+                outputs = [e] * len(items)
+            await asyncio.to_thread(self._complete, items, outputs)
+
+    async def _idle(self) -> None:
+        if self._purged_at is None or time.monotonic() - self._purged_at > 3600:
+            self._purged_at = time.monotonic()
+            await asyncio.to_thread(self.store.purge, self.ttl)
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+        except TimeoutError:
+            pass
+
+    def _complete(self, items: list[JobItem], outputs: list) -> None:
+        for item, output in zip(items, outputs):
+            self.store.complete(item, output)
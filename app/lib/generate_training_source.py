@@ -2,11 +2,22 @@
 
 import shutil
 import argparse
+import functools
+import hashlib
+import io
 import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List
 from PIL import Image, ImageDraw, ImageFont
 
+from app.lib.packed_dataset import remove_packed_dataset, write_packed_dataset
+
+
+MANIFEST_FILE = "manifest.json"
+
 
 def generate(
     output_dir: str,
@@ -15,63 +26,247 @@ def generate(
     font_size: int = 16,
     image_size: tuple[int, int] = (30, 30),
     extension: str = "jpg",
+    max_workers: int | None = None,
+    packed: bool = False,
 ) -> None:
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-
-    # cleanup
-    if (Path(output_dir) / "images").exists():
-        shutil.rmtree(Path(output_dir) / "images")
-        (Path(output_dir) / "images").mkdir(parents=True, exist_ok=True)
-
-    if (Path(output_dir) / "classification").exists():
-        shutil.rmtree(Path(output_dir) / "classification")
-        (Path(output_dir) / "classification").mkdir(parents=True, exist_ok=True)
+    """学習リソースを生成
 
-    with open(Path(output_dir) / "config.json", "w", encoding="utf-8") as f:
+    前回の生成結果 (manifest.json) と比較し、不足または変更のあるサンプルだけを
+    生成し、不要になったサンプルを削除する。manifest.json がない場合は全て作り直す。
+    packed を指定すると classification/ をパック形式 (packed_dataset) でも書き出す。
+    指定しない場合、以前に書き出したパック形式のデータは削除する。
+    """
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(output_dir)
+
+    # cleanup (manifest がない場合は既存ファイルの内容が不明なので作り直す)
+    if previous is None:
+        for name in ("images", "classification"):
+            if (output / name).exists():
+                shutil.rmtree(output / name)
+        previous = {"samples": {}, "images": {}}
+
+    with open(output / "config.json", "w", encoding="utf-8") as f:
         config = {
             "text_file_paths": text_file_paths,
             "font_paths": font_paths,
             "font_size": font_size,
             "image_size": f"{image_size[0]}x{image_size[1]}",
             "extension": extension,
+            "packed": packed,
         }
         json.dump(config, f, ensure_ascii=False, indent=2)
 
-    label_texts: List[str] = []
-    rec_gt_texts: List[str] = []
+    font_digests = {font_path: file_digest(font_path) for font_path in font_paths}
+
+    # 生成すべき状態 (パス -> ハッシュ) を manifest として組み立てる
+    manifest = {"samples": {}, "images": {}, "labels": []}
     unicode_char_map = {}
+    # font_path -> [(classification パス, 文字)]
+    pending: dict[str, list[tuple[str, str]]] = {}
 
     for text_file_path in text_file_paths:
         stem = Path(text_file_path).stem
-        (Path(output_dir) / "images" / stem).mkdir(parents=True, exist_ok=True)
         chars = parse_char_file(text_file_path)
 
         for font_path in font_paths:
             font_name = Path(font_path).stem
             for index, char in chars:
-                image = generate_char_image(char, font_path, font_size, image_size)
-
-                # PaddleOCR ソース
+                unicode_str = char_to_unicode(char)
+                sample_path = f"classification/{unicode_str}/{font_name}.{extension}"
+                sample_hash = sample_digest(
+                    char, font_digests[font_path], font_size, image_size, extension
+                )
                 label_key = f"images/{stem}/{index}.{extension}"
-                label_value = f'[{{"transcription": "{char}", "points": [[0, 0], [{image_size[0]}, 0], [{image_size[0]}, {image_size[1]}], [0, {image_size[1]}]], "difficult": false}}]'
-                label_texts.append(f"{label_key}\t{label_value}")
-                rec_gt_texts.append(f"{label_key}\t{char}")
-                image.save(Path(output_dir) / "images" / stem / f"{index}.{extension}")
 
-                # Tensorflow ソース
-                unicode_str = char_to_unicode(char)
-                unicode_dir = Path(output_dir) / "classification" / unicode_str
-                unicode_dir.mkdir(parents=True, exist_ok=True)
+                manifest["labels"].append([label_key, char])
                 unicode_char_map[unicode_str] = char
-                image.save(unicode_dir / f"{font_name}.{extension}")
 
+                if sample_path not in manifest["samples"]:
+                    manifest["samples"][sample_path] = sample_hash
+                    if not is_up_to_date(
+                        output, sample_path, sample_hash, previous["samples"]
+                    ):
+                        pending.setdefault(font_path, []).append((sample_path, char))
+
+                # images/ は同じパスをフォントごとに上書きしていたため、最後のフォントの画像が残る
+                manifest["images"][label_key] = [sample_path, sample_hash]
+
+    remove_stale(output, previous["samples"], manifest["samples"])
+    remove_stale(output, previous["images"], manifest["images"])
+
+    # フォント単位でプロセスプールに分割して生成
+    total = sum(len(samples) for samples in pending.values())
+    print(f"{total}/{len(manifest['samples'])} samples to render")
+    done = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                render_samples, output_dir, font_path, font_size, image_size, samples
+            ): font_path
+            for font_path, samples in pending.items()
+        }
+        for future in as_completed(futures):
+            done += future.result()
+            print(f"[{done}/{total}] {Path(futures[future]).name}")
+
+    # images/ は classification/ の画像へのハードリンク
+    rendered = {path for samples in pending.values() for path, _ in samples}
+    for label_key, (sample_path, sample_hash) in manifest["images"].items():
+        if sample_path in rendered or not is_up_to_date(
+            output, label_key, [sample_path, sample_hash], previous["images"]
+        ):
+            (output / label_key).parent.mkdir(parents=True, exist_ok=True)
+            link_or_write(output / sample_path, output / label_key)
+
+    write_labels(output_dir, manifest["labels"], image_size)
+    with open(output / "unicode_char.json", "w", encoding="utf-8") as f:
+        json.dump(unicode_char_map, f, ensure_ascii=False, indent=2)
+    if packed:
+        count = write_packed_dataset(
+            output_dir, list(manifest["samples"]), image_size
+        )
+        print(f"packed {count} samples")
+    else:
+        # 以前パック形式で生成していた場合、古いサンプルのパックが残らないようにする
+        remove_packed_dataset(output_dir)
+    save_manifest(output_dir, manifest)
+
+
+def regenerate(output_dir: str, max_workers: int | None = None) -> None:
+    """出力ディレクトリの config.json の設定で学習リソースを再生成"""
+    with open(Path(output_dir) / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    generate(
+        output_dir=output_dir,
+        text_file_paths=config["text_file_paths"],
+        font_paths=config["font_paths"],
+        font_size=config["font_size"],
+        image_size=parse_image_size(config["image_size"]),
+        extension=config["extension"],
+        max_workers=max_workers,
+        packed=config.get("packed", False),
+    )
+
+
+def write_labels(
+    output_dir: str, labels: list[list[str]], image_size: tuple[int, int]
+) -> None:
+    """manifest のラベルから Label.txt と rec_gt.txt を書き出す"""
+    label_texts: List[str] = []
+    rec_gt_texts: List[str] = []
+
+    for label_key, char in labels:
+        # PaddleOCR ソース
+        label_value = f'[{{"transcription": "{char}", "points": [[0, 0], [{image_size[0]}, 0], [{image_size[0]}, {image_size[1]}], [0, {image_size[1]}]], "difficult": false}}]'
+        label_texts.append(f"{label_key}\t{label_value}")
+        rec_gt_texts.append(f"{label_key}\t{char}")
 
     with open(Path(output_dir) / "Label.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(label_texts))
     with open(Path(output_dir) / "rec_gt.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(rec_gt_texts))
-    with open(Path(output_dir) / "unicode_char.json", "w", encoding="utf-8") as f:
-        json.dump(unicode_char_map, f, ensure_ascii=False, indent=2)
+
+
+def render_samples(
+    output_dir: str,
+    font_path: str,
+    font_size: int,
+    image_size: tuple[int, int],
+    samples: list[tuple[str, str]],
+) -> int:
+    """1つのフォントで指定されたサンプル画像を生成
+
+    画像は一度だけエンコードして classification/ に書き込む。
+
+    Args:
+        output_dir: 出力ディレクトリ
+        font_path: フォントファイルのパス
+        font_size: フォントサイズ（px）
+        image_size: 画像サイズ (width, height)
+        samples: (classification/ 以下のパス, 文字) のリスト
+
+    Returns:
+        生成した画像の数
+    """
+    for sample_path, char in samples:
+        path = Path(output_dir) / sample_path
+        image = generate_char_image(char, font_path, font_size, image_size)
+        buffer = io.BytesIO()
+        image.save(buffer, format=Image.registered_extensions()[path.suffix.lower()])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_file_atomic(path, buffer.getvalue())
+
+    return len(samples)
+
+
+def sample_digest(
+    char: str,
+    font_digest: str,
+    font_size: int,
+    image_size: tuple[int, int],
+    extension: str,
+) -> str:
+    """サンプル画像の生成条件のハッシュ"""
+    key = json.dumps([char, font_digest, font_size, list(image_size), extension])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """ファイル内容のハッシュ（フォントの差し替えを検出する）"""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def is_up_to_date(output: Path, path: str, value, previous: dict) -> bool:
+    """前回と同じ条件で生成済みか"""
+    return previous.get(path) == value and (output / path).exists()
+
+
+def remove_stale(output: Path, previous: dict, current: dict) -> None:
+    """不要になったファイルを削除"""
+    for path in previous.keys() - current.keys():
+        (output / path).unlink(missing_ok=True)
+        try:
+            (output / path).parent.rmdir()
+        except OSError:
+            pass
+
+
+def load_manifest(output_dir: str) -> dict | None:
+    """前回の manifest.json を読み込む（なければ None）"""
+    try:
+        with open(Path(output_dir) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(output_dir: str, manifest: dict) -> None:
+    write_file_atomic(
+        Path(output_dir) / MANIFEST_FILE,
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+
+
+def write_file_atomic(path: Path, data: bytes) -> None:
+    """一時ファイル経由で書き込む（同じ文字を複数のシャードが書いても壊れない）"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def link_or_write(source: Path, destination: Path) -> None:
+    """ハードリンクを作成し、できない場合はコピーする"""
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        write_file_atomic(destination, source.read_bytes())
 
 
 def char_to_unicode(char: str) -> str:
@@ -139,7 +334,7 @@ def generate_char_image(
     image = Image.new("RGB", image_size, color="white")
     draw = ImageDraw.Draw(image)
 
-    font = ImageFont.truetype(font_path, font_size)
+    font = load_font(font_path, font_size)
 
     bbox = draw.textbbox((0, 0), char, font=font)
     text_width = bbox[2] - bbox[0]
@@ -153,6 +348,12 @@ def generate_char_image(
     return image
 
 
+@functools.cache
+def load_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """フォントを読み込む（プロセスごとにキャッシュ）"""
+    return ImageFont.truetype(font_path, font_size)
+
+
 def parse_image_size(value: str) -> tuple[int, int]:
     """画像サイズ文字列をパース（例: "128x128" -> (128, 128)）"""
     parts = value.lower().split("x")
@@ -162,6 +363,22 @@ def parse_image_size(value: str) -> tuple[int, int]:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="学習リソースを生成")
+    parser.add_argument(
+        "--regenerate",
+        metavar="OUTPUT_DIR",
+        help="既存の出力ディレクトリを config.json の設定で差分更新する",
+    )
+    parser.add_argument(
+        "--packed",
+        action="store_true",
+        help="classification/ をパック形式 (NumPy 配列) でも書き出す",
+    )
+    args = parser.parse_args()
+    if args.regenerate:
+        regenerate(args.regenerate)
+        return
+
     generate(
         output_dir="training/t02",
         text_file_paths=[
@@ -184,6 +401,7 @@ def main():
         font_size=16,
         image_size=(30, 30),
         extension="jpg",
+        packed=args.packed,
     )
 
 
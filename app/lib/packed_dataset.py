@@ -0,0 +1,148 @@
+"""文字分類用の学習データをメモリマップ可能な NumPy 配列にまとめるモジュール
+
+classification/{クラス}/{フォント}.{拡張子} の画像を 1 つの uint8 配列
+(N, height, width, 3) とラベル配列 (N,) に詰めて保存する。学習時は
+np.load(mmap_mode="r") で読み込むため、ファイル走査や JPEG デコードが不要になる。
+"""
+
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+IMAGES_FILE = "classification_images.npy"
+LABELS_FILE = "classification_labels.npy"
+INDEX_FILE = "classification_index.json"
+
+
+@dataclass
+class PackedDataset:
+    """パック済みデータセット（images はメモリマップされた読み取り専用配列）"""
+
+    images: np.ndarray
+    labels: np.ndarray
+    class_names: list[str]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+def write_packed_dataset(
+    output_dir: str,
+    sample_paths: list[str],
+    image_size: tuple[int, int],
+) -> int:
+    """classification/ の画像をパック形式で書き出す
+
+    クラス名とサンプルの順序は keras.utils.image_dataset_from_directory と同じ
+    （ディレクトリ名・ファイル名の昇順）にする。
+
+    Args:
+        output_dir: 出力ディレクトリ
+        sample_paths: output_dir からの相対パス (classification/{クラス}/{ファイル})
+        image_size: 画像サイズ (width, height)
+
+    Returns:
+        書き出したサンプル数
+    """
+    output = Path(output_dir)
+    samples = sorted(
+        (Path(path).parent.name, Path(path).name, path) for path in sample_paths
+    )
+    class_names = sorted({class_name for class_name, _, _ in samples})
+    class_index = {name: i for i, name in enumerate(class_names)}
+
+    width, height = image_size
+    images_tmp = output / f"{IMAGES_FILE}.tmp"
+    images = np.lib.format.open_memmap(
+        images_tmp, mode="w+", dtype=np.uint8, shape=(len(samples), height, width, 3)
+    )
+    labels = np.empty(len(samples), dtype=np.int32)
+
+    for i, (class_name, _, path) in enumerate(samples):
+        with Image.open(output / path) as image:
+            if image.size != image_size:
+                raise ValueError(
+                    f"{path}: image size {image.size} does not match {image_size}"
+                )
+            images[i] = np.asarray(image.convert("RGB"))
+        labels[i] = class_index[class_name]
+
+    images.flush()
+    del images
+    images_tmp.replace(output / IMAGES_FILE)
+    np.save(output / LABELS_FILE, labels)
+
+    with open(output / INDEX_FILE, "w", encoding="utf-8") as f:
+        index = {
+            "class_names": class_names,
+            "image_size": f"{width}x{height}",
+            "samples": [path for _, _, path in samples],
+        }
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+    return len(samples)
+
+
+def remove_packed_dataset(data_dir: str) -> None:
+    """パック形式のデータセットを削除（古いパックが学習に使われないようにする）"""
+    for name in (IMAGES_FILE, LABELS_FILE, INDEX_FILE):
+        (Path(data_dir) / name).unlink(missing_ok=True)
+
+
+def has_packed_dataset(data_dir: str) -> bool:
+    """パック形式のデータセットが存在するか"""
+    return all(
+        (Path(data_dir) / name).exists()
+        for name in (IMAGES_FILE, LABELS_FILE, INDEX_FILE)
+    )
+
+
+def load_packed_dataset(data_dir: str) -> PackedDataset:
+    """パック形式のデータセットを読み込む（画像はコピーせずメモリマップする）"""
+    with open(Path(data_dir) / INDEX_FILE, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    return PackedDataset(
+        images=np.load(Path(data_dir) / IMAGES_FILE, mmap_mode="r"),
+        labels=np.load(Path(data_dir) / LABELS_FILE),
+        class_names=index["class_names"],
+    )
+
+
+def split_indices(
+    count: int, validation_split: float, seed: int = 42
+) -> tuple[np.ndarray, np.ndarray]:
+    """サンプルのインデックスをシャッフルして学習用・検証用に分割
+
+    Returns:
+        (学習用インデックス, 検証用インデックス)
+    """
+    indices = np.random.default_rng(seed).permutation(count)
+    val_count = int(count * validation_split)
+    return indices[val_count:], indices[:val_count]
+
+
+def iter_batches(
+    dataset: PackedDataset,
+    indices: np.ndarray,
+    batch_size: int,
+    rng: np.random.Generator | None = None,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """インデックスの順にバッチを返す
+
+    rng を指定した場合はインデックスをシャッフルする（エポックごとに呼び出す）。
+    バッチ内はインデックスの昇順で読み出し、メモリマップへのアクセスを局所化する。
+
+    Yields:
+        (画像 (B, height, width, 3) uint8, ラベル (B,) int32)
+    """
+    if rng is not None:
+        indices = rng.permutation(indices)
+
+    for start in range(0, len(indices), batch_size):
+        batch = np.sort(indices[start : start + batch_size])
+        yield dataset.images[batch], dataset.labels[batch]
@@ -1,22 +1,314 @@
-from contextlib import asynccontextmanager
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import partial
+from pathlib import Path
+from typing import Literal
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from PIL import UnidentifiedImageError
+from pydantic import ValidationError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.models import BoundingBox, HealthResponse, OCRResponse, OCRResult
-from app.ocr_service import OCRService
+from app import config, metrics
+from app.admission import (
+    AdmissionController,
+    AdmissionError,
+    DeadlineExceededError,
+    PriorityQueueFullError,
+)
+from app.archive import TooManyImagesError, is_archive, iter_archive_images
+from app.batching import BatchScheduler
+from app.classifier import CLASS_NAMES_FILE, MAX_TOP_K, CharacterClassifier
+from app.documents import DOCUMENT_CONTENT_TYPES, DocumentError, count_pages
+from app.inference_pool import iter_completed
+from app.jobs import Job, JobInput, JobItem, JobRunner, JobStore
+from app.model_registry import ModelRegistry
+from app.models import (
+    AdmissionStats,
+    BatchingStats,
+    BatchOCRItem,
+    BatchOCRResponse,
+    BoundingBox,
+    CacheStats,
+    ClassifyCandidate,
+    ClassifyResponse,
+    DocumentOCRResponse,
+    DocumentPage,
+    FormTemplate,
+    HealthResponse,
+    JobItemResult,
+    JobResponse,
+    JobStats,
+    ModelHealth,
+    ModelStats,
+    OCRResponse,
+    OCRResult,
+    PreprocessStats,
+    RefineStats,
+    StreamDoneEvent,
+    StreamPageEvent,
+    StreamRegionEvent,
+)
+from app.near_duplicates import (
+    ImageSignature,
+    NearDuplicateIndex,
+    changed_boxes,
+    changed_tiles,
+    image_signature,
+    merge_results,
+    split_results,
+)
+from app.ocr_service import PADDLEOCR_IMPORT_MS, OCRService
+from app.pipeline_options import DEFAULT_OPTIONS, PipelineOptions, filter_confidence
+from app.preprocess import ImageTooLargeError
+from app.result_cache import ResultCache, config_digest, make_cache_key
+from app.serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    columnar_payload,
+    encode,
+    negotiate_media_type,
+    ocr_payload,
+    zone_payload,
+)
+from app.streaming import STREAM_MEDIA_TYPES, encode_event
+from app.zones import TemplateStore, Zone
 
+# Service for the default language (always loaded)
 ocr_service: OCRService | None = None
+model_registry: ModelRegistry | None = None
+batch_schedulers: dict[str, BatchScheduler] = {}
+result_cache: ResultCache | None = None
+# Perceptual index of processed images (None when near-duplicate reuse is off)
+near_duplicates: NearDuplicateIndex | None = None
+# Bounded, prioritized queue in front of all inference work
+admission: AdmissionController | None = None
+# Persistent queue of asynchronous jobs (None unless OCR_JOBS_DIR is set)
+job_store: JobStore | None = None
+job_runner: JobRunner | None = None
+# Saved form templates for region-of-interest OCR
+template_store = TemplateStore(config.TEMPLATES_DIR)
+# Single-character classifier (None when no trained model is available)
+classifier_scheduler: BatchScheduler | None = None
+# Per-language model state ("loading", "ready", "failed") and startup times
+model_status: dict[str, ModelHealth] = {}
+startup_task: asyncio.Task | None = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifecycle management."""
-    global ocr_service
+    """Application lifecycle management.
+
+    Models load in the background so the server accepts connections (and
+    reports progress on /health) immediately.
+    """
+    global model_registry, result_cache, near_duplicates, admission, startup_task
+    global job_store, job_runner
+    global ocr_service, classifier_scheduler
     print("Initializing OCR service...")
-    ocr_service = OCRService(lang="japan")
-    print("OCR service initialized successfully")
+    model_registry = ModelRegistry(
+        load_language,
+        unload_language,
+        memory_budget_mb=config.MODEL_MEMORY_BUDGET_MB,
+        model_memory_mb=config.MODEL_MEMORY_MB * max(1, config.INFERENCE_WORKERS),
+        pinned=(config.OCR_LANG, *config.PINNED_LANGS),
+    )
+    result_cache = ResultCache(
+        max_entries=config.CACHE_MAX_ENTRIES,
+        ttl_seconds=config.CACHE_TTL_SECONDS,
+        disk_dir=config.CACHE_DIR,
+        disk_max_entries=config.CACHE_DISK_MAX_ENTRIES,
+    )
+    if config.NEAR_DUPLICATE_MAX_DISTANCE > 0:
+        near_duplicates = NearDuplicateIndex(
+            max_entries=config.NEAR_DUPLICATE_MAX_ENTRIES,
+            path=config.NEAR_DUPLICATE_INDEX_PATH,
+        )
+        await asyncio.to_thread(near_duplicates.load)
+    admission = AdmissionController(
+        capacity=config.ADMISSION_MAX_INFLIGHT,
+        max_queue=config.ADMISSION_MAX_QUEUE,
+        queue_limits={"batch": config.ADMISSION_MAX_BATCH_QUEUE},
+    )
+    startup_task = asyncio.create_task(load_startup_models())
+    if config.JOBS_DIR:
+        job_store = JobStore(config.JOBS_DIR)
+        job_runner = JobRunner(
+            job_store,
+            process_job_items,
+            workers=config.JOB_WORKERS,
+            chunk_size=config.BATCH_MAX_SIZE,
+            ttl_seconds=config.JOB_TTL_SECONDS,
+        )
+        job_runner.start()
     yield
+    if job_runner is not None:
+        await job_runner.stop()
+        job_store.close()
+        job_runner = job_store = None
+    startup_task.cancel()
+    await asyncio.gather(startup_task, return_exceptions=True)
+    startup_task = None
+    if classifier_scheduler is not None:
+        await classifier_scheduler.stop()
+        classifier_scheduler = None
+    if near_duplicates is not None:
+        await asyncio.to_thread(near_duplicates.save)
+        near_duplicates = None
+    result_cache = None
+    admission = None
     ocr_service = None
+    await model_registry.close()
+    model_registry = None
+    model_status.clear()
+
+
+async def load_startup_models() -> None:
+    """Load the default language, pinned languages and the classifier in parallel."""
+    global ocr_service, classifier_scheduler
+    start = time.perf_counter()
+
+    async def preload(lang: str) -> None:
+        await model_registry.acquire(lang)
+        await model_registry.release(lang)
+
+    pinned = [
+        lang for lang in dict.fromkeys(config.PINNED_LANGS) if lang != config.OCR_LANG
+    ]
+    default, classifier, *_ = await asyncio.gather(
+        model_registry.acquire(config.OCR_LANG),
+        load_classifier(),
+        *(preload(lang) for lang in pinned),
+        return_exceptions=True,
+    )
+    if not isinstance(classifier, BaseException):
+        classifier_scheduler = classifier
+    if isinstance(default, BaseException):
+        print(f"Failed to initialize OCR service: {default!s}")
+        return
+
+    ocr_service = default
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    models = ", ".join(
+        f"{lang}: {status.state}" for lang, status in model_status.items()
+    )
+    print(
+        f"OCR service initialized successfully in {elapsed_ms:.0f} ms "
+        f"(paddleocr import {PADDLEOCR_IMPORT_MS:.0f} ms; "
+        f"{config.INFERENCE_WORKERS} {config.INFERENCE_EXECUTOR} workers; {models})"
+    )
+
+
+async def load_language(lang: str) -> OCRService:
+    """Create the OCR service and batch scheduler for a language."""
+    print(f"Loading OCR model: {lang}")
+    model_status[lang] = ModelHealth(state="loading")
+    start = time.perf_counter()
+    try:
+        service = await create_service(lang)
+    except Exception as e:
+        model_status[lang] = ModelHealth(state="failed", error=str(e))
+        raise
+
+    model_status[lang] = ModelHealth(
+        state="ready",
+        load_ms=service.startup_ms["load"],
+        warmup_ms=service.startup_ms["warmup"],
+        total_ms=(time.perf_counter() - start) * 1000,
+    )
+    print(
+        f"OCR model {lang} ready in {model_status[lang].total_ms:.0f} ms "
+        f"(load {service.startup_ms['load']:.0f} ms, "
+        f"warm-up {service.startup_ms['warmup']:.0f} ms)"
+    )
+    scheduler = BatchScheduler(
+        service,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+        max_concurrent_batches=config.INFERENCE_WORKERS,
+        method_kwargs={"with_info": True},
+    )
+    scheduler.start()
+    batch_schedulers[lang] = scheduler
+    return service
+
+
+async def create_service(lang: str) -> OCRService:
+    """Build an OCR service (loads and warms up its models off the event loop)."""
+    return await asyncio.to_thread(
+        OCRService,
+        lang=lang,
+        executor=config.INFERENCE_EXECUTOR,
+        workers=config.INFERENCE_WORKERS,
+        start_method=config.INFERENCE_START_METHOD,
+        cpu_threads=config.INFERENCE_CPU_THREADS,
+        max_side=config.MAX_SIDE,
+        max_pixels=config.MAX_IMAGE_PIXELS,
+        classifier_dir=classifier_dir(),
+        classifier_format=config.CLASSIFIER_MODEL_FORMAT,
+        refine_threshold=config.REFINE_THRESHOLD,
+        refine_min_confidence=config.REFINE_MIN_CONFIDENCE,
+        refine_max_crops=config.REFINE_MAX_CROPS,
+        rec_model_name=config.REC_MODEL_NAME,
+        warmup_runs=config.WARMUP_RUNS,
+    )
+
+
+def classifier_dir() -> str | None:
+    """Directory of the trained single-character classifier, if there is one."""
+    model_dir = config.CLASSIFIER_MODEL_DIR
+    if not model_dir or not (Path(model_dir) / CLASS_NAMES_FILE).exists():
+        return None
+    return model_dir
+
+
+async def load_classifier() -> BatchScheduler | None:
+    """Load the single-character classifier if a trained model exists."""
+    model_dir = classifier_dir()
+    if model_dir is None:
+        return None
+
+    print(f"Loading character classifier: {model_dir}")
+    try:
+        classifier = await asyncio.to_thread(
+            CharacterClassifier.load, model_dir, config.CLASSIFIER_MODEL_FORMAT
+        )
+    except Exception as e:
+        print(f"Character classifier disabled: {e!s}")
+        return None
+
+    scheduler = BatchScheduler(
+        classifier,
+        max_batch_size=config.CLASSIFIER_BATCH_MAX_SIZE,
+        max_wait_ms=config.CLASSIFIER_BATCH_MAX_WAIT_MS,
+        method_kwargs={"top_k": MAX_TOP_K},
+    )
+    scheduler.start()
+    return scheduler
+
+
+async def unload_language(lang: str, service: OCRService) -> None:
+    """Stop the batch scheduler and workers of an evicted language."""
+    print(f"Unloading OCR model: {lang}")
+    model_status.pop(lang, None)
+    scheduler = batch_schedulers.pop(lang, None)
+    if scheduler is not None:
+        await scheduler.stop()
+    await asyncio.to_thread(service.close)
 
 
 app = FastAPI(
@@ -35,6 +327,78 @@ ALLOWED_CONTENT_TYPES = [
 ]
 
 
+class RequestSizeLimitMiddleware:
+    """Reject request bodies over MAX_REQUEST_BYTES while they are received.
+
+    A declared Content-Length is checked before anything is read; chunked or
+    undeclared bodies are counted as they arrive and aborted with 413 once
+    over the limit, before the rest is spooled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = config.MAX_REQUEST_BYTES
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = -1
+            if declared < 0:
+                response = JSONResponse(
+                    status_code=400,
+                    content={"detail": "Invalid Content-Length header"},
+                )
+                await response(scope, receive, send)
+                return
+            if declared > max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": request_too_large_message(max_bytes)},
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Handled like any HTTPException, also while a form is parsed
+                    raise HTTPException(
+                        status_code=413, detail=request_too_large_message(max_bytes)
+                    )
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+def request_too_large_message(max_bytes: int) -> str:
+    return f"Request body too large: maximum is {max_bytes} bytes"
+
+
+app.add_middleware(RequestSizeLimitMiddleware)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and measure latency per endpoint."""
+    endpoint = metrics.endpoint_label(request)
+    with metrics.track_request(request.method, endpoint) as state:
+        response = await call_next(request)
+        state["status"] = response.status_code
+    return response
+
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint (simple health check)."""
@@ -45,27 +409,181 @@ async def root():
     )
 
 
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Detailed health check."""
+@app.get(
+    "/health",
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse}},
+)
+async def health_check(response: Response):
+    """
+    Detailed health check with per-model readiness.
+
+    Returns 503 until the default language model is loaded and warmed up,
+    so it can be used as a readiness probe.
+    """
+    ready = ocr_service is not None and ocr_service.is_ready
+    default = model_status.get(config.OCR_LANG)
+    if ready:
+        status = "ok"
+    elif default is not None and default.state == "failed":
+        status = "error"
+    else:
+        status = "starting"
+
+    if not ready:
+        response.status_code = 503
     return HealthResponse(
-        status="ok",
-        ocr_ready=ocr_service is not None and ocr_service.is_ready,
+        status=status,
+        ocr_ready=ready,
         version="1.0.0",
+        models=model_status,
+    )
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics."""
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
+
+@app.get("/stats/batching", response_model=BatchingStats)
+async def batching_stats(lang: str = Query(config.OCR_LANG)):
+    """Micro-batching queue depth, batch-size histogram and wait times."""
+    scheduler = batch_schedulers.get(lang)
+    if scheduler is None:
+        raise HTTPException(status_code=404, detail=f"Language not loaded: {lang}")
+    return BatchingStats(**scheduler.stats())
+
+
+@app.get("/stats/models", response_model=ModelStats)
+async def model_stats():
+    """Loaded OCR models and memory accounting."""
+    if model_registry is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+    return ModelStats(**model_registry.stats())
+
+
+@app.get("/stats/cache", response_model=CacheStats)
+async def cache_stats():
+    """Result cache hit/miss counters."""
+    if result_cache is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+    stats = result_cache.stats()
+    if near_duplicates is not None:
+        stats["near_duplicates"] = near_duplicates.stats()
+    return CacheStats(**stats)
+
+
+@app.get("/stats/admission", response_model=AdmissionStats)
+async def admission_stats():
+    """Admission control capacity, queue depth and rejections."""
+    if admission is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+    return AdmissionStats(**admission.stats())
+
+
+@app.get("/stats/jobs", response_model=JobStats)
+async def job_stats():
+    """Asynchronous job queue size."""
+    store = get_job_store()
+    return JobStats(**await asyncio.to_thread(store.stats))
+
+
+def ocr_lang(
+    lang: str = Query(config.OCR_LANG, description="OCR language (one of OCR_LANGS)"),
+) -> str:
+    """Language of an OCR request, checked against the allowed languages."""
+    if lang not in config.LANGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language: {lang}. "
+            f"Allowed languages: {', '.join(config.LANGS)}",
+        )
+    return lang
+
+
+def pipeline_options(
+    orientation: Literal["auto", "off"] = Query(
+        "auto", description="off skips document and textline orientation"
+    ),
+    unwarp: Literal["auto", "off"] = Query(
+        "auto", description="off skips document unwarping"
+    ),
+    det_limit_side_len: int | None = Query(None, ge=32, le=4096),
+    det_limit_type: Literal["max", "min"] | None = Query(None),
+    rec_batch_size: int | None = Query(None, ge=1),
+) -> PipelineOptions:
+    """Pipeline settings from the query parameters of an OCR request."""
+    if rec_batch_size is not None and rec_batch_size not in config.REC_BATCH_SIZES:
+        allowed = ", ".join(map(str, config.REC_BATCH_SIZES)) or "none"
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unsupported rec_batch_size: {rec_batch_size} (allowed: {allowed})",
+        )
+    return PipelineOptions(
+        orientation=orientation,
+        unwarp=unwarp,
+        det_limit_side_len=det_limit_side_len,
+        det_limit_type=det_limit_type,
+        rec_batch_size=rec_batch_size,
     )
 
 
-@app.post("/ocr", response_model=OCRResponse)
-async def perform_ocr(file: UploadFile = File(...)):
+@app.post(
+    "/ocr",
+    response_model=OCRResponse,
+    responses={200: {"content": {COLUMNAR_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}}}},
+)
+async def perform_ocr(
+    request: Request,
+    file: UploadFile = File(...),
+    lang: str = Depends(ocr_lang),
+    use_cache: bool = Query(True),
+    zones: str | None = Form(
+        None, description="FormTemplate JSON: only OCR these regions"
+    ),
+    template: str | None = Query(None),
+    options: PipelineOptions = Depends(pipeline_options),
+    min_confidence: float = Query(0.0, ge=0, le=1),
+):
     """
     Perform OCR on uploaded image file.
 
     - **file**: Image file (JPEG, PNG, GIF, BMP, WebP)
+    - **lang**: OCR language ("japan", "ch", "en", etc.); loaded on first use
+    - **use_cache**: Reuse results of byte-identical images, and with
+      OCR_NEAR_DUPLICATE_MAX_DISTANCE of re-scanned or re-compressed ones
+      (only changed areas are OCRed again); false bypasses the cache
+    - **zones**: Form field with a FormTemplate JSON object
+      (``{"zones": [{"name": ..., "box": [x0, y0, x1, y1]}, ...]}``)
+    - **template**: Name of a saved form template (see PUT /templates/{name})
+    - **orientation**, **unwarp**: "off" skips orientation classification or
+      document unwarping, for upright and flat scans
+    - **det_limit_side_len**, **det_limit_type**: Resize images for text
+      detection so their longest ("max") or shortest ("min") side is this long
+    - **rec_batch_size**: Text lines per recognition batch (one of
+      OCR_REC_BATCH_SIZES)
+    - **min_confidence**: Leave out regions scoring below this
+
+    With zones or a template only those regions are processed: single-line
+    zones skip text detection entirely. Results are also returned keyed by
+    zone name, with coordinates on the full page.
+
+    The response format follows the Accept header: JSON (default),
+    ``application/vnd.ocr.columnar+json`` (parallel arrays of texts, scores
+    and flat rounded polygon coordinates) or ``application/msgpack`` (the
+    columnar body with float32/int16 arrays as raw bytes; needs msgpack).
+
+    Requests wait in the admission queue ahead of batch jobs. When the queue
+    is full the request fails at once with 503 and Retry-After; work not
+    started before the X-Request-Timeout header (seconds) or
+    OCR_REQUEST_TIMEOUT_SECONDS expires is dropped with 504.
 
     Returns:
         OCRResponse: Recognized text and coordinate information
     """
-    if ocr_service is None:
+    if model_registry is None:
         raise HTTPException(status_code=503, detail="OCR service is not initialized")
 
     if file.content_type not in ALLOWED_CONTENT_TYPES:
@@ -74,40 +592,1071 @@ async def perform_ocr(file: UploadFile = File(...)):
             detail=f"Unsupported file type: {file.content_type}. "
             f"Allowed types: {', '.join(ALLOWED_CONTENT_TYPES)}",
         )
+    check_upload_size(file)
+    deadline = request_deadline(request, config.REQUEST_TIMEOUT_SECONDS)
+    form_template = await resolve_form_template(zones, template)
+
+    try:
+        service = await model_registry.acquire(lang)
+    except Exception as e:
+        await file.close()
+        raise HTTPException(
+            status_code=400, detail=f"Failed to load OCR model for {lang}: {e!s}"
+        )
+
+    try:
+        # Workers decode straight from the spooled upload (process workers
+        # get it copied into shared memory, not read into bytes here first)
+        source = file.file
+
+        ocr_config = service.config
+        if not options.is_default:
+            ocr_config = {**ocr_config, "pipeline": options.changed()}
+        if form_template is not None:
+            ocr_config = {
+                **ocr_config,
+                "rec_model": service.rec_model_name,
+                "zones": form_template.model_dump(),
+            }
+        cache_key = await asyncio.to_thread(make_cache_key, source, ocr_config)
+        ocr_results = await result_cache.get_async(cache_key) if use_cache else None
+        preprocess_info = None
+        signature = None
+
+        # Near-duplicate reuse is a form of caching: skipped with use_cache=false
+        if (
+            ocr_results is None
+            and use_cache
+            and form_template is None
+            and near_duplicates is not None
+        ):
+            signature = await asyncio.to_thread(
+                image_signature, source, config.MAX_IMAGE_PIXELS
+            )
+            reused = await reuse_near_duplicate(
+                service, source, signature, ocr_config, deadline, options
+            )
+            if reused is not None:
+                ocr_results, preprocess_info = reused
+                await result_cache.set_async(cache_key, ocr_results)
+
+        if ocr_results is None:
+            async with admission_slot("interactive", deadline=deadline):
+                if form_template is None:
+                    ocr_results, preprocess_info = await batch_schedulers[lang].submit(
+                        source, deadline, options
+                    )
+                else:
+                    ocr_results, preprocess_info = await service.run(
+                        "process_zones",
+                        source,
+                        [zone.to_zone() for zone in form_template.zones],
+                        form_template.relative,
+                        with_info=True,
+                        options=options,
+                    )
+            regions = (
+                len(ocr_results)
+                if form_template is None
+                else sum(len(results) for results in ocr_results.values())
+            )
+            metrics.observe_inference(preprocess_info, regions, file.size)
+            await result_cache.set_async(cache_key, ocr_results)
+
+        if signature is not None:
+            await near_duplicates.add_async(
+                cache_key, config_digest(ocr_config), signature
+            )
+        return encode_ocr_response(
+            filter_confidence(ocr_results, min_confidence),
+            preprocess_info,
+            negotiate_media_type(request.headers.get("accept")),
+        )
+
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (AdmissionError, DeadlineExceededError) as e:
+        raise admission_http_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {e!s}")
+    finally:
+        await file.close()
+        await model_registry.release(lang)
+
+
+async def reuse_near_duplicate(
+    service: OCRService,
+    source,
+    signature: ImageSignature,
+    ocr_config: dict,
+    deadline: float | None = None,
+    options: PipelineOptions = DEFAULT_OPTIONS,
+) -> tuple[list, dict | None] | None:
+    """
+    Reuse the result of a previously processed near-duplicate image.
+
+    Areas that differ from the earlier image are OCRed again as multiline
+    zones; everything else keeps the earlier result, scaled to this image.
+
+    Returns:
+        (results, preprocessing info or None when nothing was OCRed), or None
+        without a near duplicate whose result is still cached
+    """
+    candidates = near_duplicates.find(
+        signature, config_digest(ocr_config), config.NEAR_DUPLICATE_MAX_DISTANCE
+    )
+    for entry in candidates:
+        previous = await result_cache.get_async(entry.cache_key)
+        if previous is None:
+            near_duplicates.remove(entry.cache_key)
+            continue
+        tiles = await asyncio.to_thread(
+            changed_tiles, entry.signature, signature, config.NEAR_DUPLICATE_TILE_PIXELS
+        )
+        if tiles.mean() > config.NEAR_DUPLICATE_MAX_CHANGED:
+            continue
+
+        boxes = changed_boxes(tiles, signature)
+        kept, boxes = split_results(previous, entry.signature, signature, boxes)
+        if not boxes:
+            near_duplicates.hits += 1
+            return kept, None
+
+        zones = [
+            Zone.from_box(f"changed-{i}", box, multiline=True)
+            for i, box in enumerate(boxes)
+        ]
+        async with admission_slot("interactive", deadline=deadline):
+            zone_results, info = await service.run(
+                "process_zones", source, zones, with_info=True, options=options
+            )
+        reread = [item for results in zone_results.values() for item in results]
+        metrics.observe_inference(info, len(reread))
+        near_duplicates.partial_hits += 1
+        return merge_results(kept, reread), info
+
+    near_duplicates.misses += 1
+    return None
+
+
+@app.get("/templates", response_model=list[str])
+async def list_templates():
+    """Names of the saved form templates."""
+    return await asyncio.to_thread(template_store.names)
+
+
+@app.get("/templates/{name}", response_model=FormTemplate)
+async def get_template(name: str):
+    """Get a saved form template."""
+    return await load_template(name)
+
+
+@app.put("/templates/{name}", response_model=FormTemplate)
+async def save_template(name: str, form_template: FormTemplate):
+    """
+    Save a form template for region-of-interest OCR.
+
+    Use it with POST /ocr?template={name}.
+    """
+    try:
+        await asyncio.to_thread(
+            template_store.save, name, form_template.model_dump(exclude_none=True)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return form_template
+
+
+@app.delete("/templates/{name}", status_code=204)
+async def delete_template(name: str):
+    """Delete a saved form template."""
+    try:
+        deleted = await asyncio.to_thread(template_store.delete, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Template not found: {name}")
+    return Response(status_code=204)
+
+
+async def load_template(name: str) -> FormTemplate:
+    """Read and validate a saved form template (404 if missing)."""
+    try:
+        data = await asyncio.to_thread(template_store.get, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Template not found: {name}")
+    return FormTemplate.model_validate(data)
+
+
+async def resolve_form_template(
+    zones: str | None, template: str | None
+) -> FormTemplate | None:
+    """Zones of a region-of-interest request, or None for full-page OCR."""
+    if zones is not None and template is not None:
+        raise HTTPException(
+            status_code=400, detail="Give either zones or template, not both"
+        )
+    if template is not None:
+        return await load_template(template)
+    if zones is None:
+        return None
+    try:
+        return FormTemplate.model_validate_json(zones)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zones: {e!s}")
+
+
+@app.post("/classify", response_model=ClassifyResponse)
+async def classify_character(
+    request: Request,
+    file: UploadFile = File(...),
+    top_k: int = Query(5, ge=1, le=MAX_TOP_K),
+    min_confidence: float = Query(config.CLASSIFIER_MIN_CONFIDENCE, ge=0, le=1),
+    fallback: bool = Query(True),
+    lang: str = Depends(ocr_lang),
+):
+    """
+    Recognize an image containing a single character.
+
+    - **file**: Image file (JPEG, PNG, GIF, BMP, WebP) of one character
+    - **top_k**: Number of candidate characters to return
+    - **min_confidence**: Minimum classifier score to accept its answer
+    - **fallback**: Run full OCR when the classifier is unsure or unavailable
+    - **lang**: OCR language used for the fallback
+
+    Returns:
+        ClassifyResponse: Best character, candidates, and the OCR results
+        when full OCR was used
+    """
+    if file.content_type not in ALLOWED_CONTENT_TYPES:
+        await file.close()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file.content_type}. "
+            f"Allowed types: {', '.join(ALLOWED_CONTENT_TYPES)}",
+        )
+    try:
+        check_upload_size(file)
+        contents = await file.read()
+    finally:
+        await file.close()
+
+    candidates: list[ClassifyCandidate] = []
+    if classifier_scheduler is not None:
+        try:
+            with metrics.time_stage("classify"):
+                output = await classifier_scheduler.submit(contents)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid image: {e!s}")
+        candidates = [
+            ClassifyCandidate(char=char, confidence=score)
+            for char, score in output[:top_k]
+        ]
+        if candidates[0].confidence >= min_confidence:
+            return ClassifyResponse(
+                success=True,
+                source="classifier",
+                text=candidates[0].char,
+                confidence=candidates[0].confidence,
+                candidates=candidates,
+            )
+
+    if not fallback:
+        if classifier_scheduler is None:
+            raise HTTPException(
+                status_code=503, detail="Character classifier is not available"
+            )
+        return ClassifyResponse(
+            success=False,
+            source="classifier",
+            text="",
+            confidence=candidates[0].confidence,
+            candidates=candidates,
+            message=f"Classifier confidence is below {min_confidence}",
+        )
+
+    if model_registry is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+
+    deadline = request_deadline(request, config.REQUEST_TIMEOUT_SECONDS)
+    try:
+        async with (
+            model_registry.use(lang),
+            admission_slot("interactive", deadline=deadline),
+        ):
+            ocr_results, info = await batch_schedulers[lang].submit(contents, deadline)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (AdmissionError, DeadlineExceededError) as e:
+        raise admission_http_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {e!s}")
+    metrics.observe_inference(info, len(ocr_results), len(contents))
+
+    response = build_ocr_response(ocr_results)
+    return ClassifyResponse(
+        success=True,
+        source="ocr",
+        text=response.full_text,
+        confidence=max((r.confidence for r in response.results), default=0.0),
+        candidates=candidates,
+        results=response.results,
+        message=response.message,
+    )
+
+
+@app.post("/ocr/batch", response_model=BatchOCRResponse)
+async def perform_batch_ocr(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    options: PipelineOptions = Depends(pipeline_options),
+    min_confidence: float = Query(0.0, ge=0, le=1),
+):
+    """
+    Perform OCR on many images in one request.
+
+    - **files**: Image files and/or zip/tar archives of images
+    - Pipeline options and **min_confidence** as for /ocr
+
+    Errors are reported per file; one bad image does not fail the request.
+    Batch work has lower priority than single-image requests; the request
+    fails with 429 or 503 and Retry-After when the admission queue is full.
+
+    Returns:
+        BatchOCRResponse: One OCR result per image, tied to its filename
+    """
+    if ocr_service is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+
+    try:
+        check_admission("batch")
+        deadline = request_deadline(request)
+        entries = await read_batch_entries(files)
+    finally:
+        for file in files:
+            await file.close()
+
+    outputs = await process_batch_entries(entries, deadline, options)
+
+    items: list[BatchOCRItem] = []
+    for (filename, _), output in zip(entries, outputs):
+        if isinstance(output, Exception):
+            items.append(
+                BatchOCRItem(
+                    filename=filename,
+                    success=False,
+                    results=[],
+                    full_text="",
+                    message=str(output),
+                )
+            )
+        else:
+            response = build_ocr_response(filter_confidence(output, min_confidence))
+            items.append(BatchOCRItem(filename=filename, **response.model_dump()))
+
+    succeeded = sum(item.success for item in items)
+    return BatchOCRResponse(
+        success=succeeded == len(items),
+        items=items,
+        message=f"Processed {succeeded}/{len(items)} images successfully",
+    )
+
+
+@app.post("/ocr/batch/stream")
+async def stream_batch_ocr(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    format: Literal["ndjson", "sse"] = Query("ndjson"),
+    regions: bool = Query(False),
+    options: PipelineOptions = Depends(pipeline_options),
+    min_confidence: float = Query(0.0, ge=0, le=1),
+):
+    """
+    Perform OCR on many images and stream results as each page finishes.
+
+    - **files**: Image files and/or zip/tar archives of images
+    - **format**: "ndjson" (one JSON object per line) or "sse" (Server-Sent Events)
+    - **regions**: Also emit one "region" event per detected text region.
+      Page events then carry only the summary, not the regions again.
+    - Pipeline options and **min_confidence** as for /ocr
+
+    Returns:
+        Stream of "region", "page" and a final "done" event
+    """
+    if ocr_service is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+
+    try:
+        check_admission("batch")
+        deadline = request_deadline(request)
+        entries = await read_batch_entries(files)
+    finally:
+        for file in files:
+            await file.close()
+
+    return StreamingResponse(
+        stream_batch_events(
+            entries, format, regions, deadline, options, min_confidence
+        ),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
+
+
+async def stream_batch_events(
+    entries: list[tuple[str, bytes | Exception]],
+    stream_format: str,
+    regions: bool,
+    deadline: float | None = None,
+    options: PipelineOptions = DEFAULT_OPTIONS,
+    min_confidence: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """Encode batch results as stream events as soon as each page is done."""
+    succeeded = 0
+
+    async for i, output in iter_batch_outputs(entries, deadline, options):
+        filename = entries[i][0]
+        # Release the image bytes once processed to keep memory flat
+        entries[i] = (filename, None)
+
+        if isinstance(output, Exception):
+            page = StreamPageEvent(
+                index=i,
+                filename=filename,
+                success=False,
+                results=[],
+                full_text="",
+                message=str(output),
+            )
+        else:
+            response = build_ocr_response(filter_confidence(output, min_confidence))
+            if regions:
+                for result in response.results:
+                    yield encode_event(
+                        StreamRegionEvent(index=i, filename=filename, result=result),
+                        stream_format,
+                    )
+                response.results = []
+            page = StreamPageEvent(index=i, filename=filename, **response.model_dump())
+            succeeded += 1
+
+        yield encode_event(page, stream_format)
+
+    yield encode_event(
+        StreamDoneEvent(total=len(entries), succeeded=succeeded), stream_format
+    )
+
+
+@app.post("/ocr/document", response_model=DocumentOCRResponse)
+async def perform_document_ocr(
+    request: Request,
+    file: UploadFile = File(...),
+    dpi: int = Query(config.PDF_DPI, ge=36, le=600),
+    options: PipelineOptions = Depends(pipeline_options),
+    min_confidence: float = Query(0.0, ge=0, le=1),
+):
+    """
+    Perform OCR on every page of a multi-page document.
+
+    - **file**: PDF, multi-page TIFF, animated GIF or single image
+    - **dpi**: Rasterization resolution for PDF pages
+    - Pipeline options and **min_confidence** as for /ocr
+
+    Pages are decoded lazily and processed in parallel across the inference
+    pool; a failing page is reported without failing the whole document.
+
+    Returns:
+        DocumentOCRResponse: One OCR result per page
+    """
+    if ocr_service is None:
+        raise HTTPException(status_code=503, detail="OCR service is not initialized")
+
+    if file.content_type not in DOCUMENT_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file.content_type}. "
+            f"Allowed types: {', '.join(DOCUMENT_CONTENT_TYPES)}",
+        )
 
     try:
+        check_upload_size(file)
+        check_admission("batch")
+        deadline = request_deadline(request)
         contents = await file.read()
+    finally:
+        await file.close()
+
+    try:
+        page_count = await asyncio.to_thread(count_pages, contents)
+    except (DocumentError, UnidentifiedImageError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid document: {e!s}")
+
+    if page_count > config.DOCUMENT_MAX_PAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many pages: maximum is {config.DOCUMENT_MAX_PAGES}",
+        )
+
+    # Placed in shared memory once instead of being sent along with every page
+    async with ocr_service.shared_async(contents) as shared_contents:
+        jobs = (
+            (
+                i,
+                run_admitted(
+                    partial(
+                        ocr_service.run,
+                        "process_document_page",
+                        shared_contents,
+                        i,
+                        dpi,
+                        with_info=True,
+                        options=options,
+                    ),
+                    "batch",
+                    deadline=deadline,
+                ),
+            )
+            for i in range(page_count)
+        )
+        pages: list[DocumentPage] = []
+        async for i, output in iter_completed(jobs, ocr_service.workers):
+            if isinstance(output, Exception):
+                pages.append(
+                    DocumentPage(
+                        page=i + 1,
+                        success=False,
+                        results=[],
+                        full_text="",
+                        message=f"OCR processing failed: {output!s}",
+                    )
+                )
+            else:
+                ocr_results, info = output
+                metrics.observe_inference(info, len(ocr_results))
+                response = build_ocr_response(
+                    filter_confidence(ocr_results, min_confidence)
+                )
+                pages.append(DocumentPage(page=i + 1, **response.model_dump()))
+
+    pages.sort(key=lambda page: page.page)
+    succeeded = sum(page.success for page in pages)
+    return DocumentOCRResponse(
+        success=succeeded == page_count,
+        page_count=page_count,
+        pages=pages,
+        message=f"Processed {succeeded}/{page_count} pages successfully",
+    )
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(
+    response: Response,
+    files: list[UploadFile] = File(...),
+    lang: str = Depends(ocr_lang),
+    dpi: int = Query(config.PDF_DPI, ge=36, le=600),
+):
+    """
+    Queue images and documents for OCR in the background.
+
+    - **files**: Image files, zip/tar archives of images, and multi-page
+      documents (PDF, TIFF)
+    - **lang**: OCR language ("japan", "ch", "en", etc.)
+    - **dpi**: Rasterization resolution for PDF pages
+
+    Inputs are stored on disk, so queued work survives restarts. Poll
+    GET /jobs/{id} for progress and results.
+
+    Returns:
+        JobResponse: The queued job (HTTP 202, Location points to the job)
+    """
+    store = get_job_store()
+    try:
+        job_id = await asyncio.to_thread(
+            store.create, lang, dpi, partial(add_job_inputs, files)
+        )
+    finally:
+        for file in files:
+            await file.close()
+
+    job_runner.notify()
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return build_job_response(await asyncio.to_thread(store.get, job_id), [])
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=0, le=1000),
+):
+    """
+    Get the progress of a job and one page of its results.
+
+    - **offset**: Index of the first item to return
+    - **limit**: Maximum number of items to return (0 for progress only)
+
+    Results are read from disk page by page; follow ``next_offset`` to
+    fetch the rest.
+    """
+    store = get_job_store()
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    items = await asyncio.to_thread(store.results, job_id, offset, limit)
+    return build_job_response(job, items, offset)
+
 
-        ocr_results = ocr_service.process_image(contents)
+@app.delete("/jobs/{job_id}", status_code=204)
+async def delete_job(job_id: str):
+    """Cancel a job and delete its inputs and results."""
+    store = get_job_store()
+    if not await asyncio.to_thread(store.delete, job_id):
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return Response(status_code=204)
 
-        results: list[OCRResult] = []
-        texts: list[str] = []
 
-        for item in ocr_results:
-            if item is None:
+def get_job_store() -> JobStore:
+    if job_store is None:
+        raise HTTPException(status_code=503, detail="Job queue is not enabled")
+    return job_store
+
+
+def add_job_inputs(files: list[UploadFile], inputs: JobInput) -> None:
+    """
+    Store uploaded files as job inputs (runs in a worker thread).
+
+    Images are copied from the spooled upload without reading them into
+    memory; documents are split into one item per page.
+    """
+    for file in files:
+        filename = file.filename or f"file{len(inputs.items)}"
+        if file.size is not None and file.size > config.MAX_UPLOAD_BYTES:
+            inputs.add_error(filename, upload_too_large_message(file))
+        elif is_archive(file.filename, file.content_type):
+            try:
+                for name, data in iter_archive_images(
+                    file.file.read(), config.BATCH_MAX_FILES, config.MAX_UPLOAD_BYTES
+                ):
+                    if isinstance(data, Exception):
+                        inputs.add_error(f"{filename}/{name}", str(data))
+                    else:
+                        inputs.add_file(f"{filename}/{name}", data)
+            except Exception as e:
+                inputs.add_error(filename, f"Invalid archive: {e!s}")
+        elif file.content_type in ALLOWED_CONTENT_TYPES:
+            inputs.add_file(filename, file.file)
+        elif file.content_type in DOCUMENT_CONTENT_TYPES:
+            data = file.file.read()
+            try:
+                page_count = count_pages(data)
+            except (DocumentError, UnidentifiedImageError) as e:
+                inputs.add_error(filename, f"Invalid document: {e!s}")
                 continue
+            if page_count > config.DOCUMENT_MAX_PAGES:
+                inputs.add_error(
+                    filename, f"Too many pages: maximum is {config.DOCUMENT_MAX_PAGES}"
+                )
+            else:
+                inputs.add_file(filename, data, pages=page_count)
+        else:
+            inputs.add_error(filename, f"Unsupported file type: {file.content_type}")
+
+        if len(inputs.items) > config.JOB_MAX_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many images and pages: maximum is {config.JOB_MAX_ITEMS}",
+            )
+
+
+async def process_job_items(job: Job, items: list[JobItem]) -> list:
+    """
+    Run OCR on a chunk of job items claimed by the job runner.
+
+    Images share one batched predict() call; document pages run one by one.
+    All work is admitted at batch priority, behind interactive requests.
 
-            bbox, (text, confidence) = item
-            results.append(
-                OCRResult(
-                    text=text,
-                    confidence=confidence,
-                    bounding_box=BoundingBox(points=bbox),
+    Returns:
+        One entry per item: OCR results or the exception for that item
+    """
+    async with model_registry.use(job.lang) as service:
+        data = await asyncio.to_thread(
+            lambda: {item.input_path: job_store.read_input(item) for item in items}
+        )
+        images = [i for i, item in enumerate(items) if item.page is None]
+        calls: list[tuple[list[int], bool, Awaitable]] = []
+        if images:
+            call = partial(
+                service.run,
+                "process_images",
+                [data[items[i].input_path] for i in images],
+                with_info=True,
+            )
+            calls.append((images, True, run_admitted(call, "batch", len(images))))
+        async with AsyncExitStack() as stack:
+            # Pages of one document share a single copy of it
+            documents = {}
+            for item in items:
+                if item.page is not None and item.input_path not in documents:
+                    documents[item.input_path] = await stack.enter_async_context(
+                        service.shared_async(data[item.input_path])
+                    )
+            for i, item in enumerate(items):
+                if item.page is not None:
+                    call = partial(
+                        service.run,
+                        "process_document_page",
+                        documents[item.input_path],
+                        item.page,
+                        job.dpi,
+                        with_info=True,
+                    )
+                    calls.append(([i], False, run_admitted(call, "batch")))
+
+            results = await asyncio.gather(
+                *(awaitable for _, _, awaitable in calls), return_exceptions=True
+            )
+
+    outputs: list = [None] * len(items)
+    for (indices, batched, _), result in zip(calls, results):
+        if isinstance(result, Exception):
+            result = [result] * len(indices)
+        elif not batched:
+            result = [result]
+        for i, output in zip(indices, result):
+            if isinstance(output, Exception):
+                outputs[i] = RuntimeError(f"OCR processing failed: {output!s}")
+                continue
+            ocr_results, info = output
+            metrics.observe_inference(info, len(ocr_results))
+            outputs[i] = ocr_results
+    return outputs
+
+
+def build_job_response(job: Job, items: list[dict], offset: int = 0) -> JobResponse:
+    """Build a JobResponse from job progress and a page of stored results."""
+    results = []
+    for item in items:
+        if item["state"] == "done":
+            response = build_ocr_response(item["result"])
+        else:
+            response = OCRResponse(
+                success=False, results=[], full_text="", message=item["message"]
+            )
+        results.append(
+            JobItemResult(
+                index=item["index"],
+                filename=item["filename"],
+                page=None if item["page"] is None else item["page"] + 1,
+                state=item["state"],
+                **response.model_dump(),
+            )
+        )
+
+    next_offset = offset + len(items)
+    return JobResponse(
+        id=job.id,
+        status=job.status,
+        lang=job.lang,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        total=job.total,
+        pending=job.pending,
+        running=job.running,
+        succeeded=job.succeeded,
+        failed=job.failed,
+        items=results,
+        next_offset=next_offset if items and next_offset < job.total else None,
+    )
+
+
+async def read_batch_entries(
+    files: list[UploadFile],
+) -> list[tuple[str, bytes | Exception]]:
+    """
+    Expand uploaded files and archives into (filename, image bytes) entries.
+
+    Files that cannot be used carry the error instead of image bytes.
+    """
+    entries: list[tuple[str, bytes | Exception]] = []
+
+    for file in files:
+        filename = file.filename or f"file{len(entries)}"
+        if file.size is not None and file.size > config.MAX_UPLOAD_BYTES:
+            entries.append((filename, ValueError(upload_too_large_message(file))))
+            continue
+        contents = await file.read()
+
+        if is_archive(file.filename, file.content_type):
+            try:
+                # Decompressing blocks, so it runs off the event loop
+                members = await asyncio.to_thread(
+                    extract_archive_images,
+                    contents,
+                    config.BATCH_MAX_FILES - len(entries),
+                )
+            except TooManyImagesError:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Too many images: maximum is {config.BATCH_MAX_FILES}",
                 )
+            except Exception as e:
+                entries.append((filename, ValueError(f"Invalid archive: {e!s}")))
+            else:
+                entries.extend((f"{filename}/{name}", data) for name, data in members)
+        elif file.content_type not in ALLOWED_CONTENT_TYPES:
+            entries.append(
+                (filename, ValueError(f"Unsupported file type: {file.content_type}"))
             )
-            texts.append(text)
+        else:
+            entries.append((filename, contents))
+
+        if len(entries) > config.BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many images: maximum is {config.BATCH_MAX_FILES}",
+            )
+
+    return entries
+
+
+def extract_archive_images(
+    data: bytes, max_files: int
+) -> list[tuple[str, bytes | Exception]]:
+    """Extract the images of an archive, each limited to MAX_UPLOAD_BYTES."""
+    return list(iter_archive_images(data, max_files, config.MAX_UPLOAD_BYTES))
+
+
+async def process_batch_entries(
+    entries: list[tuple[str, bytes | Exception]],
+    deadline: float | None = None,
+    options: PipelineOptions = DEFAULT_OPTIONS,
+) -> list:
+    """
+    Run batched inference over batch entries.
+
+    Returns:
+        One entry per input: OCR results or the exception for that entry
+    """
+    outputs: list = [None] * len(entries)
+    async for i, output in iter_batch_outputs(entries, deadline, options):
+        outputs[i] = output
+    return outputs
+
+
+async def iter_batch_outputs(
+    entries: list[tuple[str, bytes | Exception]],
+    deadline: float | None = None,
+    options: PipelineOptions = DEFAULT_OPTIONS,
+) -> AsyncIterator[tuple[int, list | Exception]]:
+    """
+    Run batched inference over batch entries, yielding results as they finish.
+
+    Images are split into chunks of BATCH_MAX_SIZE, each processed with a
+    single predict() call. At most one chunk per inference worker is in
+    flight, so finished results can be consumed before later chunks start.
+    Every chunk is admitted separately at batch priority, so single-image
+    requests arriving meanwhile run between chunks.
+
+    Yields:
+        (entry index, OCR results or the exception for that entry)
+    """
+    indices: list[int] = []
+    for i, (_, data) in enumerate(entries):
+        if isinstance(data, Exception):
+            yield i, data
+        else:
+            indices.append(i)
+
+    chunks = (
+        indices[start : start + config.BATCH_MAX_SIZE]
+        for start in range(0, len(indices), config.BATCH_MAX_SIZE)
+    )
+    jobs = (
+        (
+            chunk,
+            run_admitted(
+                partial(
+                    ocr_service.run,
+                    "process_images",
+                    [entries[i][1] for i in chunk],
+                    with_info=True,
+                    options=options,
+                ),
+                "batch",
+                cost=len(chunk),
+                deadline=deadline,
+            ),
+        )
+        for chunk in chunks
+    )
+
+    async for chunk, result in iter_completed(jobs, ocr_service.workers):
+        if isinstance(result, Exception):
+            result = [result] * len(chunk)
+        for i, output in zip(chunk, result):
+            if isinstance(output, Exception):
+                yield i, RuntimeError(f"OCR processing failed: {output!s}")
+                continue
+            ocr_results, info = output
+            metrics.observe_inference(info, len(ocr_results), len(entries[i][1]))
+            yield i, ocr_results
+
+
+def request_deadline(request: Request, default: float = 0) -> float | None:
+    """
+    Deadline of a request as a time.monotonic() value.
+
+    The client's timeout comes from the X-Request-Timeout header (seconds);
+    ``default`` applies without the header. 0 means no deadline.
+    """
+    header = request.headers.get("x-request-timeout")
+    try:
+        timeout = float(header) if header else default
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid X-Request-Timeout header: {header}"
+        )
+    return time.monotonic() + timeout if timeout > 0 else None
+
+
+@asynccontextmanager
+async def admission_slot(
+    priority: str, cost: int = 1, deadline: float | None = None
+) -> AsyncIterator[None]:
+    """Hold inference capacity, recording admission waits and rejections."""
+    start = time.perf_counter()
+    try:
+        async with admission.slot(priority, cost, deadline):
+            metrics.ADMISSION_WAIT.labels(priority).observe(time.perf_counter() - start)
+            yield
+    except (AdmissionError, DeadlineExceededError) as e:
+        metrics.ADMISSION_REJECTED.labels(priority, rejection_reason(e)).inc()
+        raise
+
+
+async def run_admitted(
+    call: Callable[[], Awaitable],
+    priority: str,
+    cost: int = 1,
+    deadline: float | None = None,
+):
+    """Start an inference call once admitted (admission errors are its result)."""
+    async with admission_slot(priority, cost, deadline):
+        return await call()
+
+
+def check_admission(priority: str) -> None:
+    """Fail fast with 429/503 when new work of ``priority`` would be rejected."""
+    try:
+        admission.check(priority)
+    except AdmissionError as e:
+        metrics.ADMISSION_REJECTED.labels(priority, rejection_reason(e)).inc()
+        raise admission_http_error(e)
+
+
+def rejection_reason(error: Exception) -> str:
+    if isinstance(error, DeadlineExceededError):
+        return "deadline"
+    if isinstance(error, PriorityQueueFullError):
+        return "priority_queue_full"
+    return "queue_full"
+
+
+def admission_http_error(error: Exception) -> HTTPException:
+    """503/429 with Retry-After for rejected work, 504 for expired work."""
+    if isinstance(error, AdmissionError):
+        return HTTPException(
+            status_code=error.status_code,
+            detail=str(error),
+            headers={"Retry-After": str(error.retry_after)},
+        )
+    return HTTPException(status_code=504, detail=str(error))
+
+
+def check_upload_size(file: UploadFile) -> None:
+    """
+    Reject an upload larger than MAX_UPLOAD_BYTES before decoding it.
+
+    The part is already spooled by then; RequestSizeLimitMiddleware bounds
+    what is received in the first place.
+    """
+    if file.size is not None and file.size > config.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=upload_too_large_message(file))
+
+
+def upload_too_large_message(file: UploadFile) -> str:
+    return (
+        f"File too large: {file.size} bytes "
+        f"(maximum is {config.MAX_UPLOAD_BYTES} bytes)"
+    )
+
+
+def build_ocr_response(ocr_results: list) -> OCRResponse:
+    """Build an OCRResponse from results in [[bbox, (text, confidence)], ...] format."""
+    with metrics.time_stage("serialize"):
+        results = list(iter_ocr_results(ocr_results))
 
         return OCRResponse(
             success=True,
             results=results,
-            full_text="\n".join(texts),
+            full_text="\n".join(result.text for result in results),
             message=f"Detected {len(results)} text regions",
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OCR processing failed: {e!s}")
-    finally:
-        await file.close()
+
+def encode_ocr_response(
+    ocr_results: list | dict[str, list],
+    preprocess_info: dict | None,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> Response:
+    """
+    Encode /ocr results (a list, or {zone name: results}) as the media type.
+
+    The body is built from plain lists and dicts rather than per-region
+    models, which dominates serialization time on pages with many regions.
+    """
+    with metrics.time_stage("serialize"):
+        if media_type != JSON_MEDIA_TYPE:
+            content = columnar_payload(
+                ocr_results, binary=media_type == MSGPACK_MEDIA_TYPE
+            )
+        elif isinstance(ocr_results, dict):
+            content = zone_payload(ocr_results)
+        else:
+            content = ocr_payload(ocr_results)
+        if preprocess_info is not None:
+            refine = build_refine_stats(preprocess_info)
+            content["preprocess"] = PreprocessStats(**preprocess_info).model_dump()
+            content["refine"] = refine.model_dump() if refine else None
+        return Response(encode(content, media_type), media_type=media_type)
+
+
+def build_refine_stats(info: dict) -> RefineStats | None:
+    """Report the classifier re-recognition stage, if it ran."""
+    span = info["stages"].get("refine")
+    if span is None:
+        return None
+    start_ns, end_ns = span
+    return RefineStats(
+        crops=info["refine_crops"],
+        replaced=info["refine_replaced"],
+        elapsed_ms=(end_ns - start_ns) / 1e6,
+    )
+
+
+def iter_ocr_results(ocr_results: list) -> Iterator[OCRResult]:
+    """Convert results in [[bbox, (text, confidence)], ...] format to OCRResult."""
+    for item in ocr_results:
+        if item is None:
+            continue
+
+        bbox, (text, confidence) = item
+        yield OCRResult(
+            text=text,
+            confidence=confidence,
+            bounding_box=BoundingBox(points=bbox),
+        )
 
 
 if __name__ == "__main__":
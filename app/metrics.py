@@ -0,0 +1,175 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from starlette.requests import Request
+from starlette.routing import Match
+
+from app import config
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+REQUEST_COUNT = Counter(
+    "ocr_http_requests_total",
+    "HTTP requests by endpoint and status",
+    ["method", "endpoint", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "ocr_http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "ocr_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["endpoint"],
+)
+STAGE_LATENCY = Histogram(
+    "ocr_stage_duration_seconds",
+    "OCR pipeline stage latency (predict spans detect, classify and recognize)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+IMAGE_PIXELS = Histogram(
+    "ocr_image_pixels",
+    "Original image size in pixels",
+    buckets=(1e4, 1e5, 5e5, 1e6, 2e6, 4e6, 8e6, 16e6, 32e6, 64e6),
+)
+IMAGE_BYTES = Histogram(
+    "ocr_image_bytes",
+    "Uploaded image size in bytes",
+    buckets=(1e4, 5e4, 1e5, 5e5, 1e6, 2e6, 5e6, 1e7, 2e7, 5e7),
+)
+REGIONS_PER_IMAGE = Histogram(
+    "ocr_regions_per_image",
+    "Text regions detected per image",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+IMAGE_PEAK_MEMORY = Histogram(
+    "ocr_image_peak_memory_bytes",
+    "Upper bound of image buffer memory held while decoding and preprocessing",
+    buckets=(1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 5e8, 1e9),
+)
+ADMISSION_WAIT = Histogram(
+    "ocr_admission_wait_seconds",
+    "Time spent waiting for admission to the inference queue",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "ocr_admission_rejected_total",
+    "Work not admitted, by reason (queue_full, priority_queue_full, deadline)",
+    ["priority", "reason"],
+)
+REFINE_CROPS = Counter(
+    "ocr_refine_crops_total",
+    "Character crops re-examined by the classifier",
+)
+REFINE_REPLACED = Counter(
+    "ocr_refine_replaced_total",
+    "Characters replaced by the classifier",
+)
+
+_tracer = None
+if config.TRACING_ENABLED:
+    # Optional dependency; exporters are configured through the OpenTelemetry SDK
+    from opentelemetry import trace
+
+    _tracer = trace.get_tracer("paddleocr-api")
+
+
+def endpoint_label(request: Request) -> str:
+    """Route path template for a request (keeps label cardinality bounded)."""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@contextmanager
+def track_request(method: str, endpoint: str) -> Iterator[dict]:
+    """
+    Record count, latency and in-flight gauge for one HTTP request.
+
+    The caller sets ``status`` on the yielded dict; unhandled errors count as 500.
+    """
+    state = {"status": 500}
+    start = time.perf_counter()
+    span = (
+        _tracer.start_as_current_span(f"{method} {endpoint}")
+        if _tracer is not None
+        else nullcontext()
+    )
+    REQUESTS_IN_FLIGHT.labels(endpoint).inc()
+    try:
+        with span:
+            yield state
+    finally:
+        REQUESTS_IN_FLIGHT.labels(endpoint).dec()
+        REQUEST_LATENCY.labels(method, endpoint).observe(time.perf_counter() - start)
+        REQUEST_COUNT.labels(method, endpoint, str(state["status"])).inc()
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Measure a pipeline stage running in the current process."""
+    start_ns = time.time_ns()
+    try:
+        yield
+    finally:
+        observe_stages({stage: (start_ns, time.time_ns())})
+
+
+def observe_stages(stages: dict[str, tuple[int, int]]) -> None:
+    """Record stage spans (name -> (start_ns, end_ns)) as metrics and trace spans."""
+    for stage, (start_ns, end_ns) in stages.items():
+        STAGE_LATENCY.labels(stage).observe((end_ns - start_ns) / 1e9)
+        if _tracer is not None:
+            _tracer.start_span(stage, start_time=start_ns).end(end_time=end_ns)
+
+
+def observe_inference(info: dict, regions: int, image_bytes: int | None = None) -> None:
+    """
+    Record metrics for one processed image.
+
+    Args:
+        info: Preprocessing info returned by OCRService (with_info=True)
+        regions: Number of detected text regions
+        image_bytes: Uploaded size in bytes, if known
+    """
+    observe_stages(info.get("stages", {}))
+    IMAGE_PIXELS.observe(info["original_width"] * info["original_height"])
+    IMAGE_PEAK_MEMORY.observe(info.get("peak_memory_bytes", 0))
+    REGIONS_PER_IMAGE.observe(regions)
+    REFINE_CROPS.inc(info.get("refine_crops", 0))
+    REFINE_REPLACED.inc(info.get("refine_replaced", 0))
+    if image_bytes is not None:
+        IMAGE_BYTES.observe(image_bytes)
+
+
+def render() -> tuple[bytes, str]:
+    """Return the Prometheus exposition payload and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
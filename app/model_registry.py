@@ -0,0 +1,152 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _Entry:
+    value: Any
+    refs: int = 0
+
+
+class ModelRegistry:
+    """Lazily loaded models keyed by language, evicted LRU under a memory budget.
+
+    Models are created by ``loader`` on first use. Before a model is loaded,
+    and whenever the estimated memory of loaded models exceeds the budget,
+    the least recently used idle models that are not pinned are unloaded with
+    ``unloader``.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Any]],
+        unloader: Callable[[str, Any], Awaitable[None]],
+        memory_budget_mb: float = 0,
+        model_memory_mb: float = 1024,
+        pinned: tuple[str, ...] = (),
+    ):
+        """
+        Initialize model registry.
+
+        Args:
+            loader: Coroutine function creating the model for a language
+            unloader: Coroutine function releasing an evicted model
+            memory_budget_mb: Memory budget for loaded models (0 is unlimited)
+            model_memory_mb: Estimated memory of a single loaded model
+            pinned: Languages that are never evicted
+        """
+        self._loader = loader
+        self._unloader = unloader
+        self.memory_budget_mb = memory_budget_mb
+        self.model_memory_mb = model_memory_mb
+        self.pinned = set(pinned)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._load_locks: dict[str, asyncio.Lock] = {}
+        # Models being loaded, counted against the budget before they exist
+        self._loading = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @asynccontextmanager
+    async def use(self, lang: str) -> AsyncIterator[Any]:
+        """Borrow the model for a language; it is not evicted while in use."""
+        value = await self.acquire(lang)
+        try:
+            yield value
+        finally:
+            await self.release(lang)
+
+    async def acquire(self, lang: str) -> Any:
+        """
+        Get the model for a language, loading it on first use.
+
+        Every acquire() must be paired with release().
+
+        Args:
+            lang: Language setting ("japan", "ch", "en", etc.)
+
+        Returns:
+            Loaded model
+        """
+        entry = self._entries.get(lang)
+        if entry is None:
+            lock = self._load_locks.setdefault(lang, asyncio.Lock())
+            async with lock:
+                entry = self._entries.get(lang)
+                if entry is None:
+                    entry = await self._load(lang)
+
+        # No await between taking the reference and returning it, so a
+        # cancelled caller can never leak it
+        entry.refs += 1
+        self._entries.move_to_end(lang)
+        return entry.value
+
+    async def _load(self, lang: str) -> _Entry:
+        self._loading += 1
+        try:
+            # Make room first so peak memory stays within the budget
+            await self._evict_over_budget()
+            entry = _Entry(await self._loader(lang))
+        finally:
+            self._loading -= 1
+        self._entries[lang] = entry
+        self.loads += 1
+        return entry
+
+    async def release(self, lang: str) -> None:
+        """Return a model obtained with acquire()."""
+        entry = self._entries.get(lang)
+        if entry is not None:
+            entry.refs -= 1
+            await self._evict_over_budget()
+
+    def pin(self, lang: str) -> None:
+        """Never evict a language."""
+        self.pinned.add(lang)
+
+    def unpin(self, lang: str) -> None:
+        """Allow a language to be evicted again."""
+        self.pinned.discard(lang)
+
+    @property
+    def memory_used_mb(self) -> float:
+        return len(self._entries) * self.model_memory_mb
+
+    async def _evict_over_budget(self) -> None:
+        if self.memory_budget_mb <= 0:
+            return
+
+        # Least recently used first
+        for lang, entry in list(self._entries.items()):
+            needed_mb = self.memory_used_mb + self._loading * self.model_memory_mb
+            if needed_mb <= self.memory_budget_mb:
+                return
+            if entry.refs > 0 or lang in self.pinned:
+                continue
+            if self._entries.get(lang) is not entry:
+                continue
+            del self._entries[lang]
+            self.evictions += 1
+            await self._unloader(lang, entry.value)
+
+    async def close(self) -> None:
+        """Unload every model."""
+        while self._entries:
+            lang, entry = self._entries.popitem(last=False)
+            await self._unloader(lang, entry.value)
+
+    def stats(self) -> dict:
+        """Return loaded languages and memory accounting."""
+        return {
+            "loaded": list(self._entries),
+            "pinned": sorted(self.pinned),
+            "memory_used_mb": self.memory_used_mb,
+            "memory_budget_mb": self.memory_budget_mb,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Literal, Optional
+
+from app.zones import Zone
 
 
 class BoundingBox(BaseModel):
@@ -16,6 +18,35 @@ class OCRResult(BaseModel):
     bounding_box: BoundingBox
 
 
+class PreprocessStats(BaseModel):
+    """Image preprocessing report (decode, EXIF orientation, downscaling, memory)."""
+
+    original_width: int
+    original_height: int
+    width: int
+    height: int
+    draft_decode: bool
+    preprocess_ms: float
+    memory_saved_bytes: int
+    peak_memory_bytes: int = 0
+
+
+class RefineStats(BaseModel):
+    """Classifier re-recognition report for low-confidence regions."""
+
+    crops: int
+    replaced: int
+    elapsed_ms: float
+
+
+class ZoneResult(BaseModel):
+    """OCR result of one named zone."""
+
+    text: str
+    confidence: float
+    results: list[OCRResult]
+
+
 class OCRResponse(BaseModel):
     """OCR API response."""
 
@@ -23,6 +54,216 @@ class OCRResponse(BaseModel):
     results: list[OCRResult]
     full_text: str
     message: Optional[str] = None
+    preprocess: Optional[PreprocessStats] = None
+    refine: Optional[RefineStats] = None
+    # Results keyed by zone name (region-of-interest requests only)
+    zones: Optional[dict[str, ZoneResult]] = None
+
+
+class ZoneSpec(BaseModel):
+    """Region of a page to OCR, given as a rectangle or a polygon."""
+
+    name: str = Field(min_length=1, max_length=64)
+    box: Optional[list[float]] = Field(None, description="[x0, y0, x1, y1]")
+    polygon: Optional[list[list[float]]] = Field(
+        None, description="[[x, y], ...] with at least 3 points"
+    )
+    multiline: bool = Field(
+        False, description="Run text detection inside the zone (several lines)"
+    )
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "ZoneSpec":
+        if (self.box is None) == (self.polygon is None):
+            raise ValueError(f"Zone {self.name}: give exactly one of box or polygon")
+        if self.box is not None:
+            if len(self.box) != 4 or not (
+                self.box[0] < self.box[2] and self.box[1] < self.box[3]
+            ):
+                raise ValueError(f"Zone {self.name}: box must be [x0, y0, x1, y1]")
+        elif len(self.polygon) < 3 or any(len(p) != 2 for p in self.polygon):
+            raise ValueError(
+                f"Zone {self.name}: polygon needs at least 3 [x, y] points"
+            )
+        return self
+
+    def to_zone(self) -> Zone:
+        if self.box is not None:
+            return Zone.from_box(self.name, self.box, self.multiline)
+        return Zone(self.name, [(x, y) for x, y in self.polygon], self.multiline)
+
+
+class FormTemplate(BaseModel):
+    """Zones of a fixed-layout form."""
+
+    zones: list[ZoneSpec] = Field(min_length=1, max_length=100)
+    relative: bool = Field(
+        False,
+        description="Coordinates are fractions of the page width and height",
+    )
+
+    @model_validator(mode="after")
+    def check_names(self) -> "FormTemplate":
+        names = [zone.name for zone in self.zones]
+        if len(set(names)) != len(names):
+            raise ValueError("Zone names must be unique")
+        return self
+
+
+class ModelStats(BaseModel):
+    """Loaded OCR models and memory accounting."""
+
+    loaded: list[str]
+    pinned: list[str]
+    memory_used_mb: float
+    memory_budget_mb: float
+    loads: int
+    evictions: int
+
+
+class NearDuplicateStats(BaseModel):
+    """Near-duplicate index statistics."""
+
+    entries: int
+    max_entries: int
+    # Results reused whole, reused with changed areas OCRed again, and lookups
+    # without a usable near duplicate
+    hits: int
+    partial_hits: int
+    misses: int
+
+
+class CacheStats(BaseModel):
+    """Result cache statistics."""
+
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    disk_enabled: bool
+    disk_entries: int = 0
+    hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+    near_duplicates: Optional[NearDuplicateStats] = None
+
+
+class BatchOCRItem(OCRResponse):
+    """OCR result for a single file of a batch request."""
+
+    filename: str
+
+
+class BatchOCRResponse(BaseModel):
+    """Batch OCR API response."""
+
+    success: bool
+    items: list[BatchOCRItem]
+    message: Optional[str] = None
+
+
+class DocumentPage(OCRResponse):
+    """OCR result for a single page of a document."""
+
+    page: int
+
+
+class DocumentOCRResponse(BaseModel):
+    """Multi-page document OCR API response."""
+
+    success: bool
+    page_count: int
+    pages: list[DocumentPage]
+    message: Optional[str] = None
+
+
+class JobItemResult(OCRResponse):
+    """Result of one image or document page of an asynchronous job."""
+
+    index: int
+    filename: str
+    page: Optional[int] = None
+    state: Literal["pending", "running", "done", "failed"]
+
+
+class JobResponse(BaseModel):
+    """Asynchronous job progress with one page of item results."""
+
+    id: str
+    status: Literal["queued", "running", "completed"]
+    lang: str
+    created_at: float
+    finished_at: Optional[float] = None
+    total: int
+    pending: int
+    running: int
+    succeeded: int
+    failed: int
+    items: list[JobItemResult] = []
+    # Offset of the next page of items (None on the last page)
+    next_offset: Optional[int] = None
+
+
+class JobStats(BaseModel):
+    """Asynchronous job queue statistics."""
+
+    jobs: int
+    completed_jobs: int
+    pending_items: int
+    running_items: int
+
+
+class StreamRegionEvent(BaseModel):
+    """Streamed OCR result for a single text region."""
+
+    event: Literal["region"] = "region"
+    index: int
+    filename: str
+    result: OCRResult
+
+
+class StreamPageEvent(BatchOCRItem):
+    """Streamed OCR result for a single page (image)."""
+
+    event: Literal["page"] = "page"
+    index: int
+
+
+class StreamDoneEvent(BaseModel):
+    """Final event of an OCR stream."""
+
+    event: Literal["done"] = "done"
+    total: int
+    succeeded: int
+
+
+class ClassifyCandidate(BaseModel):
+    """Candidate character of the single-character classifier."""
+
+    char: str
+    confidence: float
+
+
+class ClassifyResponse(BaseModel):
+    """Single-character recognition API response."""
+
+    success: bool
+    source: Literal["classifier", "ocr"]
+    text: str
+    confidence: float
+    candidates: list[ClassifyCandidate]
+    results: list[OCRResult] = []
+    message: Optional[str] = None
+
+
+class ModelHealth(BaseModel):
+    """Loading state and startup time breakdown of one language model."""
+
+    state: Literal["loading", "ready", "failed"]
+    load_ms: Optional[float] = None
+    warmup_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    error: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -31,3 +272,34 @@ class HealthResponse(BaseModel):
     status: str
     ocr_ready: bool
     version: str
+    models: dict[str, ModelHealth] = {}
+
+
+class BatchingStats(BaseModel):
+    """Micro-batching scheduler statistics."""
+
+    queue_depth: int
+    max_batch_size: int
+    max_wait_ms: float
+    batches: int
+    requests: int
+    batch_size_histogram: dict[int, int]
+    avg_wait_ms: float
+    max_wait_observed_ms: float
+    dropped: int = 0
+
+
+class AdmissionStats(BaseModel):
+    """Admission control statistics (counters are per priority class)."""
+
+    capacity: int
+    in_flight: int
+    max_queue: int
+    queue_depth: int
+    queue_depth_by_priority: dict[str, int]
+    admitted: dict[str, int]
+    rejected: dict[str, int]
+    expired: dict[str, int]
+    avg_wait_ms: float
+    max_wait_observed_ms: float
+    retry_after_seconds: int
@@ -0,0 +1,486 @@
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.preprocess import ImageSource, check_pixels, upright_size
+
+# Images are compared as binarized bitmaps with this many pixels on the
+# longest side, in square tiles of TILE_SIZE bitmap pixels. Bitmaps are kept
+# zlib-compressed (text pages shrink to a few tens of KB).
+BITMAP_SIDE = 1600
+TILE_SIZE = 32
+
+# Side of the ink density image transformed for the pHash
+HASH_SIZE = 32
+
+# The index file is rewritten after this many changes, or on the first change
+# this many seconds after the last save
+SAVE_EVERY_CHANGES = 64
+SAVE_INTERVAL_SECONDS = 60
+
+
+@dataclass
+class ImageSignature:
+    """Perceptual fingerprint of an image."""
+
+    # 64-bit perceptual hash (pHash) used to find candidates
+    hash: int
+    # zlib-compressed np.packbits() of the binarized bitmap (True is ink)
+    bitmap: bytes
+    # Bitmap (height, width)
+    bitmap_shape: tuple[int, int]
+    # Upright size of the original image
+    width: int
+    height: int
+
+    def unpack_bitmap(self) -> np.ndarray:
+        """Return the binarized bitmap as a boolean array."""
+        bits = np.unpackbits(np.frombuffer(zlib.decompress(self.bitmap), np.uint8))
+        rows, cols = self.bitmap_shape
+        return bits[: rows * cols].reshape(rows, cols).astype(bool)
+
+
+def image_signature(source: ImageSource, max_pixels: int = 0) -> ImageSignature:
+    """
+    Compute the perceptual signature of an encoded image.
+
+    JPEGs are decoded at the smallest DCT scale that still covers the
+    bitmap, so large scans cost a fraction of a full decode.
+
+    Args:
+        source: Binary image data or a binary file object (read from the start)
+        max_pixels: Maximum width x height of the image (0 disables the limit)
+    """
+    if isinstance(source, bytes):
+        image = Image.open(io.BytesIO(source))
+    else:
+        source.seek(0)
+        image = Image.open(source)
+    check_pixels(image.width, image.height, max_pixels)
+    width, height = upright_size(image)
+
+    ratio = min(1.0, BITMAP_SIDE / max(width, height))
+    size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    image.draft("L", size)
+    image = ImageOps.exif_transpose(image).convert("L")
+    if image.size != size:
+        image = image.resize(size, Image.Resampling.BOX)
+    gray = np.asarray(image, dtype=np.uint8)
+
+    bitmap = gray < otsu_threshold(gray)
+    return ImageSignature(
+        hash=perceptual_hash(bitmap),
+        bitmap=zlib.compress(np.packbits(bitmap).tobytes()),
+        bitmap_shape=bitmap.shape,
+        width=width,
+        height=height,
+    )
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """Gray level best separating ink from paper (Otsu's method); 0 for a flat image."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mass = np.cumsum(hist * np.arange(256))
+    total = weight[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (mass[-1] * weight / total - mass) ** 2 / (weight * (total - weight))
+    variance = np.nan_to_num(variance, nan=0.0, posinf=0.0)
+    return int(np.argmax(variance)) if variance.any() else 0
+
+
+def perceptual_hash(bitmap: np.ndarray) -> int:
+    """
+    64-bit pHash of a binarized page.
+
+    The ink density is reduced to 32x32 and transformed with a 2-D DCT; each
+    bit tells whether one of the 8x8 lowest frequencies (without the DC
+    term) lies above their median. Hashing ink rather than gray levels keeps
+    the mostly white page stable under recompression and exposure changes.
+    """
+    density = Image.fromarray(bitmap.astype(np.uint8) * 255).resize(
+        (HASH_SIZE, HASH_SIZE), Image.Resampling.BOX
+    )
+    # Unnormalized DCT-II basis: only the signs relative to the median matter
+    k = np.arange(HASH_SIZE)
+    dct = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * HASH_SIZE))
+    coefficients = dct @ np.asarray(density, dtype=np.float64) @ dct.T
+    low = coefficients[:8, :8].flatten()[1:]
+    bits = np.append(low > np.median(low), False)
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def changed_tiles(
+    previous: ImageSignature, current: ImageSignature, min_pixels: int
+) -> np.ndarray:
+    """
+    Compare two signatures tile by tile.
+
+    Ink counts as changed only when the other bitmap has no ink within one
+    pixel of it, so recompression noise and sub-pixel shifts between scans
+    are ignored while a single replaced character is not.
+
+    Args:
+        min_pixels: Changed bitmap pixels above which a tile changed
+
+    Returns:
+        Boolean array of changed tiles (rows x columns) covering the page
+    """
+    current_bitmap = current.unpack_bitmap()
+    previous_bitmap = previous.unpack_bitmap()
+    if previous_bitmap.shape != current_bitmap.shape:
+        rows, cols = current_bitmap.shape
+        previous_bitmap = np.asarray(
+            Image.fromarray(previous_bitmap).resize(
+                (cols, rows), Image.Resampling.NEAREST
+            )
+        )
+
+    changed = (current_bitmap & ~_dilate(previous_bitmap)) | (
+        previous_bitmap & ~_dilate(current_bitmap)
+    )
+    rows, cols = (-(-n // TILE_SIZE) for n in changed.shape)
+    padded = np.zeros((rows * TILE_SIZE, cols * TILE_SIZE), dtype=np.int32)
+    padded[: changed.shape[0], : changed.shape[1]] = changed
+    counts = padded.reshape(rows, TILE_SIZE, cols, TILE_SIZE).sum(axis=(1, 3))
+    return counts > min_pixels
+
+
+def _dilate(bitmap: np.ndarray) -> np.ndarray:
+    """Grow ink by one pixel in every direction (3x3)."""
+    padded = np.pad(bitmap, 1)
+    rows, cols = bitmap.shape
+    out = np.zeros_like(bitmap)
+    for dy in range(3):
+        for dx in range(3):
+            out |= padded[dy : dy + rows, dx : dx + cols]
+    return out
+
+
+def changed_boxes(tiles: np.ndarray, signature: ImageSignature) -> list[list[float]]:
+    """
+    Turn changed tiles into [x0, y0, x1, y1] boxes on the original image.
+
+    Each group of adjacent changed tiles becomes one box, grown by one tile
+    on every side so text straddling the group is read whole.
+    """
+    tile_w = TILE_SIZE * signature.width / signature.bitmap_shape[1]
+    tile_h = TILE_SIZE * signature.height / signature.bitmap_shape[0]
+    rows, cols = tiles.shape
+    seen = np.zeros_like(tiles, dtype=bool)
+    boxes = []
+    for row, col in zip(*np.nonzero(tiles)):
+        if seen[row, col]:
+            continue
+        # Flood fill one group of 8-connected tiles
+        stack = [(row, col)]
+        seen[row, col] = True
+        group_rows, group_cols = [row], [col]
+        while stack:
+            r, c = stack.pop()
+            for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                    if tiles[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+                        group_rows.append(nr)
+                        group_cols.append(nc)
+        boxes.append(
+            [
+                float(max(min(group_cols) - 1, 0) * tile_w),
+                float(max(min(group_rows) - 1, 0) * tile_h),
+                float(min((max(group_cols) + 2) * tile_w, signature.width)),
+                float(min((max(group_rows) + 2) * tile_h, signature.height)),
+            ]
+        )
+    return boxes
+
+
+def split_results(
+    ocr_results: list,
+    previous: ImageSignature,
+    current: ImageSignature,
+    boxes: list[list[float]],
+) -> tuple[list, list[list[float]]]:
+    """
+    Decide which earlier results still hold for a near-duplicate image.
+
+    Earlier results are scaled to the current image size. Those overlapping
+    a changed box are dropped and the box grows to cover them, so the text
+    is re-read in full; overlapping boxes are merged.
+
+    Args:
+        ocr_results: Earlier results in [[bbox, (text, confidence)], ...] format
+        boxes: Changed areas of the current image (see changed_boxes)
+
+    Returns:
+        (results to keep, boxes to OCR again)
+    """
+    scale = np.array([current.width / previous.width, current.height / previous.height])
+    results = []
+    for item in ocr_results:
+        if item is not None:
+            bbox, (text, confidence) = item
+            points = np.asarray(bbox, dtype=np.float64).reshape(-1, 2) * scale
+            results.append([points.tolist(), (text, confidence)])
+
+    # Growing a box can make it reach more text or another box: repeat until
+    # nothing changes
+    boxes = [list(box) for box in boxes]
+    while True:
+        kept = []
+        for item in results:
+            points = np.asarray(item[0]).reshape(-1, 2)
+            if not len(points):
+                kept.append(item)
+                continue
+            region = [*points.min(axis=0), *points.max(axis=0)]
+            overlapping = [box for box in boxes if _overlaps(box, region)]
+            for box in overlapping:
+                box[:] = _union(box, region)
+            if not overlapping:
+                kept.append(item)
+
+        merged = []
+        for box in boxes:
+            for other in merged:
+                if _overlaps(box, other):
+                    other[:] = _union(other, box)
+                    break
+            else:
+                merged.append(box)
+
+        if len(kept) == len(results) and len(merged) == len(boxes):
+            return kept, merged
+        results, boxes = kept, merged
+
+
+def merge_results(kept: list, reread: list) -> list:
+    """Combine kept and re-read results in reading order (top to bottom, left to right)."""
+
+    def reading_order(item):
+        points = np.asarray(item[0], dtype=np.float64).reshape(-1, 2)
+        if not len(points):
+            return 0.0, 0.0
+        return float(points[:, 1].min()), float(points[:, 0].min())
+
+    return sorted([*kept, *reread], key=reading_order)
+
+
+def _overlaps(a: list[float], b: list[float]) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _union(a: list[float], b: list[float]) -> list[float]:
+    return [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+
+
+@dataclass
+class IndexEntry:
+    """Indexed image: its signature and the result cache key of its OCR result."""
+
+    cache_key: str
+    # Digest of the OCR settings the result was produced with
+    config_key: str
+    signature: ImageSignature
+
+
+class NearDuplicateIndex:
+    """Bounded LRU index of image signatures for near-duplicate lookups.
+
+    Only signatures are held (a few tens of KB each for a text page);
+    results stay in the result cache and are looked up by key. The index can
+    be saved to and loaded from a single .npz file so it survives restarts
+    along with the on-disk cache tier; add_async() saves it periodically so
+    a crash loses at most the latest changes.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: str | None = None):
+        """
+        Initialize the index.
+
+        Args:
+            max_entries: Maximum number of indexed images
+            path: .npz file the index is loaded from and saved to (None keeps
+                it in memory only)
+        """
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._entries: OrderedDict[str, IndexEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        # Changes since the last save and when it was taken
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, cache_key: str, config_key: str, signature: ImageSignature) -> None:
+        """Index an image whose OCR result is cached under cache_key."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[cache_key] = IndexEntry(cache_key, config_key, signature)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+
+    async def add_async(
+        self, cache_key: str, config_key: str, signature: ImageSignature
+    ) -> None:
+        """add() saving the index in a worker thread when a save is due."""
+        self.add(cache_key, config_key, signature)
+        if self._save_due():
+            await asyncio.to_thread(self.save, blocking=False)
+
+    def find(
+        self, signature: ImageSignature, config_key: str, max_distance: int
+    ) -> list[IndexEntry]:
+        """
+        Return indexed images within max_distance bits, nearest first.
+
+        Only entries produced with the same OCR settings are considered.
+        """
+        with self._lock:
+            matches = []
+            for entry in self._entries.values():
+                if entry.config_key != config_key:
+                    continue
+                distance = hamming_distance(entry.signature.hash, signature.hash)
+                if distance <= max_distance:
+                    matches.append((distance, entry))
+            for _, entry in matches:
+                self._entries.move_to_end(entry.cache_key)
+        return [entry for _, entry in sorted(matches, key=lambda m: m[0])]
+
+    def remove(self, cache_key: str) -> None:
+        """Forget an image (for example when its result left the cache)."""
+        with self._lock:
+            if self._entries.pop(cache_key, None) is not None:
+                self._unsaved += 1
+
+    def stats(self) -> dict:
+        """Return index size and lookup counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+        }
+
+    def save(self, blocking: bool = True) -> None:
+        """
+        Write the index to its file (atomically); no-op without a path.
+
+        Args:
+            blocking: Wait for a save in progress (False skips this one)
+        """
+        if self.path is None or not self._save_lock.acquire(blocking=blocking):
+            return
+        try:
+            self._save()
+        finally:
+            self._save_lock.release()
+
+    def _save_due(self) -> bool:
+        if self.path is None or self._unsaved == 0:
+            return False
+        return (
+            self._unsaved >= SAVE_EVERY_CHANGES
+            or time.monotonic() - self._saved_at >= SAVE_INTERVAL_SECONDS
+        )
+
+    def _save(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            unsaved = self._unsaved
+            self._unsaved = 0
+            self._saved_at = time.monotonic()
+
+        # Bitmaps differ in length: store them end to end with their offsets
+        bitmaps = [e.signature.bitmap for e in entries]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    cache_keys=np.array([e.cache_key for e in entries], dtype=str),
+                    config_keys=np.array([e.config_key for e in entries], dtype=str),
+                    hashes=np.array(
+                        [e.signature.hash for e in entries], dtype=np.uint64
+                    ),
+                    shapes=np.array(
+                        [
+                            (
+                                *e.signature.bitmap_shape,
+                                e.signature.width,
+                                e.signature.height,
+                            )
+                            for e in entries
+                        ],
+                        dtype=np.int64,
+                    ).reshape(-1, 4),
+                    offsets=np.cumsum([0, *map(len, bitmaps)], dtype=np.int64),
+                    bitmaps=np.frombuffer(b"".join(bitmaps), dtype=np.uint8),
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            with self._lock:
+                self._unsaved += unsaved
+            raise
+
+    def load(self) -> int:
+        """Load entries saved by save(); return how many were loaded."""
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                offsets = data["offsets"].tolist()
+                bitmaps = data["bitmaps"].tobytes()
+                records = zip(
+                    data["cache_keys"].tolist(),
+                    data["config_keys"].tolist(),
+                    data["hashes"].tolist(),
+                    data["shapes"].tolist(),
+                    pairwise(offsets),
+                )
+                for cache_key, config_key, hash_value, shape, (start, end) in records:
+                    bitmap_rows, bitmap_cols, width, height = shape
+                    signature = ImageSignature(
+                        hash=int(hash_value),
+                        bitmap=bitmaps[start:end],
+                        bitmap_shape=(bitmap_rows, bitmap_cols),
+                        width=width,
+                        height=height,
+                    )
+                    self.add(cache_key, config_key, signature)
+        except (OSError, ValueError, KeyError):
+            return 0
+        # Loaded entries are already in the file
+        self._unsaved = 0
+        return len(self._entries)
@@ -1,29 +1,347 @@
+import asyncio
+import contextlib
+import functools
 import io
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from importlib.metadata import version
+from typing import Any
 
 import numpy as np
-from paddleocr import PaddleOCR
-from PIL import Image
+from PIL import Image, ImageDraw
+
+from app import config
+
+# Read models from the local, pinned directory (see .devcontainer/preload_models.py)
+# and skip PaddleX's model hoster connectivity check. Must precede the import.
+if os.path.isdir(config.MODELS_DIR):
+    os.environ.setdefault("PADDLE_PDX_CACHE_HOME", os.path.abspath(config.MODELS_DIR))
+    os.environ.setdefault("PADDLE_PDX_DISABLE_MODEL_SOURCE_CHECK", "True")
+elif config.MODELS_DIR_REQUIRED:
+    raise RuntimeError(f"Model directory not found: {config.MODELS_DIR}")
+else:
+    print(
+        f"Model directory not found: {config.MODELS_DIR} "
+        "(PaddleOCR will download models)"
+    )
+
+_import_start = time.perf_counter()
+from paddleocr import PaddleOCR, TextRecognition
+
+# Reported in the startup time breakdown
+PADDLEOCR_IMPORT_MS = (time.perf_counter() - _import_start) * 1000
+
+from app.classifier import CharacterClassifier
+from app.documents import load_page
+from app.inference_pool import InferencePool
+from app.pipeline_options import DEFAULT_OPTIONS, PipelineOptions
+from app.preprocess import ImageSource, PreprocessInfo, decode_image, prepare_image
+from app.refine import refine_texts
+from app.timing import record_stage
+from app.zones import Zone, crop_zone
+
+PADDLEOCR_VERSION = version("paddleocr")
+
+# Recognition model PaddleOCR's pipeline uses per language; single-line zones
+# are recognized with it directly, without running detection
+REC_MODEL_NAMES = {
+    "ch": "PP-OCRv5_server_rec",
+    "chinese_cht": "PP-OCRv5_server_rec",
+    "japan": "PP-OCRv5_server_rec",
+}
+
+
+# Models inside PaddleOCR's pipeline (PaddleX OCRPipeline attributes) and the
+# stage their time is reported as; the predict stage spans all of them
+PIPELINE_MODEL_STAGES = {
+    "doc_preprocessor_pipeline": "doc_preprocess",
+    "text_det_model": "detect",
+    "textline_orientation_model": "classify",
+    "text_rec_model": "recognize",
+}
+
+
+# PaddleOCR pipelines built by preload_models(), keyed by constructor
+# arguments. Workers forked from the process that built them take them over
+# instead of loading their own copy, sharing the weights copy-on-write.
+_preloaded: dict[tuple, PaddleOCR] = {}
+
+
+def preload_models(langs: tuple[str, ...], cpu_threads: int = 0) -> None:
+    """
+    Build PaddleOCR pipelines for later use by forked workers.
+
+    Nothing is run on them, so no inference threads exist when workers are
+    forked; each worker warms up its own copy.
+    """
+    for lang in dict.fromkeys(langs):
+        key = (lang, True, cpu_threads)
+        if key not in _preloaded:
+            _preloaded[key] = _build_ocr(*key)
+
+
+def _build_ocr(
+    lang: str,
+    use_textline_orientation: bool,
+    cpu_threads: int,
+    rec_batch_size: int | None = None,
+) -> PaddleOCR:
+    kwargs = {"cpu_threads": cpu_threads} if cpu_threads > 0 else {}
+    if rec_batch_size is not None:
+        kwargs["text_recognition_batch_size"] = rec_batch_size
+    return PaddleOCR(
+        lang=lang, use_textline_orientation=use_textline_orientation, **kwargs
+    )
+
+
+class _TimedModel:
+    """Proxy for a model inside a PaddleOCR pipeline that times its calls.
+
+    Models yield results lazily, so the time spent producing each one is
+    added up too. Timings map a stage to [first start_ns, total ns].
+    """
+
+    def __init__(self, model: Any, stage: str, timings: dict[str, list[int]]):
+        self._model = model
+        self._stage = stage
+        self._timings = timings
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_model":
+            # Not set yet (copies are created without __init__)
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+    def __call__(self, *args, **kwargs):
+        return self._timed(self._model, *args, **kwargs)
+
+    def predict(self, *args, **kwargs):
+        return self._timed(self._model.predict, *args, **kwargs)
+
+    def _timed(self, function: Callable, *args, **kwargs):
+        start = time.time_ns()
+        results = function(*args, **kwargs)
+        self._add(start)
+        if isinstance(results, Iterator):
+            return self._iter_timed(results)
+        return results
+
+    def _iter_timed(self, results: Iterator) -> Iterator:
+        while True:
+            start = time.time_ns()
+            try:
+                item = next(results)
+            except StopIteration:
+                self._add(start)
+                return
+            self._add(start)
+            yield item
+
+    def _add(self, start: int) -> None:
+        timing = self._timings.setdefault(self._stage, [start, 0])
+        timing[1] += time.time_ns() - start
+
+
+def _time_pipeline_models(ocr: PaddleOCR, timings: dict[str, list[int]]) -> None:
+    """
+    Time the detection, orientation and recognition models of a pipeline.
+
+    Pipelines without the expected PaddleX attributes are left as they are
+    and only report the predict stage.
+    """
+    pipeline = getattr(ocr, "paddlex_pipeline", None)
+    # PaddleX wraps the pipeline for multi-device inference
+    pipeline = getattr(pipeline, "_pipeline", pipeline)
+    for attribute, stage in PIPELINE_MODEL_STAGES.items():
+        model = getattr(pipeline, attribute, None)
+        if model is not None and not isinstance(model, _TimedModel):
+            setattr(pipeline, attribute, _TimedModel(model, stage, timings))
+
+
+@functools.cache
+def warmup_image() -> bytes:
+    """Small synthetic text image used for warm-up inferences."""
+    image = Image.new("RGB", (320, 64), color="white")
+    ImageDraw.Draw(image).text((16, 20), "OCR warm-up 0123456789", fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
 
 
 class OCRService:
     """PaddleOCR wrapper service."""
 
-    def __init__(self, lang: str = "japan"):
+    def __init__(
+        self,
+        lang: str = "japan",
+        executor: str = "thread",
+        workers: int = 0,
+        start_method: str = "spawn",
+        cpu_threads: int = 0,
+        max_side: int = 0,
+        max_pixels: int = 0,
+        classifier_dir: str | None = None,
+        classifier_format: str = "int8",
+        refine_threshold: float = 0.0,
+        refine_min_confidence: float = 0.9,
+        refine_max_crops: int = 64,
+        rec_model_name: str | None = None,
+        warmup_runs: int = 0,
+    ):
         """
         Initialize OCR service.
 
         Args:
             lang: Language setting ("japan", "ch", "en", etc.)
+            executor: Inference executor type ("thread" or "process")
+            workers: Number of inference workers. 0 runs inference in the
+                calling thread; otherwise each worker owns its own PaddleOCR.
+            start_method: How process workers start: "spawn", or
+                "forkserver" to fork them from a server that preloaded the
+                models of config.OCR_LANG and config.PINNED_LANGS (see
+                app.worker_preload), sharing their weights
+            cpu_threads: CPU threads per PaddleOCR instance (0 keeps the
+                PaddleOCR default)
+            max_side: Downscale images so their longest side is at most this
+                many pixels before detection (0 keeps full resolution)
+            max_pixels: Reject images with more pixels than this before
+                decoding them (0 disables the limit)
+            classifier_dir: Trained single-character classifier used to
+                re-recognize low-confidence regions (None disables)
+            classifier_format: Classifier model format ("int8", "keras", ...)
+            refine_threshold: Regions scoring below this are re-recognized
+                character by character (0 disables)
+            refine_min_confidence: Minimum classifier score to replace a character
+            refine_max_crops: Maximum character crops re-examined per image
+            rec_model_name: Text recognition model for single-line zones
+                (None uses the pipeline's model for ``lang``, if known;
+                otherwise zones run detection too)
+            warmup_runs: Dummy inferences run by every model instance before
+                it reports ready, so real requests do not run cold
         """
-        self.ocr = PaddleOCR(
-            lang=lang,
-            use_textline_orientation=True,
-        )
-        self._initialized = True
+        self.lang = lang
+        self.use_textline_orientation = True
+        self.workers = workers
+        self.cpu_threads = cpu_threads
+        self.max_side = max_side
+        self.max_pixels = max_pixels
+        self.refine_threshold = refine_threshold if classifier_dir else 0.0
+        self.refine_min_confidence = refine_min_confidence
+        self.refine_max_crops = refine_max_crops
+        self.rec_model_name = rec_model_name or REC_MODEL_NAMES.get(lang)
+        self._ocr: PaddleOCR | None = None
+        # Pipelines built for requests with a recognition batch size
+        self._variants: dict[int, PaddleOCR] = {}
+        # Time spent in the pipeline's models during the current predict()
+        self._model_timings: dict[str, list[int]] = {}
+        # Loaded on the first single-line zone request
+        self._recognizer: TextRecognition | None = None
+        self._classifier: CharacterClassifier | None = None
+        self._ready = False
+        # Startup time breakdown in milliseconds (slowest worker with a pool)
+        self.startup_ms = {"load": 0.0, "warmup": 0.0}
+        self._pool: InferencePool | None = None
+        self._lock = threading.Lock()
+
+        if workers > 0:
+            self._pool = InferencePool(
+                functools.partial(
+                    OCRService,
+                    lang=lang,
+                    max_side=max_side,
+                    max_pixels=max_pixels,
+                    classifier_dir=classifier_dir,
+                    classifier_format=classifier_format,
+                    refine_threshold=refine_threshold,
+                    refine_min_confidence=refine_min_confidence,
+                    refine_max_crops=refine_max_crops,
+                    rec_model_name=rec_model_name,
+                    cpu_threads=cpu_threads,
+                    warmup_runs=warmup_runs,
+                ),
+                mode=executor,
+                workers=workers,
+                start_method=start_method,
+                preload=("app.worker_preload",),
+            )
+            # Load every worker's model now rather than on the first requests
+            for worker_startup in self._pool.start("startup_ms"):
+                for stage, elapsed in worker_startup.items():
+                    self.startup_ms[stage] = max(self.startup_ms[stage], elapsed)
+        else:
+            start = time.perf_counter()
+            self._ocr = self._create_ocr()
+            if self.refine_threshold > 0:
+                self._classifier = CharacterClassifier.load(
+                    classifier_dir, classifier_format
+                )
+            self.startup_ms["load"] = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            self.warm_up(warmup_runs)
+            self.startup_ms["warmup"] = (time.perf_counter() - start) * 1000
+        self._ready = True
 
-    def process_image(self, image_bytes: bytes) -> list:
+    def _create_ocr(self) -> PaddleOCR:
+        key = (self.lang, self.use_textline_orientation, self.cpu_threads)
+        ocr = _preloaded.pop(key, None)
+        if ocr is None:
+            ocr = _build_ocr(*key)
+        _time_pipeline_models(ocr, self._model_timings)
+        return ocr
+
+    @property
+    def config(self) -> dict:
+        """OCR settings that affect results (part of result cache keys)."""
+        return {
+            "lang": self.lang,
+            "use_textline_orientation": self.use_textline_orientation,
+            "max_side": self.max_side,
+            "refine_threshold": self.refine_threshold,
+            "refine_min_confidence": self.refine_min_confidence,
+            "refine_max_crops": self.refine_max_crops,
+            "paddleocr": PADDLEOCR_VERSION,
+        }
+
+    @property
+    def ocr(self) -> PaddleOCR:
+        """PaddleOCR instance used for inference in the calling thread."""
+        if self._ocr is None:
+            self._ocr = self._create_ocr()
+        return self._ocr
+
+    def pipeline(self, options: PipelineOptions) -> PaddleOCR:
         """
-        Perform OCR on image bytes.
+        PaddleOCR instance for the options: the shared one, or a variant with
+        their recognition batch size (built on first use and kept).
+        """
+        if options.rec_batch_size is None:
+            return self.ocr
+        variant = self._variants.get(options.rec_batch_size)
+        if variant is None:
+            variant = _build_ocr(
+                self.lang,
+                self.use_textline_orientation,
+                self.cpu_threads,
+                options.rec_batch_size,
+            )
+            _time_pipeline_models(variant, self._model_timings)
+            self._variants[options.rec_batch_size] = variant
+        return variant
+
+    @property
+    def recognizer(self) -> TextRecognition:
+        """Text recognition model used for single-line zones."""
+        if self._recognizer is None:
+            kwargs = {"cpu_threads": self.cpu_threads} if self.cpu_threads > 0 else {}
+            self._recognizer = TextRecognition(model_name=self.rec_model_name, **kwargs)
+        return self._recognizer
+
+    async def process_image_async(self, image_bytes: bytes) -> list:
+        """
+        Perform OCR on image bytes without blocking the event loop.
 
         Args:
             image_bytes: Binary image data
@@ -31,21 +349,303 @@ class OCRService:
         Returns:
             List of OCR results in format: [[bbox, (text, confidence)], ...]
         """
-        image = Image.open(io.BytesIO(image_bytes))
+        return await self.run("process_image", image_bytes)
 
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+    async def run(self, method: str, *args, **kwargs):
+        """
+        Run a service method on the inference pool.
+
+        Without a pool, the method runs on the default thread executor,
+        serialized so the shared PaddleOCR instance is never used concurrently.
 
-        image_array = np.array(image)
+        Args:
+            method: Name of the OCRService method to call
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
 
-        result = self.ocr.predict(image_array)
+        Returns:
+            Return value of the method
+        """
+        if self._pool is not None:
+            return await self._pool.run(method, *args, **kwargs)
+        return await asyncio.to_thread(self._call_locked, method, *args, **kwargs)
+
+    def shared_async(self, data: bytes):
+        """
+        Async context manager placing data in shared memory for run() calls.
+
+        Yields what to pass to run() instead of the data (a shared memory
+        handle with process workers, otherwise the data itself). The copy is
+        made in a worker thread, off the event loop.
+        """
+        if self._pool is not None:
+            return self._pool.shared_async(data)
+        return contextlib.nullcontext(data)
 
-        # Convert new API format to legacy format for compatibility
-        if not result:
+    def _call_locked(self, method: str, *args, **kwargs):
+        with self._lock:
+            return getattr(self, method)(*args, **kwargs)
+
+    def close(self) -> None:
+        """Shut down inference workers."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def warm_up(self, runs: int = 1) -> None:
+        """Run dummy inferences so one-time allocations happen before real requests."""
+        for _ in range(runs):
+            self.process_image(warmup_image())
+
+    def process_image(
+        self,
+        image_bytes: ImageSource,
+        with_info: bool = False,
+        options: PipelineOptions = DEFAULT_OPTIONS,
+    ):
+        """
+        Perform OCR on image bytes.
+
+        Args:
+            image_bytes: Binary image data or a binary file object (decoded in
+                place, thread workers only)
+            with_info: Also return preprocessing info
+            options: Pipeline settings of the request
+
+        Returns:
+            List of OCR results in format: [[bbox, (text, confidence)], ...]
+            (or a (results, preprocess info dict) tuple when with_info is set).
+            Bounding boxes are in original image coordinates.
+        """
+        image_array, info = decode_image(image_bytes, self.max_side, self.max_pixels)
+
+        results = self._predict([image_array], [info], options)[0]
+        return (results, info.to_dict()) if with_info else results
+
+    def process_images(
+        self,
+        images: list[ImageSource],
+        with_info: bool = False,
+        options: PipelineOptions = DEFAULT_OPTIONS,
+    ) -> list:
+        """
+        Perform OCR on several images with a single batched predict() call.
+
+        Images that fail to decode do not affect the rest of the batch.
+
+        Args:
+            images: List of binary image data or binary file objects
+            with_info: Return (results, preprocess info dict) tuples
+            options: Pipeline settings shared by all images
+
+        Returns:
+            List with one entry per input image: either OCR results in the
+            same format as process_image(), or the exception raised for it
+        """
+        outputs: list = [None] * len(images)
+        arrays = []
+        infos: list[PreprocessInfo] = []
+        indices = []
+        for i, image_bytes in enumerate(images):
+            try:
+                image_array, info = decode_image(
+                    image_bytes, self.max_side, self.max_pixels
+                )
+            except Exception as e:
+                outputs[i] = e
+                continue
+            arrays.append(image_array)
+            infos.append(info)
+            indices.append(i)
+
+        if arrays:
+            for i, results, info in zip(
+                indices, self._predict(arrays, infos, options), infos
+            ):
+                outputs[i] = (results, info.to_dict()) if with_info else results
+
+        return outputs
+
+    def process_document_page(
+        self,
+        data: bytes,
+        page_index: int,
+        dpi: int = 200,
+        with_info: bool = False,
+        options: PipelineOptions = DEFAULT_OPTIONS,
+    ):
+        """
+        Perform OCR on a single page of a multi-page document.
+
+        Only this page is decoded, so pages can be processed in parallel
+        without holding the whole decoded document in memory.
+
+        Args:
+            data: Document bytes (PDF, multi-page TIFF, animated GIF, ...)
+            page_index: 0-based page index
+            dpi: Rasterization resolution for PDF pages
+            with_info: Also return preprocessing info
+            options: Pipeline settings of the request
+
+        Returns:
+            Same as process_image() for the page image
+        """
+        stages: dict[str, tuple[int, int]] = {}
+        with record_stage(stages, "decode"):
+            page = load_page(data, page_index, dpi, self.max_pixels)
+        image_array, info = prepare_image(page, self.max_side)
+        info.stages = {**stages, **info.stages}
+
+        results = self._predict([image_array], [info], options)[0]
+        return (results, info.to_dict()) if with_info else results
+
+    def process_zones(
+        self,
+        image_bytes: ImageSource,
+        zones: list[Zone],
+        relative: bool = False,
+        with_info: bool = False,
+        options: PipelineOptions = DEFAULT_OPTIONS,
+    ):
+        """
+        Perform OCR only inside the given zones of an image.
+
+        Single-line zones are cropped and recognized in one batch without
+        running detection; multiline zones run the full pipeline on their
+        crops, again in one batch.
+
+        Args:
+            image_bytes: Binary image data or a binary file object
+            zones: Zones in original image coordinates
+            relative: Zone coordinates are fractions of the image width and
+                height instead of pixels
+            with_info: Also return preprocessing info
+            options: Pipeline settings for multiline zones (single-line
+                zones only run recognition)
+
+        Returns:
+            {zone name: OCR results in process_image() format} in zone order
+            (or a (results, preprocess info dict) tuple when with_info is set).
+            Coordinates are in original image coordinates.
+        """
+        image_array, info = decode_image(image_bytes, self.max_side, self.max_pixels)
+        if relative:
+            to_image = (info.width, info.height)
+        else:
+            to_image = (1 / info.scale_x, 1 / info.scale_y)
+        if self.rec_model_name is None:
+            zones = [Zone(zone.name, zone.points, True) for zone in zones]
+        crops = [crop_zone(image_array, zone.scaled(*to_image)) for zone in zones]
+
+        lines = [c for c in crops if c is not None and not c.zone.multiline]
+        blocks = [c for c in crops if c is not None and c.zone.multiline]
+        outputs: dict[str, list] = {}
+        if lines:
+            with record_stage(info.stages, "recognize"):
+                recognized = self.recognizer.predict(
+                    [crop.image for crop in lines], batch_size=len(lines)
+                )
+            for crop, item in zip(lines, recognized):
+                outputs[crop.zone.name] = [
+                    [crop.zone.points, (item["rec_text"], float(item["rec_score"]))]
+                ]
+        if blocks:
+            self._model_timings.clear()
+            with record_stage(info.stages, "predict"):
+                predicted = list(
+                    self.pipeline(options).predict(
+                        [crop.image for crop in blocks], **options.predict_kwargs()
+                    )
+                )
+            info.stages.update(self._model_stages())
+            for crop, item in zip(blocks, predicted):
+                outputs[crop.zone.name] = self._zone_to_legacy(item, crop)
+
+        with record_stage(info.stages, "postprocess"):
+            scale = np.array([info.scale_x, info.scale_y])
+            results = {}
+            for zone in zones:
+                results[zone.name] = [
+                    [(np.asarray(poly) * scale).tolist(), (text, score)]
+                    for poly, (text, score) in outputs.get(zone.name, [])
+                    if text
+                ]
+        return (results, info.to_dict()) if with_info else results
+
+    @staticmethod
+    def _zone_to_legacy(item, crop) -> list:
+        """Convert a predict() result for a zone crop to page coordinates."""
+        if not isinstance(item, dict):
             return []
+        offset = np.array(crop.offset)
+        return [
+            [(poly + offset).tolist(), (text, float(score))]
+            for text, score, poly in zip(
+                item.get("rec_texts", []),
+                item.get("rec_scores", []),
+                item.get("rec_polys", []),
+            )
+        ]
+
+    def _predict(
+        self,
+        arrays: list[np.ndarray],
+        infos: list[PreprocessInfo],
+        options: PipelineOptions = DEFAULT_OPTIONS,
+    ) -> list[list]:
+        """Run one batched predict() call and convert results to legacy format."""
+        stages: dict[str, tuple[int, int]] = {}
+        ocr = self.pipeline(options)
+        self._model_timings.clear()
+        with record_stage(stages, "predict"):
+            result = list(ocr.predict(arrays, **options.predict_kwargs()) or [])
+        stages.update(self._model_stages())
+        result += [None] * (len(arrays) - len(result))
+
+        outputs = []
+        for item, array, info in zip(result, arrays, infos):
+            info.stages.update(stages)
+            if self._classifier is not None and isinstance(item, dict):
+                with record_stage(info.stages, "refine"):
+                    item = self._refine(item, array, info)
+            with record_stage(info.stages, "postprocess"):
+                outputs.append(self._to_legacy(item, info))
+        return outputs
 
-        # predict() returns a list, get first element
-        item = result[0] if result else None
+    def _model_stages(self) -> dict[str, tuple[int, int]]:
+        """
+        Stage spans of the pipeline's models in the last predict() call.
+
+        A model runs once per batch of images or text lines, so each span
+        starts at its first call and lasts as long as all calls together.
+        """
+        return {
+            stage: (start, start + elapsed)
+            for stage, (start, elapsed) in self._model_timings.items()
+        }
+
+    def _refine(self, item: dict, image: np.ndarray, info: PreprocessInfo) -> dict:
+        """Re-recognize low-confidence regions with the character classifier."""
+        refined = refine_texts(
+            image,
+            item.get("rec_texts", []),
+            item.get("rec_scores", []),
+            item.get("rec_polys", []),
+            self._classifier,
+            threshold=self.refine_threshold,
+            min_confidence=self.refine_min_confidence,
+            max_crops=self.refine_max_crops,
+        )
+        info.refine_crops = refined.crops
+        info.refine_replaced = refined.replaced
+        return {**item, "rec_texts": refined.texts}
+
+    @staticmethod
+    def _to_legacy(item, info: PreprocessInfo) -> list:
+        """Convert a single predict() result to legacy format for compatibility.
+
+        Polygons are scaled back to original image coordinates.
+        """
         if not item:
             return []
 
@@ -54,19 +654,28 @@ class OCRService:
             texts = item.get("rec_texts", [])
             scores = item.get("rec_scores", [])
             polys = item.get("rec_polys", [])
+            scale = np.array([info.scale_x, info.scale_y])
+            # Scale all quadrilaterals with one array operation and convert
+            # them to lists (for the cache and the JSON encoder) in one call
+            shapes = {np.shape(poly) for poly in polys}
+            if len(shapes) == 1:
+                polys = (np.asarray(polys, dtype=np.float64) * scale).tolist()
+            else:
+                polys = [(np.asarray(poly) * scale).tolist() for poly in polys]
+            scores = np.asarray(scores, dtype=np.float64).tolist()
 
-            legacy_results = []
-            for i, text in enumerate(texts):
-                score = scores[i] if i < len(scores) else 0.0
-                poly = polys[i].tolist() if i < len(polys) else []
-                legacy_results.append([poly, (text, score)])
-
-            return legacy_results
+            return [
+                [
+                    polys[i] if i < len(polys) else [],
+                    (text, scores[i] if i < len(scores) else 0.0),
+                ]
+                for i, text in enumerate(texts)
+            ]
 
         # Fallback for old API format (list of [bbox, (text, conf)])
-        return item if item else []
+        return item
 
     @property
     def is_ready(self) -> bool:
-        """Check if OCR service is initialized."""
-        return self._initialized
+        """Check if every model instance is loaded and warmed up."""
+        return self._ready
@@ -0,0 +1,88 @@
+from dataclasses import asdict, dataclass, fields
+
+# Stage switches of a request: "auto" keeps the pipeline's setting, "off"
+# skips the stage
+STAGE_MODES = ("auto", "off")
+DET_LIMIT_TYPES = ("max", "min")
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """Per-request PaddleOCR pipeline settings.
+
+    Defaults reproduce the pipeline as constructed. Everything except the
+    recognition batch size maps onto predict() arguments of the shared
+    pipeline; a batch size needs a pipeline variant built for it.
+    """
+
+    # "off" skips document orientation and textline orientation
+    # classification (for scans known to be upright)
+    orientation: str = "auto"
+    # "off" skips document unwarping (for flat scans)
+    unwarp: str = "auto"
+    # Resize images for text detection so their longest ("max") or shortest
+    # ("min") side is this many pixels (None keeps the pipeline's limit)
+    det_limit_side_len: int | None = None
+    det_limit_type: str | None = None
+    # Text lines recognized per batch (None keeps the pipeline's batch size)
+    rec_batch_size: int | None = None
+
+    def __post_init__(self):
+        if self.orientation not in STAGE_MODES:
+            raise ValueError(f"Invalid orientation: {self.orientation!r}")
+        if self.unwarp not in STAGE_MODES:
+            raise ValueError(f"Invalid unwarp: {self.unwarp!r}")
+        if self.det_limit_type not in (None, *DET_LIMIT_TYPES):
+            raise ValueError(f"Invalid det_limit_type: {self.det_limit_type!r}")
+        if self.det_limit_side_len is not None and self.det_limit_side_len < 1:
+            raise ValueError("det_limit_side_len must be >= 1")
+        if self.rec_batch_size is not None and self.rec_batch_size < 1:
+            raise ValueError("rec_batch_size must be >= 1")
+
+    @property
+    def is_default(self) -> bool:
+        return self == DEFAULT_OPTIONS
+
+    def predict_kwargs(self) -> dict:
+        """Keyword arguments for PaddleOCR.predict()."""
+        kwargs = {}
+        if self.orientation == "off":
+            kwargs["use_doc_orientation_classify"] = False
+            kwargs["use_textline_orientation"] = False
+        if self.unwarp == "off":
+            kwargs["use_doc_unwarping"] = False
+        if self.det_limit_side_len is not None:
+            kwargs["text_det_limit_side_len"] = self.det_limit_side_len
+        if self.det_limit_type is not None:
+            kwargs["text_det_limit_type"] = self.det_limit_type
+        return kwargs
+
+    def changed(self) -> dict:
+        """Settings that differ from the defaults (part of result cache keys)."""
+        defaults = asdict(DEFAULT_OPTIONS)
+        return {
+            field.name: getattr(self, field.name)
+            for field in fields(self)
+            if getattr(self, field.name) != defaults[field.name]
+        }
+
+
+DEFAULT_OPTIONS = PipelineOptions()
+
+
+def filter_confidence(
+    ocr_results: list | dict[str, list], min_confidence: float
+) -> list | dict[str, list]:
+    """Drop regions scoring below min_confidence from results (or zone results)."""
+    if min_confidence <= 0:
+        return ocr_results
+    if isinstance(ocr_results, dict):
+        return {
+            name: filter_confidence(results, min_confidence)
+            for name, results in ocr_results.items()
+        }
+    return [
+        item
+        for item in ocr_results
+        if item is not None and item[1][1] >= min_confidence
+    ]
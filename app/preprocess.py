@@ -0,0 +1,198 @@
+import io
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import BinaryIO
+
+import numpy as np
+from PIL import ExifTags, Image, ImageOps
+
+from app.timing import record_stage
+
+# Encoded image: bytes, or a binary file object such as a spooled upload,
+# which is decoded in place without first reading it into memory
+ImageSource = bytes | BinaryIO
+
+
+class ImageTooLargeError(ValueError):
+    """Raised when an image exceeds the configured pixel limit."""
+
+
+def check_pixels(width: int, height: int, max_pixels: int) -> None:
+    """Reject images larger than max_pixels (0 disables the check)."""
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLargeError(
+            f"Image is too large: {width}x{height} pixels "
+            f"(maximum is {max_pixels} pixels)"
+        )
+
+
+@dataclass
+class PreprocessInfo:
+    """What the preprocessing stage did to a single image."""
+
+    original_width: int
+    original_height: int
+    width: int
+    height: int
+    draft_decode: bool
+    decode_ms: float
+    preprocess_ms: float
+    memory_saved_bytes: int
+    # Upper bound of memory held by the encoded and decoded image buffers
+    # while decoding and preprocessing (excludes inference)
+    peak_memory_bytes: int = 0
+    # Character crops re-examined by the classifier and characters replaced
+    refine_crops: int = 0
+    refine_replaced: int = 0
+    # Pipeline stage spans: name -> (start_ns, end_ns)
+    stages: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def scale_x(self) -> float:
+        """Factor mapping processed x coordinates back to the original image."""
+        return self.original_width / self.width
+
+    @property
+    def scale_y(self) -> float:
+        """Factor mapping processed y coordinates back to the original image."""
+        return self.original_height / self.height
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def decode_image(
+    source: ImageSource,
+    max_side: int = 0,
+    max_pixels: int = 0,
+) -> tuple[np.ndarray, PreprocessInfo]:
+    """
+    Decode an encoded image into an upright, contiguous RGB uint8 array.
+
+    The pixel limit is checked from the header before anything is decoded.
+    JPEGs are decoded at a reduced DCT scale when the image is larger than
+    max_side, EXIF orientation is applied, and the result is downscaled so
+    its longest side is at most max_side.
+
+    Args:
+        source: Binary image data or a binary file object (read from the start)
+        max_side: Maximum length of the longest side (0 keeps full resolution)
+        max_pixels: Maximum width x height of the image (0 disables the limit)
+
+    Returns:
+        (RGB array, preprocessing info)
+    """
+    start = time.perf_counter()
+    stages: dict[str, tuple[int, int]] = {}
+
+    if isinstance(source, bytes):
+        encoded_bytes = len(source)
+        source = io.BytesIO(source)
+    else:
+        # File-backed uploads are not held in memory
+        encoded_bytes = 0
+        source.seek(0)
+
+    with record_stage(stages, "decode"):
+        image = Image.open(source)
+        check_pixels(image.width, image.height, max_pixels)
+        original_size = upright_size(image)
+
+        draft_decode = False
+        if max_side and image.format == "JPEG" and max(image.size) > max_side:
+            ratio = max_side / max(image.size)
+            requested = (
+                math.ceil(image.width * ratio),
+                math.ceil(image.height * ratio),
+            )
+            draft_decode = image.draft("RGB", requested) is not None
+
+        image.load()
+    decode_ms = (time.perf_counter() - start) * 1000
+
+    image_array, info = prepare_image(image, max_side, original_size)
+    info.peak_memory_bytes += encoded_bytes
+    info.draft_decode = draft_decode
+    info.decode_ms = decode_ms
+    info.preprocess_ms = (time.perf_counter() - start) * 1000
+    info.stages = {**stages, **info.stages}
+    return image_array, info
+
+
+def prepare_image(
+    image: Image.Image,
+    max_side: int = 0,
+    original_size: tuple[int, int] | None = None,
+) -> tuple[np.ndarray, PreprocessInfo]:
+    """
+    Convert an opened image into an upright, contiguous RGB uint8 array.
+
+    Args:
+        image: Opened PIL image (a single page or frame)
+        max_side: Maximum length of the longest side (0 keeps full resolution)
+        original_size: Upright (width, height) before any reduced decoding;
+            defaults to the size of the image itself
+
+    Returns:
+        (RGB array, preprocessing info)
+    """
+    start = time.perf_counter()
+    stages: dict[str, tuple[int, int]] = {}
+    original_width, original_height = original_size or upright_size(image)
+    # Every intermediate image is counted as if still alive (upper bound)
+    peak_memory_bytes = _image_nbytes(image)
+
+    with record_stage(stages, "preprocess"):
+        # In place: without an EXIF rotation this avoids copying the image
+        if image.getexif().get(ExifTags.Base.Orientation, 1) > 1:
+            peak_memory_bytes += _image_nbytes(image)
+        ImageOps.exif_transpose(image, in_place=True)
+
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+            peak_memory_bytes += _image_nbytes(image)
+
+        if max_side and max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            peak_memory_bytes += _image_nbytes(image)
+
+        # np.asarray takes a single copy out of PIL's internal storage
+        image_array = np.ascontiguousarray(np.asarray(image, dtype=np.uint8))
+        peak_memory_bytes += image_array.nbytes
+
+    width, height = image.size
+    info = PreprocessInfo(
+        original_width=original_width,
+        original_height=original_height,
+        width=width,
+        height=height,
+        draft_decode=False,
+        decode_ms=0.0,
+        preprocess_ms=(time.perf_counter() - start) * 1000,
+        memory_saved_bytes=(original_width * original_height - width * height) * 3,
+        peak_memory_bytes=peak_memory_bytes,
+        stages=stages,
+    )
+    return image_array, info
+
+
+def _image_nbytes(image: Image.Image) -> int:
+    """Approximate size of a decoded PIL image buffer."""
+    # PIL stores multi-band pixels in 32 bits
+    if len(image.getbands()) > 1 or image.mode in ("I", "F"):
+        bytes_per_pixel = 4
+    elif image.mode.startswith("I;16"):
+        bytes_per_pixel = 2
+    else:
+        bytes_per_pixel = 1
+    return image.width * image.height * bytes_per_pixel
+
+
+def upright_size(image: Image.Image) -> tuple[int, int]:
+    """Image size after applying EXIF orientation."""
+    width, height = image.size
+    # EXIF orientations 5-8 swap width and height
+    if image.getexif().get(ExifTags.Base.Orientation, 1) >= 5:
+        return height, width
+    return width, height
@@ -0,0 +1,134 @@
+import unicodedata
+from dataclasses import dataclass
+from itertools import pairwise
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.classifier import CharacterClassifier
+
+# White margin added around each character crop, relative to its size.
+# Training glyphs are 16 px characters centered in 30 px images.
+CROP_MARGIN = 7 / 16
+
+
+@dataclass
+class RefineResult:
+    """What the re-recognition stage did to one image."""
+
+    texts: list[str]
+    crops: int = 0
+    replaced: int = 0
+
+
+def refine_texts(
+    image: np.ndarray,
+    texts: list[str],
+    scores: list[float],
+    polys: list,
+    classifier: CharacterClassifier,
+    threshold: float,
+    min_confidence: float = 0.9,
+    max_crops: int = 64,
+) -> RefineResult:
+    """
+    Re-recognize characters of low-confidence regions with the classifier.
+
+    Regions scoring below ``threshold`` are split into one cell per character
+    (along the longer side, which assumes full-width characters), and the
+    cells of characters the classifier was trained on are classified in a
+    single batch. Other characters (kana, punctuation, kanji outside its
+    label set) are left alone, since the classifier could only replace them
+    with a wrong character from its own vocabulary. A character is replaced
+    when the classifier disagrees with at least ``min_confidence`` and a
+    higher score than the recognizer gave the region.
+
+    Regions are examined lowest score first, and only while the number of
+    crops stays within ``max_crops``, which bounds the added latency.
+
+    Args:
+        image: RGB image the polygons refer to
+        texts: Recognized text per region
+        scores: Recognition score per region
+        polys: Region polygons in image coordinates
+        classifier: Single-character classifier
+        threshold: Regions scoring below this are re-examined
+        min_confidence: Minimum classifier score to replace a character
+            (which must also exceed the region's recognition score)
+        max_crops: Maximum number of character crops per image
+
+    Returns:
+        Refined texts and how many crops were examined and characters replaced
+    """
+    result = RefineResult(texts=list(texts))
+
+    crops: list[Image.Image] = []
+    positions: list[tuple[int, int]] = []
+    candidates = sorted(
+        (i for i, score in enumerate(scores) if score < threshold and i < len(polys)),
+        key=lambda i: scores[i],
+    )
+    for i in candidates:
+        text = texts[i]
+        if not text or not _is_full_width(text):
+            continue
+        known = [j for j, char in enumerate(text) if char in classifier.char_set]
+        if not known:
+            continue
+        if len(crops) + len(known) > max_crops:
+            break
+        cells = split_characters(image, polys[i], len(text))
+        for j in known:
+            crops.append(cells[j])
+            positions.append((i, j))
+
+    if not crops:
+        return result
+
+    predictions = classifier.classify(crops, top_k=1)
+    result.crops = len(crops)
+
+    chars = {i: list(result.texts[i]) for i, _ in positions}
+    for (i, j), [(char, score)] in zip(positions, predictions):
+        if char != chars[i][j] and score >= min_confidence and score > scores[i]:
+            chars[i][j] = char
+            result.replaced += 1
+    for i, region_chars in chars.items():
+        result.texts[i] = "".join(region_chars)
+
+    return result
+
+
+def split_characters(image: np.ndarray, poly, count: int) -> list[Image.Image]:
+    """
+    Cut a text region into ``count`` equal character cells.
+
+    Horizontal lines are split left to right, vertical lines top to bottom.
+    Each cell gets a white margin like the training images.
+    """
+    points = np.asarray(poly, dtype=np.float32)
+    height, width = image.shape[:2]
+    x0, y0 = np.clip(np.floor(points.min(axis=0)), 0, [width, height]).astype(int)
+    x1, y1 = np.clip(np.ceil(points.max(axis=0)), 0, [width, height]).astype(int)
+    region = image[y0:y1, x0:x1]
+    if region.size == 0:
+        return [Image.new("RGB", (1, 1), "white")] * count
+
+    vertical = region.shape[0] > region.shape[1]
+    length = region.shape[0] if vertical else region.shape[1]
+    edges = np.linspace(0, length, count + 1).round().astype(int)
+
+    cells = []
+    for start, end in pairwise(edges):
+        if end <= start:
+            cells.append(Image.new("RGB", (1, 1), "white"))
+            continue
+        cell = region[start:end] if vertical else region[:, start:end]
+        cell_image = Image.fromarray(np.ascontiguousarray(cell))
+        margin = max(1, round(max(cell_image.size) * CROP_MARGIN))
+        cells.append(ImageOps.expand(cell_image, margin, fill="white"))
+    return cells
+
+
+def _is_full_width(text: str) -> bool:
+    return all(unicodedata.east_asian_width(char) in ("W", "F") for char in text)
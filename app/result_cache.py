@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO
+
+# Seconds between sweeps of expired entries out of the on-disk tier
+SWEEP_INTERVAL_SECONDS = 3600
+
+
+def make_cache_key(image_bytes: bytes | BinaryIO, ocr_config: dict) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        image_bytes: Binary image data, or a binary file object hashed from
+            the start in chunks (without reading it into memory)
+        ocr_config: OCR settings that affect the result (language, model version, ...)
+
+    Returns:
+        Hex digest identifying the image and configuration
+    """
+    if isinstance(image_bytes, bytes):
+        digest = hashlib.sha256(image_bytes)
+    else:
+        image_bytes.seek(0)
+        digest = hashlib.file_digest(image_bytes, "sha256")
+    digest.update(json.dumps(ocr_config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def config_digest(ocr_config: dict) -> str:
+    """Hex digest identifying OCR settings alone (see make_cache_key)."""
+    return hashlib.sha256(json.dumps(ocr_config, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Two-tier OCR result cache.
+
+    An in-memory LRU tier bounded by entry count and TTL, backed by an
+    optional on-disk tier (one JSON file per key) that survives restarts.
+    The on-disk tier is bounded by its own entry count; expired and excess
+    files are swept periodically, oldest first.
+
+    The event loop should use get_async() and set_async(), which do disk
+    I/O in a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        disk_dir: str | None = None,
+        disk_max_entries: int = 100_000,
+    ):
+        """
+        Initialize result cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries
+            ttl_seconds: Entry lifetime in both tiers
+            disk_dir: Directory for the on-disk tier (None disables it)
+            disk_max_entries: Maximum number of on-disk entries (0 is unlimited)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_entries = disk_max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Files in the on-disk tier as of the last sweep plus writes since;
+        # None until the first sweep counted them
+        self._disk_entries: int | None = None
+        self._swept_at = 0.0
+        self._sweep_lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for key, or None on a miss."""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._disk_result(key, self._read_disk(key))
+
+    async def get_async(self, key: str) -> Any | None:
+        """get() reading the on-disk tier in a worker thread."""
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        entry = None
+        if self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+        return self._disk_result(key, entry)
+
+    def _get_memory(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.time() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        return None
+
+    def _disk_result(self, key: str, entry: tuple[float, Any] | None) -> Any | None:
+        if entry is not None:
+            stored_at, value = entry
+            self._store_memory(key, stored_at, value)
+            self.hits += 1
+            self.disk_hits += 1
+            return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key."""
+        stored_at = time.time()
+        self._store_memory(key, stored_at, value)
+        if self.disk_dir is not None:
+            self._write_disk(key, stored_at, value)
+            if self._sweep_due():
+                self.sweep()
+
+    async def set_async(self, key: str, value: Any) -> None:
+        """set() writing (and sweeping) the on-disk tier in a worker thread."""
+        stored_at = time.time()
+        self._store_memory(key, stored_at, value)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, stored_at, value)
+            if self._sweep_due():
+                await asyncio.to_thread(self.sweep)
+
+    def sweep(self) -> int:
+        """
+        Delete expired on-disk entries, then the oldest ones over the limit.
+
+        Entry age is taken from the file modification time, so files are
+        not parsed.
+
+        Returns:
+            Number of entries deleted
+        """
+        # One sweep at a time; a concurrent caller skips rather than waits
+        if self.disk_dir is None or not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            self._swept_at = time.monotonic()
+            files = []
+            for path in self.disk_dir.glob("*/*"):
+                try:
+                    files.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+            files.sort()
+            expired = [path for mtime, path in files if now - mtime >= self.ttl]
+            kept = [path for mtime, path in files if now - mtime < self.ttl]
+            # Leftover temporary files of interrupted writes are only expired
+            kept = [path for path in kept if path.suffix == ".json"]
+            excess = []
+            if self.disk_max_entries > 0 and len(kept) > self.disk_max_entries:
+                excess = kept[: len(kept) - self.disk_max_entries]
+            for path in expired + excess:
+                path.unlink(missing_ok=True)
+            self._disk_entries = len(kept) - len(excess)
+            return len(expired) + len(excess)
+        finally:
+            self._sweep_lock.release()
+
+    def _sweep_due(self) -> bool:
+        if self._disk_entries is None:
+            return True
+        if self.disk_max_entries > 0 and self._disk_entries > self.disk_max_entries:
+            return True
+        return time.monotonic() - self._swept_at >= SWEEP_INTERVAL_SECONDS
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and tier sizes."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "disk_enabled": self.disk_dir is not None,
+            "disk_entries": self._disk_entries or 0,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _store_memory(self, key: str, stored_at: float, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> tuple[float, Any] | None:
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry["stored_at"] >= self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry["stored_at"], entry["value"]
+
+    def _write_disk(self, key: str, stored_at: float, value: Any) -> None:
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically so a crash never leaves a truncated entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "value": value}, f, default=float)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        if self._disk_entries is not None:
+            self._disk_entries += 1
@@ -0,0 +1,177 @@
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+# Parallel arrays instead of one object per region
+COLUMNAR_MEDIA_TYPE = "application/vnd.ocr.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Media types accepted in the Accept header and the format they select
+ACCEPTED_MEDIA_TYPES = {
+    JSON_MEDIA_TYPE: JSON_MEDIA_TYPE,
+    "application/*": JSON_MEDIA_TYPE,
+    "*/*": JSON_MEDIA_TYPE,
+    COLUMNAR_MEDIA_TYPE: COLUMNAR_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE: MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+INT16_MAX = np.iinfo(np.int16).max
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """
+    Choose the response format from an Accept header.
+
+    Returns the supported media type with the highest quality value (the
+    first one listed on ties), and JSON when nothing supported is accepted.
+    MessagePack is only offered when msgpack is installed.
+    """
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+    for entry in (accept or "").split(","):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        selected = ACCEPTED_MEDIA_TYPES.get(media_type.lower())
+        if selected is None or (selected == MSGPACK_MEDIA_TYPE and msgpack is None):
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = selected, quality
+    return best
+
+
+def encode(content: dict, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Encode a response body (built by the *_payload functions) as the media type."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_to_builtin
+    ).encode()
+
+
+def _to_builtin(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ocr_payload(ocr_results: list) -> dict:
+    """
+    Build an OCRResponse body directly from [[bbox, (text, confidence)], ...].
+
+    Produces the same document as OCRResponse.model_dump() without creating
+    a model object per region.
+    """
+    results = [
+        {
+            "text": text,
+            "confidence": float(confidence),
+            "bounding_box": {"points": bbox},
+        }
+        for bbox, (text, confidence) in _regions(ocr_results)
+    ]
+    return {
+        "success": True,
+        "results": results,
+        "full_text": "\n".join(result["text"] for result in results),
+        "message": f"Detected {len(results)} text regions",
+        "preprocess": None,
+        "refine": None,
+        "zones": None,
+    }
+
+
+def zone_payload(zone_results: dict[str, list]) -> dict:
+    """Build an OCRResponse body from {zone name: results} of a zone request."""
+    zones = {}
+    for name, ocr_results in zone_results.items():
+        zone = ocr_payload(ocr_results)
+        zones[name] = {
+            "text": zone["full_text"],
+            "confidence": min(
+                (result["confidence"] for result in zone["results"]), default=0.0
+            ),
+            "results": zone["results"],
+        }
+    return {
+        "success": True,
+        "results": [result for zone in zones.values() for result in zone["results"]],
+        "full_text": "\n".join(zone["text"] for zone in zones.values() if zone["text"]),
+        "message": f"Recognized {sum(bool(z['text']) for z in zones.values())}"
+        f"/{len(zones)} zones",
+        "preprocess": None,
+        "refine": None,
+        "zones": zones,
+    }
+
+
+def columnar_payload(ocr_results: list | dict[str, list], binary: bool = False) -> dict:
+    """
+    Build a compact response with one array per field instead of per region.
+
+    ``texts``, ``scores`` and ``point_counts`` have one entry per region;
+    ``polygons`` holds the rounded [x, y] coordinates of all regions one
+    after the other, region i taking ``2 * point_counts[i]`` values. Zone
+    results (a dict) add a ``zones`` array with the zone name of each region.
+
+    With ``binary`` (MessagePack), scores are little-endian float32 bytes and
+    polygons little-endian bytes of ``coordinate_dtype``: int16, or int32 for
+    pages larger than 32767 pixels.
+    """
+    names = None
+    if isinstance(ocr_results, dict):
+        names = [
+            name for name, results in ocr_results.items() for _ in _regions(results)
+        ]
+        ocr_results = [item for results in ocr_results.values() for item in results]
+
+    regions = list(_regions(ocr_results))
+    texts = [text for _, (text, _) in regions]
+    scores = [float(score) for _, (_, score) in regions]
+    coordinates = [value for bbox, _ in regions for point in bbox for value in point]
+    polygons = np.rint(np.array(coordinates, dtype=np.float64))
+    fits_int16 = polygons.size == 0 or np.abs(polygons).max() <= INT16_MAX
+    dtype = np.dtype(np.int16 if fits_int16 else np.int32)
+    polygons = polygons.astype(dtype)
+    if binary:
+        scores = np.array(scores, dtype="<f4").tobytes()
+        polygons = polygons.astype(dtype.newbyteorder("<")).tobytes()
+
+    payload = {
+        "success": True,
+        "count": len(regions),
+        "full_text": "\n".join(texts),
+        "texts": texts,
+        "scores": scores,
+        "point_counts": [len(bbox) for bbox, _ in regions],
+        "coordinate_dtype": dtype.name,
+        "polygons": polygons,
+    }
+    if names is not None:
+        payload["zones"] = names
+    return payload
+
+
+def _regions(ocr_results: list):
+    return (item for item in ocr_results if item is not None)
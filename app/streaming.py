@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "sse": SSE_MEDIA_TYPE,
+}
+
+
+def encode_event(event: BaseModel, stream_format: str) -> bytes:
+    """
+    Encode a stream event as an NDJSON line or a Server-Sent Event.
+
+    Args:
+        event: Event model with an ``event`` field
+        stream_format: "ndjson" or "sse"
+
+    Returns:
+        Encoded event bytes
+    """
+    data = event.model_dump_json()
+    if stream_format == "sse":
+        return f"event: {event.event}\ndata: {data}\n\n".encode()
+    return f"{data}\n".encode()
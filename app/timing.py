@@ -0,0 +1,22 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+@contextmanager
+def record_stage(stages: dict[str, tuple[int, int]], name: str) -> Iterator[None]:
+    """
+    Record the wall-clock span of a pipeline stage.
+
+    Spans are plain (start_ns, end_ns) tuples so they can be returned from
+    worker processes and turned into metrics or trace spans by the caller.
+
+    Args:
+        stages: Mapping receiving the stage span
+        name: Stage name ("decode", "preprocess", "predict", ...)
+    """
+    start = time.time_ns()
+    try:
+        yield
+    finally:
+        stages[name] = (start, time.time_ns())
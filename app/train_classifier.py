@@ -5,13 +5,23 @@ TensorFlow画像分類モデル トレーニングスクリプト
 
 import os
 import json
+import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from tensorflow.keras import layers
 from pathlib import Path
 
+from app.export_classifier import export_classifier
+from app.lib.packed_dataset import (
+    has_packed_dataset,
+    iter_batches,
+    load_packed_dataset,
+    split_indices,
+)
+
 # 設定
 TRAIN_DATA_DIR = "training/t02/classification"
+PACKED_DATA_DIR = "training/t02"
 MODEL_SAVE_PATH = "models/character_classifier"
 IMG_SIZE = (30, 30)
 BATCH_SIZE = 32
@@ -57,7 +67,10 @@ def create_model(num_classes: int) -> keras.Model:
 
 
 def load_dataset():
-    """データセットを読み込み"""
+    """データセットを読み込み（パック形式があればそちらを使う）"""
+    if has_packed_dataset(PACKED_DATA_DIR):
+        return load_packed(PACKED_DATA_DIR)
+
     train_ds = keras.utils.image_dataset_from_directory(
         TRAIN_DATA_DIR,
         validation_split=VALIDATION_SPLIT,
@@ -78,7 +91,41 @@ def load_dataset():
         label_mode="int",
     )
 
-    return train_ds, val_ds
+    return train_ds, val_ds, train_ds.class_names
+
+
+def load_packed(data_dir: str):
+    """パック形式のデータセットをメモリマップから直接読み込む"""
+    dataset = load_packed_dataset(data_dir)
+    train_indices, val_indices = split_indices(
+        len(dataset), VALIDATION_SPLIT, seed=42
+    )
+    print(f"{len(dataset)} files, {len(train_indices)} for training (packed)")
+
+    signature = (
+        tf.TensorSpec(shape=(None, *IMG_SIZE, 3), dtype=tf.uint8),
+        tf.TensorSpec(shape=(None,), dtype=tf.int32),
+    )
+    # エポックごとにジェネレータが呼ばれ、学習用インデックスをシャッフルし直す
+    rng = np.random.default_rng(42)
+    train_ds = tf.data.Dataset.from_generator(
+        lambda: iter_batches(dataset, train_indices, BATCH_SIZE, rng=rng),
+        output_signature=signature,
+    )
+    val_ds = tf.data.Dataset.from_generator(
+        lambda: iter_batches(dataset, val_indices, BATCH_SIZE),
+        output_signature=signature,
+    )
+
+    # image_dataset_from_directory と同じ float32 で渡す
+    def to_float(images, labels):
+        return tf.cast(images, tf.float32), labels
+
+    return (
+        train_ds.map(to_float),
+        val_ds.map(to_float),
+        dataset.class_names,
+    )
 
 
 def save_class_names(class_names: list[str], save_dir: str):
@@ -109,17 +156,21 @@ def main():
 
     # データセット読み込み
     print("\nデータセットを読み込み中...")
-    train_ds, val_ds = load_dataset()
+    train_ds, val_ds, class_names = load_dataset()
 
-    class_names = train_ds.class_names
     num_classes = len(class_names)
     print(f"クラス数: {num_classes}")
     print(f"サンプルクラス: {class_names[:5]}...")
 
     # パフォーマンス最適化
     AUTOTUNE = tf.data.AUTOTUNE
-    train_ds = train_ds.cache().shuffle(1000).prefetch(buffer_size=AUTOTUNE)
-    val_ds = val_ds.cache().prefetch(buffer_size=AUTOTUNE)
+    if has_packed_dataset(PACKED_DATA_DIR):
+        # メモリマップから読むためキャッシュ不要（シャッフルはジェネレータ側で行う）
+        train_ds = train_ds.prefetch(buffer_size=AUTOTUNE)
+        val_ds = val_ds.prefetch(buffer_size=AUTOTUNE)
+    else:
+        train_ds = train_ds.cache().shuffle(1000).prefetch(buffer_size=AUTOTUNE)
+        val_ds = val_ds.cache().prefetch(buffer_size=AUTOTUNE)
 
     # モデル作成
     print("\nモデルを作成中...")
@@ -181,6 +232,12 @@ def main():
     # クラス名マッピング保存
     save_class_names(class_names, MODEL_SAVE_PATH)
 
+    # CPU推論用にエクスポート（TFLite）し、Kerasモデルと比較
+    print("\n" + "=" * 60)
+    print("TFLite エクスポート")
+    print("=" * 60)
+    export_classifier(model, train_ds, val_ds, MODEL_SAVE_PATH)
+
     # 結果表示
     print("\n" + "=" * 60)
     print("トレーニング結果")
@@ -0,0 +1,15 @@
+"""
+Preload PaddleOCR models in the fork server of the process executor.
+
+Imported (for its side effect) by the multiprocessing fork server when
+OCR_INFERENCE_START_METHOD is "forkserver". Every inference worker forked
+afterwards inherits the loaded pipelines of the startup languages and
+shares their weights copy-on-write instead of loading its own copy.
+"""
+
+from app import config
+from app.ocr_service import preload_models
+
+preload_models(
+    (config.OCR_LANG, *config.PINNED_LANGS), cpu_threads=config.INFERENCE_CPU_THREADS
+)
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Single-line crops at least this much taller than wide hold vertical text
+# and are rotated before recognition (same rule as the PaddleOCR pipeline)
+VERTICAL_RATIO = 1.5
+
+TEMPLATE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+@dataclass
+class Zone:
+    """Named region of a page to OCR.
+
+    Single-line zones are recognized directly; multiline zones run text
+    detection inside the crop.
+    """
+
+    name: str
+    points: list[tuple[float, float]]
+    multiline: bool = False
+
+    @classmethod
+    def from_box(cls, name: str, box: list[float], multiline: bool = False) -> "Zone":
+        """Create a zone from an [x0, y0, x1, y1] rectangle."""
+        x0, y0, x1, y1 = box
+        return cls(name, [(x0, y0), (x1, y0), (x1, y1), (x0, y1)], multiline)
+
+    def scaled(self, scale_x: float, scale_y: float) -> "Zone":
+        """Return the zone with its coordinates multiplied by the factors."""
+        points = [(x * scale_x, y * scale_y) for x, y in self.points]
+        return Zone(self.name, points, self.multiline)
+
+
+@dataclass
+class ZoneCrop:
+    """Pixels of one zone cut out of a page image."""
+
+    zone: Zone
+    image: np.ndarray
+    # Top-left corner of the crop in page coordinates
+    offset: tuple[int, int]
+    # Rotated 90 degrees counterclockwise (vertical single-line text)
+    rotated: bool = False
+
+
+def crop_zone(image: np.ndarray, zone: Zone) -> ZoneCrop | None:
+    """
+    Cut a zone out of an RGB page image.
+
+    Pixels inside the bounding box but outside a non-rectangular polygon are
+    painted white so neighbouring text does not leak into the crop.
+
+    Returns:
+        The crop, or None when the zone lies outside the image
+    """
+    height, width = image.shape[:2]
+    points = np.asarray(zone.points, dtype=np.float32)
+    x0, y0 = np.clip(np.floor(points.min(axis=0)), 0, [width, height]).astype(int)
+    x1, y1 = np.clip(np.ceil(points.max(axis=0)), 0, [width, height]).astype(int)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+
+    crop = image[y0:y1, x0:x1]
+    if not _is_box(points):
+        mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+        ImageDraw.Draw(mask).polygon(
+            [(x - x0, y - y0) for x, y in zone.points], fill=255
+        )
+        crop = np.where(np.asarray(mask)[..., None] > 0, crop, 255).astype(np.uint8)
+
+    rotated = not zone.multiline and crop.shape[0] >= crop.shape[1] * VERTICAL_RATIO
+    if rotated:
+        crop = np.rot90(crop)
+    return ZoneCrop(zone, np.ascontiguousarray(crop), (int(x0), int(y0)), rotated)
+
+
+def _is_box(points: np.ndarray) -> bool:
+    """Whether a polygon is an axis-aligned rectangle."""
+    if len(points) != 4:
+        return False
+    xs = set(np.round(points[:, 0], 3))
+    ys = set(np.round(points[:, 1], 3))
+    return len(xs) <= 2 and len(ys) <= 2
+
+
+class TemplateStore:
+    """Named form templates stored as JSON files in a directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def names(self) -> list[str]:
+        """Return the names of all saved templates."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.json"))
+
+    def get(self, name: str) -> dict | None:
+        """Return a saved template, or None if there is none with this name."""
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, template: dict) -> None:
+        """Save (or replace) a template."""
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(template, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def delete(self, name: str) -> bool:
+        """Delete a template; return whether it existed."""
+        path = self._path(name)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def _path(self, name: str) -> Path:
+        if not TEMPLATE_NAME_PATTERN.match(name):
+            raise ValueError(
+                f"Invalid template name: {name!r} "
+                "(use 1-64 letters, digits, '-' or '_')"
+            )
+        return self.directory / f"{name}.json"
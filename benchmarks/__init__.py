@@ -0,0 +1 @@
+# benchmarks - 性能計測・負荷試験
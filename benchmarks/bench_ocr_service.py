@@ -0,0 +1,190 @@
+"""OCRService benchmark: latency percentiles, throughput and peak RSS.
+
+Each phase runs in a fresh process so its peak RSS is reported on its own.
+
+Usage:
+    python -m benchmarks.bench_ocr_service --output bench/ocr_service.json
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.ocr_service import OCRService
+from benchmarks.report import latency_summary, peak_rss_mb, write_report
+from benchmarks.synthetic import IMAGE_SIZES, TEXT_DENSITIES, generate_documents
+
+
+def bench_latency(service: OCRService, documents, repeat: int, warmup: int) -> list:
+    """Measure process_image latency per synthetic document."""
+    results = []
+    for document in documents:
+        for _ in range(warmup):
+            service.process_image(document.image_bytes)
+
+        latencies = []
+        regions = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            regions = len(service.process_image(document.image_bytes))
+            latencies.append(time.perf_counter() - start)
+
+        summary = latency_summary(latencies)
+        print(
+            f"{document.name:>20}: p50 {summary['p50_ms']:8.1f} ms  "
+            f"p95 {summary['p95_ms']:8.1f} ms  regions {regions}"
+        )
+        results.append(
+            {
+                "document": document.name,
+                "width": document.width,
+                "height": document.height,
+                "density": document.density,
+                "lines": document.lines,
+                "regions": regions,
+                "latency": summary,
+            }
+        )
+    return results
+
+
+def measure_latency(lang: str, documents, repeat: int, warmup: int) -> list:
+    """bench_latency() on a service running in the calling thread."""
+    service = OCRService(lang=lang)
+    return bench_latency(service, documents, repeat, warmup)
+
+
+def bench_throughput(
+    lang: str, executor: str, workers: int, cpu_threads: int, documents, images: int
+) -> dict:
+    """Measure images per second through the inference pool."""
+    service = OCRService(
+        lang=lang, executor=executor, workers=workers, cpu_threads=cpu_threads
+    )
+
+    async def run_all():
+        # Warm up every worker before timing
+        await asyncio.gather(
+            *(
+                service.process_image_async(documents[0].image_bytes)
+                for _ in range(workers)
+            )
+        )
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                service.process_image_async(documents[i % len(documents)].image_bytes)
+                for i in range(images)
+            )
+        )
+        return time.perf_counter() - start
+
+    try:
+        elapsed = asyncio.run(run_all())
+    finally:
+        service.close()
+
+    result = {
+        "executor": executor,
+        "workers": workers,
+        "cpu_threads": cpu_threads,
+        "images": images,
+        "elapsed_s": elapsed,
+        "images_per_second": images / elapsed,
+    }
+    print(f"{workers} {executor} worker(s): {result['images_per_second']:.2f} images/s")
+    return result
+
+
+def run_phase(function, *args):
+    """Run function(*args) in a fresh process; return its result and peak RSS."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_measure_phase, function, *args).result()
+
+
+def _measure_phase(function, *args):
+    result = function(*args)
+    # Inference workers were shut down by now, so they count as children
+    return result, peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="bench/ocr_service.json")
+    parser.add_argument("--lang", default="japan")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--sizes",
+        nargs="*",
+        default=[name for name, _, _ in IMAGE_SIZES],
+        help="Image sizes to include",
+    )
+    parser.add_argument(
+        "--densities",
+        nargs="*",
+        default=[name for name, _ in TEXT_DENSITIES],
+        help="Text densities to include",
+    )
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        default=1,
+        help="CPU threads per worker in the throughput runs "
+        "(0 keeps Paddle's default, which uses every core)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker count for the multi-core throughput run "
+        "(default: CPU count / --cpu-threads)",
+    )
+    parser.add_argument("--executor", default="process", choices=["thread", "process"])
+    parser.add_argument("--throughput-images", type=int, default=64)
+    args = parser.parse_args()
+    if args.workers is None:
+        args.workers = max(1, (os.cpu_count() or 1) // max(args.cpu_threads, 1))
+
+    documents = generate_documents(
+        sizes=[size for size in IMAGE_SIZES if size[0] in args.sizes],
+        densities=[d for d in TEXT_DENSITIES if d[0] in args.densities],
+    )
+
+    print("Latency (single image, calling thread)")
+    latency, latency_rss = run_phase(
+        measure_latency, args.lang, documents, args.repeat, args.warmup
+    )
+
+    print("\nThroughput")
+    throughput = []
+    for workers in dict.fromkeys([1, args.workers]):
+        result, result_rss = run_phase(
+            bench_throughput,
+            args.lang,
+            args.executor,
+            workers,
+            args.cpu_threads,
+            documents,
+            args.throughput_images,
+        )
+        throughput.append({**result, "peak_rss": result_rss})
+
+    write_report(
+        args.output,
+        "ocr_service",
+        {
+            "config": vars(args),
+            "latency": latency,
+            "latency_peak_rss": latency_rss,
+            "throughput": throughput,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
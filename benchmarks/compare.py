@@ -0,0 +1,76 @@
+"""Compare two benchmark JSON reports.
+
+Usage:
+    python -m benchmarks.compare bench/base.json bench/head.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def flatten(value, prefix: str = "") -> dict[str, float]:
+    """Flatten nested results into {"path.to.metric": value} for numeric leaves."""
+    items: dict[str, float] = {}
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key in ("environment", "config"):
+                continue
+            items.update(flatten(child, f"{prefix}{key}."))
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            label = child.get("document") if isinstance(child, dict) else None
+            if label is None and isinstance(child, dict):
+                label = child.get("workers", child.get("concurrency"))
+            items.update(
+                flatten(child, f"{prefix}{label if label is not None else i}.")
+            )
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        items[prefix.rstrip(".")] = float(value)
+    return items
+
+
+def is_higher_better(metric: str) -> bool:
+    return metric.endswith(("per_second",))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change reported as a regression",
+    )
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    base_metrics = flatten(base)
+    head_metrics = flatten(head)
+    print(f"base: {base['environment'].get('commit')}")
+    print(f"head: {head['environment'].get('commit')}")
+
+    regressions = 0
+    for metric in sorted(base_metrics.keys() & head_metrics.keys()):
+        if not metric.endswith(("_ms", "per_second", "_mb")):
+            continue
+        old, new = base_metrics[metric], head_metrics[metric]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        worse = -change if is_higher_better(metric) else change
+        flag = "REGRESSION" if worse > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{metric:<60} {old:12.2f} -> {new:12.2f} ({change:+.1%}) {flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
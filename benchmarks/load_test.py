@@ -0,0 +1,122 @@
+"""HTTP load generator for the OCR API.
+
+Usage:
+    python -m benchmarks.load_test --url http://localhost:8000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.report import latency_summary, write_report
+from benchmarks.synthetic import IMAGE_SIZES, TEXT_DENSITIES, generate_documents
+
+
+async def run_load(
+    url: str,
+    endpoint: str,
+    documents,
+    concurrency: int,
+    requests: int,
+    timeout: float,
+) -> dict:
+    """
+    Send requests with a fixed number of concurrent clients.
+
+    Returns:
+        Latency summary, status code counts and achieved throughput
+    """
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    counter = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient):
+        for i in counter:
+            document = documents[i % len(documents)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    endpoint,
+                    params={"use_cache": "false"},
+                    files={
+                        "file": (
+                            f"{document.name}.png",
+                            document.image_bytes,
+                            "image/png",
+                        )
+                    },
+                )
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": elapsed,
+        "requests_per_second": requests / elapsed,
+        "statuses": dict(statuses),
+        "latency": latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--endpoint", default="/ocr")
+    parser.add_argument("--output", default="bench/load_test.json")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="*",
+        default=[1, 4, 16],
+        help="Concurrency levels to run",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--size", default="small", choices=[s[0] for s in IMAGE_SIZES])
+    parser.add_argument(
+        "--density", default="normal", choices=[d[0] for d in TEXT_DENSITIES]
+    )
+    args = parser.parse_args()
+
+    documents = generate_documents(
+        sizes=[size for size in IMAGE_SIZES if size[0] == args.size],
+        densities=[d for d in TEXT_DENSITIES if d[0] == args.density],
+    )
+
+    runs = []
+    for concurrency in args.concurrency:
+        result = asyncio.run(
+            run_load(
+                args.url,
+                args.endpoint,
+                documents,
+                concurrency,
+                args.requests,
+                args.timeout,
+            )
+        )
+        latency = result["latency"]
+        print(
+            f"concurrency {concurrency:>3}: {result['requests_per_second']:7.2f} req/s  "
+            f"p50 {latency.get('p50_ms', 0):8.1f} ms  "
+            f"p99 {latency.get('p99_ms', 0):8.1f} ms  {result['statuses']}"
+        )
+        runs.append(result)
+
+    write_report(args.output, "load_test", {"config": vars(args), "runs": runs})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark result helpers (statistics, environment metadata, JSON output)."""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """Summarize latencies in seconds as milliseconds."""
+    if not latencies:
+        return {"count": 0}
+    values = np.array(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident set size of this process and its (waited-for) children."""
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor,
+        "children_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor,
+    }
+
+
+def environment() -> dict:
+    """Describe where the benchmark ran so results can be compared."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(path: str, benchmark: str, results: dict) -> None:
+    """Write benchmark results with environment metadata as JSON."""
+    report = {"benchmark": benchmark, "environment": environment(), **results}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {path}")
@@ -0,0 +1,113 @@
+"""Synthetic test documents rendered with the bundled fonts."""
+
+import io
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.lib.generate_training_source import parse_char_file
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_FONT = ROOT_DIR / "fonts" / "MPlus1p-Regular.ttf"
+DEFAULT_CHAR_FILE = ROOT_DIR / "doc" / "jis_x_0208_level1_kanji.txt"
+
+# (name, width, height)
+IMAGE_SIZES = [
+    ("small", 640, 480),
+    ("medium", 1280, 960),
+    ("a4_150dpi", 1240, 1754),
+    ("a4_300dpi", 2480, 3508),
+]
+
+# (name, fraction of the page height covered by text lines)
+TEXT_DENSITIES = [
+    ("sparse", 0.1),
+    ("normal", 0.4),
+    ("dense", 0.9),
+]
+
+
+@dataclass
+class SyntheticDocument:
+    name: str
+    width: int
+    height: int
+    density: str
+    lines: int
+    image_bytes: bytes
+
+
+def render_document(
+    width: int,
+    height: int,
+    density: float,
+    font_path: Path = DEFAULT_FONT,
+    char_file: Path = DEFAULT_CHAR_FILE,
+    seed: int = 0,
+    format: str = "PNG",
+) -> tuple[bytes, int]:
+    """
+    Render a page of random kanji text lines.
+
+    Args:
+        width: Page width in pixels
+        height: Page height in pixels
+        density: Fraction of the page height covered by text lines
+        font_path: Font used for rendering
+        char_file: Character list (see parse_char_file)
+        seed: Random seed; the same arguments always give the same image
+        format: Output image format
+
+    Returns:
+        (encoded image bytes, number of text lines)
+    """
+    rng = random.Random(seed)
+    chars = [char for _, char in parse_char_file(str(char_file))]
+
+    font_size = max(16, width // 40)
+    line_height = int(font_size * 1.6)
+    margin = font_size
+    chars_per_line = max(1, (width - 2 * margin) // font_size)
+    max_lines = max(1, (height - 2 * margin) // line_height)
+    lines = max(1, min(max_lines, round(max_lines * density)))
+
+    font = ImageFont.truetype(str(font_path), font_size)
+    image = Image.new("RGB", (width, height), color="white")
+    draw = ImageDraw.Draw(image)
+
+    # Spread the lines evenly over the page
+    step = max_lines / lines
+    for i in range(lines):
+        y = margin + int(i * step) * line_height
+        length = rng.randint(chars_per_line // 2, chars_per_line)
+        text = "".join(rng.choice(chars) for _ in range(length))
+        draw.text((margin, y), text, font=font, fill="black")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue(), lines
+
+
+def generate_documents(
+    sizes: list[tuple[str, int, int]] = IMAGE_SIZES,
+    densities: list[tuple[str, float]] = TEXT_DENSITIES,
+    seed: int = 0,
+) -> list[SyntheticDocument]:
+    """Render one document per (size, density) combination."""
+    documents = []
+    for size_name, width, height in sizes:
+        for density_name, density in densities:
+            image_bytes, lines = render_document(width, height, density, seed=seed)
+            documents.append(
+                SyntheticDocument(
+                    name=f"{size_name}-{density_name}",
+                    width=width,
+                    height=height,
+                    density=density_name,
+                    lines=lines,
+                    image_bytes=image_bytes,
+                )
+            )
+    return documents
@@ -0,0 +1,139 @@
+"""Tests for AdmissionController."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.admission import (
+    AdmissionController,
+    DeadlineExceededError,
+    PriorityQueueFullError,
+    QueueFullError,
+)
+
+
+async def _wait_queued(controller, depth):
+    while controller.stats()["queue_depth"] < depth:
+        await asyncio.sleep(0)
+
+
+class TestAdmissionController:
+    """Tests for bounded, prioritized admission."""
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            AdmissionController(capacity=0)
+
+    def test_admits_within_capacity(self):
+        async def run():
+            controller = AdmissionController(capacity=2)
+            async with controller.slot(), controller.slot():
+                assert controller.stats()["in_flight"] == 2
+            return controller.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["in_flight"] == 0
+        assert stats["admitted"]["interactive"] == 2
+
+    def test_interactive_goes_ahead_of_batch(self):
+        async def run():
+            controller = AdmissionController(capacity=1)
+            order = []
+
+            async def work(name, priority):
+                async with controller.slot(priority):
+                    order.append(name)
+
+            await controller.acquire()
+            tasks = [asyncio.create_task(work("batch", "batch"))]
+            await _wait_queued(controller, 1)
+            tasks.append(asyncio.create_task(work("interactive", "interactive")))
+            await _wait_queued(controller, 2)
+            controller.release()
+            await asyncio.gather(*tasks)
+            return order
+
+        assert asyncio.run(run()) == ["interactive", "batch"]
+
+    def test_full_queue_rejects_with_retry_after(self):
+        async def run():
+            controller = AdmissionController(capacity=1, max_queue=1)
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire())
+            await _wait_queued(controller, 1)
+            try:
+                with pytest.raises(QueueFullError) as excinfo:
+                    await controller.acquire()
+            finally:
+                controller.release()
+                await waiter
+                controller.release()
+            return excinfo.value, controller.stats()
+
+        error, stats = asyncio.run(run())
+
+        assert error.status_code == 503
+        assert error.retry_after >= 1
+        assert stats["rejected"]["interactive"] == 1
+        assert stats["in_flight"] == 0
+
+    def test_batch_queue_limit_leaves_room_for_interactive(self):
+        async def run():
+            controller = AdmissionController(
+                capacity=1, max_queue=4, queue_limits={"batch": 1}
+            )
+            await controller.acquire()
+            waiters = [asyncio.create_task(controller.acquire("batch"))]
+            await _wait_queued(controller, 1)
+            with pytest.raises(PriorityQueueFullError) as excinfo:
+                await controller.acquire("batch")
+            waiters.append(asyncio.create_task(controller.acquire("interactive")))
+            await _wait_queued(controller, 2)
+            for _ in range(3):
+                controller.release()
+                await asyncio.sleep(0)
+            await asyncio.gather(*waiters)
+            return excinfo.value
+
+        assert asyncio.run(run()).status_code == 429
+
+    def test_expired_waiter_is_dropped(self):
+        async def run():
+            controller = AdmissionController(capacity=1)
+            await controller.acquire()
+            with pytest.raises(DeadlineExceededError):
+                await controller.acquire(deadline=time.monotonic() + 0.01)
+            stats = controller.stats()
+            controller.release()
+            return stats, controller.stats()
+
+        queued, released = asyncio.run(run())
+
+        assert queued["queue_depth"] == 0
+        assert queued["expired"]["interactive"] == 1
+        assert released["in_flight"] == 0
+
+    def test_past_deadline_is_not_admitted(self):
+        async def run():
+            controller = AdmissionController(capacity=1)
+            await controller.acquire(deadline=time.monotonic() - 1)
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(run())
+
+    def test_cost_counts_against_capacity(self):
+        async def run():
+            controller = AdmissionController(capacity=4)
+            await controller.acquire("batch", cost=3)
+            waiter = asyncio.create_task(controller.acquire(cost=2))
+            await _wait_queued(controller, 1)
+            controller.release(3)
+            await waiter
+            return controller.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats["in_flight"] == 2
+        assert stats["queue_depth"] == 0
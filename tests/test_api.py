@@ -1,14 +1,31 @@
+import asyncio
+import io
+import json
+import time
+import zipfile
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from PIL import Image
 
+from app import config, main
+from app.admission import AdmissionController
 from app.main import app
+from app.near_duplicates import NearDuplicateIndex
+from app.zones import TemplateStore
 
 
 @pytest.fixture
-def client():
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOBS_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(main, "template_store", TemplateStore(str(tmp_path)))
     with TestClient(app) as c:
+        # Models load in the background; wait until the default one is ready
+        deadline = time.monotonic() + 300
+        while c.get("/health").status_code != 200:
+            assert time.monotonic() < deadline, "OCR service did not become ready"
+            time.sleep(0.1)
         yield c
 
 
@@ -27,6 +44,8 @@ def test_health_check(client):
     data = response.json()
     assert data["status"] == "ok"
     assert data["ocr_ready"] is True
+    assert data["models"]["japan"]["state"] == "ready"
+    assert data["models"]["japan"]["load_ms"] > 0
 
 
 def test_ocr_with_invalid_file_type(client):
@@ -53,3 +72,331 @@ def test_ocr_with_image(client):
     assert data["success"] is True
     assert "results" in data
     assert "full_text" in data
+
+
+def test_batch_ocr_reports_errors_per_file(client):
+    image_path = Path(__file__).parent / "test_images" / "一輝.png"
+    image_bytes = image_path.read_bytes()
+
+    response = client.post(
+        "/ocr/batch",
+        files=[
+            ("files", ("一輝.png", image_bytes, "image/png")),
+            ("files", ("test.txt", b"hello world", "text/plain")),
+        ],
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is False
+    assert [item["filename"] for item in data["items"]] == ["一輝.png", "test.txt"]
+    assert data["items"][0]["success"] is True
+    assert data["items"][0]["full_text"] == "一輝"
+    assert data["items"][1]["success"] is False
+    assert "Unsupported file type" in data["items"][1]["message"]
+
+
+def test_batch_ocr_archive_over_file_limit(client, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_MAX_FILES", 1)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("a.png", b"A")
+        archive.writestr("b.png", b"B")
+
+    response = client.post(
+        "/ocr/batch",
+        files=[("files", ("scans.zip", buffer.getvalue(), "application/zip"))],
+    )
+
+    assert response.status_code == 413
+
+
+def test_batch_ocr_stream_ndjson(client):
+    image_path = Path(__file__).parent / "test_images" / "一輝.png"
+    image_bytes = image_path.read_bytes()
+
+    response = client.post(
+        "/ocr/batch/stream",
+        params={"regions": "true"},
+        files=[("files", ("一輝.png", image_bytes, "image/png"))],
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event"] for event in events] == ["region", "page", "done"]
+    assert events[0]["result"]["text"] == "一輝"
+    assert events[1]["full_text"] == "一輝"
+    assert events[2] == {"event": "done", "total": 1, "succeeded": 1}
+
+
+def test_document_ocr_multi_page_tiff(client):
+    image_path = Path(__file__).parent / "test_images" / "一輝.png"
+    page = Image.open(image_path).convert("RGB")
+    buffer = io.BytesIO()
+    page.save(buffer, format="TIFF", save_all=True, append_images=[page])
+
+    response = client.post(
+        "/ocr/document",
+        files={"file": ("scan.tiff", buffer.getvalue(), "image/tiff")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["page_count"] == 2
+    assert [page["page"] for page in data["pages"]] == [1, 2]
+    assert all(page["full_text"] == "一輝" for page in data["pages"])
+
+
+def test_metrics_endpoint(client):
+    image_path = Path(__file__).parent / "test_images" / "一輝.png"
+    client.post(
+        "/ocr",
+        params={"use_cache": "false"},
+        files={"file": ("一輝.png", image_path.read_bytes(), "image/png")},
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'ocr_http_requests_total{endpoint="/ocr",method="POST",status="200"}' in body
+    for stage in ["decode", "preprocess", "predict", "postprocess", "serialize"]:
+        assert f'ocr_stage_duration_seconds_count{{stage="{stage}"}}' in body
+    assert "ocr_regions_per_image_count" in body
+
+
+def test_classify_falls_back_to_ocr(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+
+    response = client.post(
+        "/classify",
+        params={"min_confidence": 1.0},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "ocr"
+    assert data["text"] == "一輝"
+
+
+def test_classify_blank_fallback(client):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), "white").save(buffer, format="PNG")
+
+    response = client.post(
+        "/classify",
+        params={"min_confidence": 1.0},
+        files={"file": ("blank.png", buffer.getvalue(), "image/png")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "ocr"
+    assert data["text"] == ""
+    assert data["confidence"] == 0.0
+
+
+def test_ocr_rejects_oversized_upload(client, monkeypatch):
+    monkeypatch.setattr(config, "MAX_UPLOAD_BYTES", 10)
+
+    response = client.post("/ocr", files={"file": ("big.png", b"x" * 11, "image/png")})
+
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+
+
+def test_ocr_rejects_oversized_request_body(client, monkeypatch):
+    monkeypatch.setattr(config, "MAX_REQUEST_BYTES", 100)
+
+    response = client.post("/ocr", files={"file": ("big.png", b"x" * 200, "image/png")})
+
+    assert response.status_code == 413
+
+
+def test_ocr_rejects_oversized_chunked_body(client, monkeypatch):
+    monkeypatch.setattr(config, "MAX_REQUEST_BYTES", 100)
+
+    def body():
+        # No Content-Length: the size is only known while receiving
+        for _ in range(10):
+            yield b"x" * 50
+
+    response = client.post(
+        "/ocr",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert "Request body too large" in response.json()["detail"]
+
+
+def test_invalid_content_length_rejected(client):
+    response = client.post(
+        "/ocr",
+        content=b"x",
+        headers={"Content-Length": "abc", "Content-Type": "image/png"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_ocr_rejected_when_admission_queue_full(client, monkeypatch):
+    controller = AdmissionController(capacity=1, max_queue=0)
+    asyncio.run(controller.acquire())
+    monkeypatch.setattr(main, "admission", controller)
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+
+    response = client.post(
+        "/ocr",
+        params={"use_cache": "false"},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/stats/admission").json()["rejected"]["interactive"] == 1
+
+
+def test_job_lifecycle(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+
+    response = client.post(
+        "/jobs",
+        files=[
+            ("files", ("一輝.png", image_bytes, "image/png")),
+            ("files", ("test.txt", b"hello world", "text/plain")),
+        ],
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/jobs/{job_id}"
+
+    deadline = time.monotonic() + 60
+    while (job := client.get(f"/jobs/{job_id}").json())["status"] != "completed":
+        assert time.monotonic() < deadline, "job did not complete"
+        time.sleep(0.1)
+
+    assert (job["succeeded"], job["failed"]) == (1, 1)
+    assert job["items"][0]["success"] is True
+    assert "Unsupported file type" in job["items"][1]["message"]
+    assert (
+        client.get(f"/jobs/{job_id}", params={"offset": 1, "limit": 1}).json()["items"][
+            0
+        ]["filename"]
+        == "test.txt"
+    )
+
+    assert client.delete(f"/jobs/{job_id}").status_code == 204
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+
+def test_ocr_zones_and_templates(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+    template = {
+        "zones": [
+            {"name": "name", "box": [0.05, 0.05, 0.95, 0.95]},
+            {"name": "body", "box": [0.0, 0.0, 1.0, 1.0], "multiline": True},
+        ],
+        "relative": True,
+    }
+
+    response = client.post(
+        "/ocr",
+        data={"zones": json.dumps(template)},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data["zones"]) == ["name", "body"]
+    assert data["zones"]["name"]["text"]
+
+    assert client.put("/templates/card", json=template).status_code == 200
+    assert "card" in client.get("/templates").json()
+    by_name = client.post(
+        "/ocr",
+        params={"template": "card"},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+    assert by_name.json()["zones"] == data["zones"]
+    assert client.delete("/templates/card").status_code == 204
+
+    missing = client.post(
+        "/ocr",
+        params={"template": "card"},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+    assert missing.status_code == 404
+
+
+def test_ocr_columnar_response(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+    files = {"file": ("一輝.png", image_bytes, "image/png")}
+
+    rows = client.post("/ocr", files=files).json()
+    response = client.post(
+        "/ocr", files=files, headers={"Accept": "application/vnd.ocr.columnar+json"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.ocr.columnar+json"
+    columns = response.json()
+    assert columns["texts"] == [result["text"] for result in rows["results"]]
+    assert len(columns["polygons"]) == 2 * sum(columns["point_counts"])
+
+
+def test_ocr_reuses_near_duplicate(client, monkeypatch):
+    monkeypatch.setattr(config, "NEAR_DUPLICATE_MAX_DISTANCE", 8)
+    monkeypatch.setattr(main, "near_duplicates", NearDuplicateIndex())
+    image = Image.open(Path(__file__).parent / "test_images" / "一輝.png")
+    png, jpeg = io.BytesIO(), io.BytesIO()
+    image.save(png, format="PNG")
+    image.convert("RGB").save(jpeg, format="JPEG", quality=90)
+
+    first = client.post("/ocr", files={"file": ("a.png", png.getvalue(), "image/png")})
+    second = client.post(
+        "/ocr", files={"file": ("a.jpg", jpeg.getvalue(), "image/jpeg")}
+    )
+
+    assert second.json()["full_text"] == first.json()["full_text"]
+    stats = client.get("/stats/cache").json()["near_duplicates"]
+    assert stats["entries"] == 2
+    assert stats["hits"] + stats["partial_hits"] == 1
+
+
+def test_ocr_pipeline_options(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+    files = {"file": ("一輝.png", image_bytes, "image/png")}
+
+    full = client.post("/ocr", files=files)
+    fast = client.post(
+        "/ocr",
+        files=files,
+        params={"orientation": "off", "unwarp": "off", "det_limit_type": "max"},
+    )
+    filtered = client.post("/ocr", files=files, params={"min_confidence": 1.0})
+    unsupported = client.post("/ocr", files=files, params={"rec_batch_size": 7})
+
+    assert fast.status_code == 200
+    assert fast.json()["full_text"] == full.json()["full_text"]
+    assert filtered.json()["results"] == []
+    assert unsupported.status_code == 422
+    # Settings other than the defaults get their own cache entries
+    assert client.get("/stats/cache").json()["entries"] == 2
+
+
+def test_ocr_rejects_unsupported_language(client):
+    image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+
+    response = client.post(
+        "/ocr",
+        params={"lang": "klingon"},
+        files={"file": ("一輝.png", image_bytes, "image/png")},
+    )
+
+    assert response.status_code == 400
+    assert "Unsupported language" in response.json()["detail"]
+    assert "klingon" not in client.get("/health").json()["models"]
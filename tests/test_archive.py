@@ -0,0 +1,82 @@
+"""Tests for archive extraction."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from app.archive import (
+    ArchiveError,
+    TooManyImagesError,
+    is_archive,
+    iter_archive_images,
+)
+
+
+def _zip_bytes(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _tar_bytes(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class TestIsArchive:
+    """Tests for is_archive."""
+
+    def test_by_content_type(self):
+        assert is_archive("scans", "application/zip") is True
+
+    def test_by_extension(self):
+        assert is_archive("scans.tar.gz", "application/octet-stream") is True
+
+    def test_image(self):
+        assert is_archive("page.png", "image/png") is False
+
+
+class TestIterArchiveImages:
+    """Tests for iter_archive_images."""
+
+    @pytest.mark.parametrize("pack", [_zip_bytes, _tar_bytes])
+    def test_only_images_extracted(self, pack):
+        data = pack(
+            {"a.png": b"A", "dir/b.JPG": b"B", "notes.txt": b"x", ".c.png": b"C"}
+        )
+
+        assert list(iter_archive_images(data, max_files=10)) == [
+            ("a.png", b"A"),
+            ("dir/b.JPG", b"B"),
+        ]
+
+    def test_max_files(self):
+        data = _zip_bytes({"a.png": b"A", "b.png": b"B"})
+
+        with pytest.raises(TooManyImagesError):
+            list(iter_archive_images(data, max_files=1))
+
+    @pytest.mark.parametrize("pack", [_zip_bytes, _tar_bytes])
+    def test_oversized_member_not_read(self, pack):
+        data = pack({"a.png": b"A", "big.png": bytes(1000)})
+
+        [small, (name, error)] = iter_archive_images(
+            data, max_files=10, max_member_bytes=100
+        )
+
+        assert small == ("a.png", b"A")
+        assert name == "big.png"
+        assert isinstance(error, ArchiveError)
+
+    def test_invalid_archive(self):
+        with pytest.raises(ArchiveError):
+            list(iter_archive_images(b"not an archive", max_files=10))
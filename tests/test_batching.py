@@ -0,0 +1,117 @@
+"""Tests for BatchScheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.admission import DeadlineExceededError
+from app.batching import BatchScheduler
+
+
+class FakeService:
+    """Records batches and echoes each image back as its result."""
+
+    def __init__(self):
+        self.batches: list[list[bytes]] = []
+        self.options: list = []
+
+    async def run(self, method, images, **kwargs):
+        assert method == "process_images"
+        self.batches.append(images)
+        self.options.append(kwargs.get("options"))
+        return [
+            ValueError("bad image") if image == b"bad" else [image.decode()]
+            for image in images
+        ]
+
+
+async def _submit_all(scheduler, images):
+    scheduler.start()
+    try:
+        return await asyncio.gather(
+            *(scheduler.submit(image) for image in images), return_exceptions=True
+        )
+    finally:
+        await scheduler.stop()
+
+
+class TestBatchScheduler:
+    """Tests for micro-batching behaviour."""
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            BatchScheduler(FakeService(), max_batch_size=0)
+
+    def test_concurrent_requests_share_batch(self):
+        service = FakeService()
+        scheduler = BatchScheduler(service, max_batch_size=16, max_wait_ms=50)
+
+        results = asyncio.run(_submit_all(scheduler, [b"a", b"b", b"c"]))
+
+        assert results == [["a"], ["b"], ["c"]]
+        assert service.batches == [[b"a", b"b", b"c"]]
+        stats = scheduler.stats()
+        assert stats["batch_size_histogram"] == {3: 1}
+        assert stats["requests"] == 3
+
+    def test_max_batch_size(self):
+        service = FakeService()
+        scheduler = BatchScheduler(service, max_batch_size=2, max_wait_ms=50)
+
+        images = [str(i).encode() for i in range(5)]
+        results = asyncio.run(_submit_all(scheduler, images))
+
+        assert results == [[str(i)] for i in range(5)]
+        assert [len(batch) for batch in service.batches] == [2, 2, 1]
+
+    def test_error_isolated_to_caller(self):
+        scheduler = BatchScheduler(FakeService(), max_wait_ms=50)
+
+        results = asyncio.run(_submit_all(scheduler, [b"ok", b"bad"]))
+
+        assert results[0] == ["ok"]
+        assert isinstance(results[1], ValueError)
+
+    def test_expired_request_is_not_sent_to_model(self):
+        service = FakeService()
+        scheduler = BatchScheduler(service, max_wait_ms=50)
+
+        async def run():
+            scheduler.start()
+            try:
+                return await asyncio.gather(
+                    scheduler.submit(b"ok"),
+                    scheduler.submit(b"late", deadline=time.monotonic() + 0.01),
+                    return_exceptions=True,
+                )
+            finally:
+                await scheduler.stop()
+
+        results = asyncio.run(run())
+
+        assert results[0] == ["ok"]
+        assert isinstance(results[1], DeadlineExceededError)
+        assert service.batches == [[b"ok"]]
+        assert scheduler.stats()["dropped"] == 1
+
+    def test_options_split_batch(self):
+        service = FakeService()
+        scheduler = BatchScheduler(service, max_wait_ms=50)
+
+        async def run():
+            scheduler.start()
+            try:
+                return await asyncio.gather(
+                    scheduler.submit(b"a"),
+                    scheduler.submit(b"b", options="fast"),
+                    scheduler.submit(b"c"),
+                )
+            finally:
+                await scheduler.stop()
+
+        results = asyncio.run(run())
+
+        assert results == [["a"], ["b"], ["c"]]
+        assert service.batches == [[b"a", b"c"], [b"b"]]
+        assert service.options == [None, "fast"]
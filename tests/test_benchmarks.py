@@ -0,0 +1,42 @@
+"""Tests for benchmark helpers."""
+
+import io
+
+from PIL import Image
+
+from benchmarks.compare import flatten
+from benchmarks.report import latency_summary
+from benchmarks.synthetic import render_document
+
+
+def test_render_document_is_reproducible():
+    first, lines = render_document(320, 240, density=0.5, seed=1)
+    second, _ = render_document(320, 240, density=0.5, seed=1)
+
+    assert first == second
+    assert lines > 0
+    assert Image.open(io.BytesIO(first)).size == (320, 240)
+
+
+def test_density_controls_line_count():
+    _, sparse = render_document(640, 480, density=0.1)
+    _, dense = render_document(640, 480, density=0.9)
+
+    assert sparse < dense
+
+
+def test_latency_summary():
+    summary = latency_summary([0.01] * 99 + [1.0])
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 10.0
+    assert summary["max_ms"] == 1000.0
+
+
+def test_flatten_labels_documents():
+    report = {
+        "environment": {"commit": "abc"},
+        "latency": [{"document": "small-dense", "latency": {"p50_ms": 5.0}}],
+    }
+
+    assert flatten(report) == {"latency.small-dense.latency.p50_ms": 5.0}
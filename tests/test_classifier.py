@@ -0,0 +1,157 @@
+import asyncio
+import io
+import sys
+import types
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.batching import BatchScheduler
+from app.classifier import CharacterClassifier, TFLiteModel, _dequantize, _quantize
+
+
+def _png(size=(30, 30), color="black") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeModel:
+    """Scores each image by its mean darkness over three classes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, batch):
+        self.batch_sizes.append(len(batch))
+        dark = 1 - batch.mean(axis=(1, 2, 3)) / 255
+        return np.stack([dark, 1 - dark, np.zeros_like(dark)], axis=1)
+
+
+def _classifier():
+    return CharacterClassifier(FakeModel(), ["4E00", "8F1D", "other"])
+
+
+def test_top_k_candidates():
+    classifier = _classifier()
+
+    outputs = classifier.process_images([_png(color=(64, 64, 64))], top_k=2)
+
+    [(first, first_score), (second, second_score)] = outputs[0]
+    assert (first, second) == ("一", "輝")
+    assert first_score == pytest.approx(0.749, abs=1e-3)
+    assert second_score == pytest.approx(0.251, abs=1e-3)
+
+
+def test_preprocess_pads_to_square_on_white():
+    classifier = _classifier()
+
+    array = classifier.preprocess(_png(size=(40, 20)))
+
+    assert array.shape == (30, 30, 3)
+    assert array.dtype == np.float32
+    assert array[0, 15].tolist() == [255, 255, 255]
+    assert array[15, 15].tolist() == [0, 0, 0]
+
+
+def test_invalid_image_does_not_fail_batch():
+    classifier = _classifier()
+
+    outputs = classifier.process_images([b"not an image", _png()])
+
+    assert isinstance(outputs[0], Exception)
+    assert outputs[1][0][0] == "一"
+    assert classifier._model.batch_sizes == [1]
+
+
+def test_batched_through_scheduler():
+    classifier = _classifier()
+
+    async def main():
+        scheduler = BatchScheduler(classifier, max_batch_size=8, max_wait_ms=50)
+        scheduler.start()
+        try:
+            return await asyncio.gather(*(scheduler.submit(_png()) for _ in range(4)))
+        finally:
+            await scheduler.stop()
+
+    outputs = asyncio.run(main())
+
+    assert [output[0][0] for output in outputs] == ["一"] * 4
+    assert classifier._model.batch_sizes == [4]
+
+
+def test_load_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported model format"):
+        CharacterClassifier.load(str(tmp_path), "onnx")
+
+
+def test_quantization_round_trip():
+    details = {"dtype": np.int8, "quantization": (0.5, -10)}
+    values = np.array([[-100.0, 0.0, 1.0, 200.0]], dtype=np.float32)
+
+    quantized = _quantize(values, details)
+
+    assert quantized.dtype == np.int8
+    assert quantized.tolist() == [[-128, -10, -8, 127]]
+    assert _dequantize(quantized, details).tolist() == [[-59.0, 0.0, 1.0, 68.5]]
+
+
+def test_float_tensors_pass_through():
+    details = {"dtype": np.float32, "quantization": (0.0, 0)}
+    values = np.ones((1, 3), dtype=np.float32)
+
+    assert _quantize(values, details) is values
+    assert _dequantize(values, details) is values
+
+
+class FakeInterpreter:
+    """Sums each input row; counts tensor allocations across instances."""
+
+    allocations = 0
+
+    def __init__(self, model_path, num_threads=None):
+        self.shape = [1, 4]
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": self.shape, "dtype": np.float32}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": [self.shape[0], 1], "dtype": np.float32}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = shape
+
+    def allocate_tensors(self):
+        FakeInterpreter.allocations += 1
+
+    def set_tensor(self, index, value):
+        assert list(value.shape) == list(self.shape)
+        self.value = value
+
+    def invoke(self):
+        self.result = self.value.sum(axis=1, keepdims=True)
+
+    def get_tensor(self, index):
+        return self.result
+
+
+def test_tflite_pads_batches_without_reallocating(monkeypatch):
+    module = types.ModuleType("ai_edge_litert.interpreter")
+    module.Interpreter = FakeInterpreter
+    monkeypatch.setitem(
+        sys.modules, "ai_edge_litert", types.ModuleType("ai_edge_litert")
+    )
+    monkeypatch.setitem(sys.modules, "ai_edge_litert.interpreter", module)
+    monkeypatch.setattr(FakeInterpreter, "allocations", 0)
+    model = TFLiteModel("model.tflite", batch_sizes=(2, 4))
+
+    for count in (1, 3, 2, 4, 3, 1):
+        batch = np.arange(count * 4, dtype=np.float32).reshape(count, 4)
+        assert model(batch).tolist() == batch.sum(axis=1, keepdims=True).tolist()
+    assert FakeInterpreter.allocations == 2
+
+    batch = np.ones((9, 4), dtype=np.float32)
+    assert model(batch).tolist() == [[4.0]] * 9
+    assert FakeInterpreter.allocations == 2
@@ -0,0 +1,59 @@
+"""Tests for multi-page document decoding."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from app.documents import DocumentError, count_pages, load_page
+from app.preprocess import ImageTooLargeError
+
+
+def _multi_page(format: str, colors: list[str]) -> bytes:
+    frames = [Image.new("RGB", (60, 40), color) for color in colors]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format=format, save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+
+class TestCountPages:
+    """Tests for count_pages."""
+
+    @pytest.mark.parametrize("format", ["TIFF", "GIF", "PDF"])
+    def test_multi_page(self, format):
+        assert count_pages(_multi_page(format, ["red", "green", "blue"])) == 3
+
+    def test_single_image(self):
+        assert count_pages(_multi_page("PNG", ["white"])) == 1
+
+
+class TestLoadPage:
+    """Tests for load_page."""
+
+    def test_tiff_page(self):
+        data = _multi_page("TIFF", ["red", "green", "blue"])
+
+        page = load_page(data, 1)
+
+        assert page.convert("RGB").getpixel((0, 0)) == (0, 128, 0)
+
+    def test_pdf_dpi(self):
+        data = _multi_page("PDF", ["white", "white"])
+
+        # PIL writes 72 dpi PDFs, so 144 dpi doubles the pixel size
+        page = load_page(data, 1, dpi=144)
+
+        assert page.size == (120, 80)
+
+    def test_missing_page(self):
+        data = _multi_page("TIFF", ["red"])
+
+        with pytest.raises(DocumentError):
+            load_page(data, 5)
+
+    def test_pdf_pixel_limit_checked_before_rendering(self):
+        data = _multi_page("PDF", ["white"])
+
+        with pytest.raises(ImageTooLargeError):
+            load_page(data, 0, dpi=144, max_pixels=120 * 80 - 1)
+        assert load_page(data, 0, dpi=144, max_pixels=120 * 80).size == (120, 80)
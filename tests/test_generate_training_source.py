@@ -0,0 +1,106 @@
+"""Tests for training source generation."""
+
+import json
+from pathlib import Path
+
+from app.lib.generate_training_source import generate, load_font, regenerate
+
+FONTS_DIR = Path(__file__).parent.parent / "fonts"
+FONT_PATHS = [
+    str(FONTS_DIR / "MPlus1p-Regular.ttf"),
+    str(FONTS_DIR / "MPlus1p-Bold.ttf"),
+]
+
+
+def _generate(tmp_path: Path) -> Path:
+    char_file = tmp_path / "chars.txt"
+    char_file.write_text("一\n輝\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    generate(str(output_dir), [str(char_file)], FONT_PATHS, max_workers=2)
+    return output_dir
+
+
+def test_outputs(tmp_path):
+    output_dir = _generate(tmp_path)
+
+    labels = (output_dir / "rec_gt.txt").read_text(encoding="utf-8").split("\n")
+    assert labels == [
+        "images/chars/1.jpg\t一",
+        "images/chars/2.jpg\t輝",
+        "images/chars/1.jpg\t一",
+        "images/chars/2.jpg\t輝",
+    ]
+    unicode_map = json.loads((output_dir / "unicode_char.json").read_text("utf-8"))
+    assert unicode_map == {"4E00": "一", "8F1D": "輝"}
+    assert sorted(
+        p.name for p in (output_dir / "classification" / "4E00").iterdir()
+    ) == [
+        "MPlus1p-Bold.jpg",
+        "MPlus1p-Regular.jpg",
+    ]
+
+
+def test_images_link_to_last_font(tmp_path):
+    output_dir = _generate(tmp_path)
+
+    image = output_dir / "images" / "chars" / "1.jpg"
+    classified = output_dir / "classification" / "4E00" / "MPlus1p-Bold.jpg"
+    assert image.read_bytes() == classified.read_bytes()
+    assert image.stat().st_ino == classified.stat().st_ino
+
+
+def test_font_cached():
+    assert load_font(FONT_PATHS[0], 16) is load_font(FONT_PATHS[0], 16)
+
+
+def _mtimes(output_dir: Path) -> dict[str, int]:
+    return {
+        str(p.relative_to(output_dir)): p.stat().st_mtime_ns
+        for p in (output_dir / "classification").rglob("*.jpg")
+    }
+
+
+def test_rerun_renders_nothing(tmp_path, capsys):
+    output_dir = _generate(tmp_path)
+    before = _mtimes(output_dir)
+
+    _generate(tmp_path)
+
+    assert _mtimes(output_dir) == before
+    assert "0/4 samples to render" in capsys.readouterr().out
+
+
+def test_added_char_renders_only_new_samples(tmp_path, capsys):
+    output_dir = _generate(tmp_path)
+    before = _mtimes(output_dir)
+    (tmp_path / "chars.txt").write_text("一\n輝\n鷗\n", encoding="utf-8")
+
+    regenerate(str(output_dir), max_workers=2)
+
+    after = _mtimes(output_dir)
+    assert {k: after[k] for k in before} == before
+    assert sorted(after.keys() - before.keys()) == [
+        "classification/9DD7/MPlus1p-Bold.jpg",
+        "classification/9DD7/MPlus1p-Regular.jpg",
+    ]
+    assert (output_dir / "images" / "chars" / "3.jpg").exists()
+    assert "2/6 samples to render" in capsys.readouterr().out
+
+
+def test_removed_font_and_char_are_deleted(tmp_path):
+    output_dir = _generate(tmp_path)
+    char_file = tmp_path / "chars.txt"
+    char_file.write_text("一\n", encoding="utf-8")
+
+    generate(str(output_dir), [str(char_file)], FONT_PATHS[:1], max_workers=1)
+
+    classified = sorted(
+        str(p.relative_to(output_dir)) for p in output_dir.rglob("*.jpg")
+    )
+    assert classified == [
+        "classification/4E00/MPlus1p-Regular.jpg",
+        "images/chars/1.jpg",
+    ]
+    image = output_dir / "images" / "chars" / "1.jpg"
+    assert image.stat().st_ino == (output_dir / classified[0]).stat().st_ino
+    assert (output_dir / "rec_gt.txt").read_text("utf-8") == "images/chars/1.jpg\t一"
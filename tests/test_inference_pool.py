@@ -0,0 +1,186 @@
+"""Tests for InferencePool."""
+
+import asyncio
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from app.inference_pool import SHARE_MIN_BYTES, InferencePool, SharedBuffer
+
+
+class DummyService:
+    """Stand-in for OCRService that records which worker ran it."""
+
+    def __init__(self):
+        self.owner = (os.getpid(), threading.get_ident())
+
+    def whoami(self):
+        return self.owner
+
+    def echo(self, value, suffix=""):
+        return f"{value}{suffix}"
+
+    def size(self, data):
+        return type(data).__name__, len(data), data[-1]
+
+    def slow_size(self, data, delay=0.2):
+        time.sleep(delay)
+        return len(data)
+
+
+class SlowStartService(DummyService):
+    """Service whose construction takes a while, like loading a model."""
+
+    def __init__(self):
+        time.sleep(0.05)
+        super().__init__()
+
+
+class TestInferencePool:
+    """Tests for InferencePool execution."""
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            InferencePool(DummyService, mode="gpu")
+
+    def test_invalid_start_method(self):
+        with pytest.raises(ValueError):
+            InferencePool(DummyService, mode="process", start_method="fork")
+
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            InferencePool(DummyService, workers=0)
+
+    def test_run_thread(self):
+        pool = InferencePool(DummyService, mode="thread", workers=2)
+        try:
+            result = asyncio.run(pool.run("echo", "a", suffix="b"))
+            assert result == "ab"
+        finally:
+            pool.shutdown()
+
+    def test_each_thread_owns_service(self):
+        pool = InferencePool(DummyService, mode="thread", workers=1)
+        try:
+            owner = pool.run_sync("whoami")
+            assert owner[1] != threading.get_ident()
+            assert pool.run_sync("whoami") == owner
+        finally:
+            pool.shutdown()
+
+    def test_run_process(self):
+        pool = InferencePool(DummyService, mode="process", workers=1)
+        try:
+            pid, _ = asyncio.run(pool.run("whoami"))
+            assert pid != os.getpid()
+        finally:
+            pool.shutdown()
+
+    def test_start_creates_every_worker(self):
+        pool = InferencePool(SlowStartService, mode="thread", workers=3)
+        try:
+            owners = pool.start("owner")
+            assert len(set(owners)) == 3
+        finally:
+            pool.shutdown()
+
+    def test_process_large_argument_in_shared_memory(self):
+        data = bytes(SHARE_MIN_BYTES) + b"!"
+        pool = InferencePool(DummyService, mode="process", workers=1)
+        try:
+            assert pool.run_sync("size", data) == ("bytes", len(data), ord("!"))
+            with pool.shared(io.BytesIO(data)) as handle:
+                assert isinstance(handle, SharedBuffer)
+                # One shared copy serves several calls
+                for _ in range(2):
+                    result = asyncio.run(pool.run("size", handle))
+                    assert result == ("bytes", len(data), ord("!"))
+        finally:
+            pool.shutdown()
+
+    def test_shared_memory_outlives_caller(self):
+        data = bytes(SHARE_MIN_BYTES)
+        pool = InferencePool(DummyService, mode="process", workers=1)
+        try:
+
+            async def abandon():
+                with pool.shared(data) as handle:
+                    # Occupy the worker so the next job is still queued
+                    busy = asyncio.ensure_future(pool.run("slow_size", b"x"))
+                    await asyncio.sleep(0.05)
+                    task = asyncio.ensure_future(pool.run("slow_size", handle, 0))
+                    await asyncio.sleep(0)
+                    task.cancel()
+                    # Still needed by the job that started before the cancel
+                    future = pool._submit("slow_size", (handle, 0), {})
+                await busy
+                return future
+
+            future = asyncio.run(abandon())
+
+            assert future.result() == len(data)
+            # Done callbacks may run just after the result is set
+            deadline = time.monotonic() + 5
+            while pool._block_refs and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert pool._block_refs == {}
+        finally:
+            pool.shutdown()
+
+    def test_shared_async_copies_in_a_thread(self):
+        data = bytes(SHARE_MIN_BYTES) + b"!"
+        pool = InferencePool(DummyService, mode="process", workers=1)
+        try:
+
+            async def scenario():
+                async with pool.shared_async(io.BytesIO(data)) as handle:
+                    assert isinstance(handle, SharedBuffer)
+                    assert list(pool._block_refs) == [handle.name]
+                    return await pool.run("size", handle)
+
+            assert asyncio.run(scenario()) == ("bytes", len(data), ord("!"))
+            deadline = time.monotonic() + 5
+            while pool._block_refs and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert pool._block_refs == {}
+        finally:
+            pool.shutdown()
+
+    def test_shared_thread_passes_data_through(self):
+        pool = InferencePool(DummyService, mode="thread", workers=1)
+        try:
+            with pool.shared(b"data") as data:
+                assert data == b"data"
+
+            async def scenario():
+                async with pool.shared_async(b"data") as data:
+                    return data
+
+            assert asyncio.run(scenario()) == b"data"
+        finally:
+            pool.shutdown()
+
+
+class TestSharedBuffer:
+    """Tests for SharedBuffer."""
+
+    def test_bytes_round_trip(self):
+        handle, block = SharedBuffer.create(b"page bytes")
+        try:
+            assert handle.size == len(b"page bytes")
+            assert handle.read() == b"page bytes"
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_file_object_round_trip(self):
+        data = os.urandom(3 * SHARE_MIN_BYTES + 7)
+        handle, block = SharedBuffer.create(io.BytesIO(data))
+        try:
+            assert handle.read() == data
+        finally:
+            block.close()
+            block.unlink()
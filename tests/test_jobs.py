@@ -0,0 +1,157 @@
+"""Tests for the persistent job queue."""
+
+import asyncio
+import io
+
+from app.jobs import JobRunner, JobStore
+
+
+def _add(files):
+    def add_inputs(inputs):
+        for name, data, pages in files:
+            inputs.add_file(name, data, pages=pages)
+
+    return add_inputs
+
+
+class TestJobStore:
+    """Tests for JobStore."""
+
+    def test_create_queues_images_and_pages(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create(
+            "japan", 200, _add([("a.png", b"a", 0), ("doc.pdf", b"pdf", 3)])
+        )
+
+        job = store.get(job_id)
+
+        assert job.status == "queued"
+        assert job.total == 4
+        assert [(r["filename"], r["page"]) for r in store.results(job_id)] == [
+            ("a.png", None),
+            ("doc.pdf", 0),
+            ("doc.pdf", 1),
+            ("doc.pdf", 2),
+        ]
+
+    def test_file_object_input_is_copied(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create(
+            "japan", 200, _add([("a.png", io.BytesIO(b"image data"), 0)])
+        )
+
+        [item] = store.claim(10)
+
+        assert item.job_id == job_id
+        assert store.read_input(item) == b"image data"
+
+    def test_claim_and_complete(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create("japan", 200, _add([("a.png", b"a", 0), ("b", b"b", 0)]))
+
+        first, second = store.claim(10)
+        assert store.claim(10) == []
+        assert store.get(job_id).status == "running"
+
+        store.complete(first, [[[[0, 0]], ["一", 0.9]]])
+        store.complete(second, ValueError("bad image"))
+        job = store.get(job_id)
+        results = store.results(job_id)
+
+        assert job.status == "completed"
+        assert (job.succeeded, job.failed) == (1, 1)
+        assert results[0]["result"] == [[[[0, 0]], ["一", 0.9]]]
+        assert results[1]["message"] == "bad image"
+        # Inputs are removed once the job is done
+        assert not (tmp_path / job_id / "inputs").exists()
+
+    def test_results_are_paged(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create(
+            "japan", 200, _add([(f"{i}.png", b"x", 0) for i in range(5)])
+        )
+
+        page = store.results(job_id, offset=2, limit=2)
+
+        assert [r["index"] for r in page] == [2, 3]
+
+    def test_errors_recorded_at_creation(self, tmp_path):
+        store = JobStore(str(tmp_path))
+
+        def add_inputs(inputs):
+            inputs.add_error("a.txt", "Unsupported file type: text/plain")
+
+        job_id = store.create("japan", 200, add_inputs)
+
+        job = store.get(job_id)
+        assert job.status == "completed"
+        assert job.failed == 1
+
+    def test_queue_survives_restart(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create("japan", 200, _add([("a.png", b"a", 0)]))
+        store.claim(10)
+        store.close()
+
+        # Items running when the process stopped are queued again
+        reopened = JobStore(str(tmp_path))
+        assert reopened.recover() == 1
+        [item] = reopened.claim(10)
+        assert item.job_id == job_id
+        assert reopened.read_input(item) == b"a"
+
+    def test_delete(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create("japan", 200, _add([("a.png", b"a", 0)]))
+
+        assert store.delete(job_id)
+        assert store.get(job_id) is None
+        assert store.claim(10) == []
+        assert not (tmp_path / job_id).exists()
+        assert not store.delete(job_id)
+
+    def test_purge_removes_old_finished_jobs(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        finished = store.create("japan", 200, _add([("a.png", b"a", 0)]))
+        store.complete(store.claim(10)[0], [])
+        queued = store.create("japan", 200, _add([("b.png", b"b", 0)]))
+
+        assert store.purge(ttl_seconds=-1) == 1
+        assert store.get(finished) is None
+        assert store.get(queued) is not None
+
+
+class TestJobRunner:
+    """Tests for background processing."""
+
+    def test_processes_queued_jobs_in_chunks(self, tmp_path):
+        store = JobStore(str(tmp_path))
+        job_id = store.create(
+            "japan", 200, _add([(f"{i}.png", str(i).encode(), 0) for i in range(5)])
+        )
+        chunks = []
+
+        async def process(job, items):
+            chunks.append(len(items))
+            return [
+                ValueError("bad")
+                if item.index == 3
+                else [store.read_input(item).decode()]
+                for item in items
+            ]
+
+        async def run():
+            runner = JobRunner(store, process, chunk_size=2, poll_seconds=0.01)
+            runner.start()
+            try:
+                while store.get(job_id).status != "completed":
+                    await asyncio.sleep(0.01)
+            finally:
+                await runner.stop()
+
+        asyncio.run(run())
+
+        job = store.get(job_id)
+        assert chunks == [2, 2, 1]
+        assert (job.succeeded, job.failed) == (4, 1)
+        assert store.results(job_id)[4]["result"] == ["4"]
@@ -0,0 +1,106 @@
+"""Tests for ModelRegistry."""
+
+import asyncio
+
+from app.model_registry import ModelRegistry
+
+
+class FakeModels:
+    """Records loads and unloads."""
+
+    def __init__(self):
+        self.loaded: list[str] = []
+        self.unloaded: list[str] = []
+
+    async def load(self, lang):
+        self.loaded.append(lang)
+        return f"model:{lang}"
+
+    async def unload(self, lang, model):
+        assert model == f"model:{lang}"
+        self.unloaded.append(lang)
+
+
+def _registry(models, **kwargs):
+    return ModelRegistry(models.load, models.unload, model_memory_mb=100, **kwargs)
+
+
+class TestModelRegistry:
+    """Tests for lazy loading and LRU eviction."""
+
+    def test_lazy_load_once(self):
+        models = FakeModels()
+        registry = _registry(models)
+
+        async def scenario():
+            results = await asyncio.gather(*(registry.acquire("en") for _ in range(3)))
+            return results
+
+        assert asyncio.run(scenario()) == ["model:en"] * 3
+        assert models.loaded == ["en"]
+
+    def test_lru_eviction_under_budget(self):
+        models = FakeModels()
+        registry = _registry(models, memory_budget_mb=200)
+
+        async def scenario():
+            for lang in ["en", "ch", "en", "korean"]:
+                async with registry.use(lang):
+                    pass
+
+        asyncio.run(scenario())
+
+        assert models.unloaded == ["ch"]
+        assert registry.stats()["loaded"] == ["en", "korean"]
+
+    def test_pinned_never_evicted(self):
+        models = FakeModels()
+        registry = _registry(models, memory_budget_mb=100, pinned=("japan",))
+
+        async def scenario():
+            for lang in ["japan", "en", "ch"]:
+                async with registry.use(lang):
+                    pass
+
+        asyncio.run(scenario())
+
+        assert models.unloaded == ["en", "ch"]
+        assert registry.stats()["loaded"] == ["japan"]
+
+    def test_in_use_not_evicted(self):
+        models = FakeModels()
+        registry = _registry(models, memory_budget_mb=100)
+
+        async def scenario():
+            async with registry.use("en"), registry.use("ch"):
+                assert models.unloaded == []
+            return registry.stats()
+
+        stats = asyncio.run(scenario())
+
+        # "ch" became idle first while "en" was still in use
+        assert models.unloaded == ["ch"]
+        assert stats["loaded"] == ["en"]
+
+    def test_evicts_before_loading(self):
+        models = FakeModels()
+        loaded_while_loading = []
+
+        async def load(lang):
+            loaded_while_loading.append(registry.stats()["loaded"])
+            return await models.load(lang)
+
+        registry = ModelRegistry(
+            load, models.unload, memory_budget_mb=100, model_memory_mb=100
+        )
+
+        async def scenario():
+            for lang in ["en", "ch"]:
+                async with registry.use(lang):
+                    pass
+
+        asyncio.run(scenario())
+
+        # en was unloaded before ch started loading, never both at once
+        assert loaded_while_loading == [[], []]
+        assert models.unloaded == ["en"]
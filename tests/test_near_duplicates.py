@@ -0,0 +1,208 @@
+"""Tests for perceptual hashing and the near-duplicate index."""
+
+import asyncio
+import io
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.near_duplicates import (
+    SAVE_EVERY_CHANGES,
+    NearDuplicateIndex,
+    changed_boxes,
+    changed_tiles,
+    hamming_distance,
+    image_signature,
+    merge_results,
+    split_results,
+)
+
+FONT_PATH = Path(__file__).parent.parent / "fonts" / "MPlus1p-Regular.ttf"
+LINE = "申込者氏名 山田太郎 住所 東京都千代田区1-2-3"
+
+
+def _page(edited_line: int | None = None) -> Image.Image:
+    """A4 page at 150 dpi with 20 lines of text; one character can be changed."""
+    image = Image.new("L", (1240, 1754), 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(str(FONT_PATH), 32)
+    for i in range(20):
+        text = LINE.replace("太", "次") if i == edited_line else LINE
+        draw.text((100, 100 + i * 80), text, font=font, fill=0)
+    return image
+
+
+def _encode(image: Image.Image, image_format: str = "PNG", **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def _result(box, text):
+    x0, y0, x1, y1 = box
+    return [[[x0, y0], [x1, y0], [x1, y1], [x0, y1]], (text, 0.9)]
+
+
+class TestSignature:
+    """Tests for image signatures and tile comparison."""
+
+    def test_recompressed_image_is_near_duplicate(self):
+        page = _page()
+        original = image_signature(_encode(page))
+        recompressed = image_signature(_encode(page, "JPEG", quality=60))
+
+        assert hamming_distance(original.hash, recompressed.hash) <= 2
+        assert not changed_tiles(original, recompressed, min_pixels=6).any()
+        assert (recompressed.width, recompressed.height) == (1240, 1754)
+
+    def test_resized_scan_is_near_duplicate(self):
+        page = _page()
+        original = image_signature(_encode(page))
+        resized = image_signature(_encode(page.resize((620, 877))))
+
+        assert hamming_distance(original.hash, resized.hash) <= 4
+        assert (resized.width, resized.height) == (620, 877)
+
+    def test_different_page_is_far(self):
+        original = image_signature(_encode(_page()))
+        other = image_signature(_encode(_page().rotate(90, expand=True)))
+
+        assert hamming_distance(original.hash, other.hash) > 10
+
+    def test_changed_character_marks_its_tiles(self):
+        original = image_signature(_encode(_page()))
+        edited = image_signature(_encode(_page(edited_line=5), "JPEG", quality=70))
+
+        tiles = changed_tiles(original, edited, min_pixels=6)
+        [(x0, y0, x1, y1)] = changed_boxes(tiles, edited)
+
+        assert tiles.sum() <= 4
+        # Line 5 spans y 500-540; its neighbours at 420 and 580 are untouched
+        assert y0 <= 500 and y1 >= 540
+        assert y0 > 420 - 80 and y1 < 580 + 80 + 40
+        assert x0 < x1
+
+    def test_blank_page(self):
+        signature = image_signature(_encode(Image.new("L", (100, 100), 255)))
+
+        assert not signature.unpack_bitmap().any()
+
+    def test_changed_boxes_groups_adjacent_tiles(self):
+        signature = image_signature(_encode(Image.new("L", (320, 320), 255)))
+        tiles = np.zeros((10, 10), dtype=bool)
+        tiles[2, 2:4] = True
+        tiles[6, 6] = True
+
+        boxes = changed_boxes(tiles, signature)
+
+        # One tile of margin on every side
+        assert boxes == [[32, 32, 160, 128], [160, 160, 256, 256]]
+
+
+class TestSplitResults:
+    """Tests for reusing results around changed areas."""
+
+    def test_overlapping_results_are_reread(self):
+        signature = image_signature(_encode(_page()))
+        results = [
+            _result([100, 100, 300, 160], "first"),
+            _result([100, 350, 400, 410], "second"),
+            _result([100, 600, 500, 660], "third"),
+        ]
+
+        kept, boxes = split_results(
+            results, signature, signature, [[50, 380, 150, 450]]
+        )
+
+        assert [item[1][0] for item in kept] == ["first", "third"]
+        # The box grew to cover the whole second line
+        assert boxes == [[50, 350, 400, 450]]
+
+    def test_results_are_scaled_to_the_new_size(self):
+        previous = image_signature(_encode(_page()))
+        current = image_signature(_encode(_page().resize((620, 877))))
+
+        kept, boxes = split_results(
+            [_result([100, 100, 300, 160], "first")], previous, current, []
+        )
+
+        assert boxes == []
+        assert kept[0][0] == [[50, 50], [150, 50], [150, 80], [50, 80]]
+
+    def test_growing_boxes_are_merged(self):
+        signature = image_signature(_encode(_page()))
+        results = [_result([0, 100, 500, 150], "wide")]
+
+        kept, boxes = split_results(
+            results, signature, signature, [[0, 90, 50, 120], [400, 130, 450, 200]]
+        )
+
+        assert kept == []
+        assert boxes == [[0, 90, 500, 200]]
+
+    def test_merge_results_in_reading_order(self):
+        kept = [_result([0, 0, 10, 10], "top"), _result([0, 100, 10, 110], "bottom")]
+        reread = [_result([0, 50, 10, 60], "middle")]
+
+        merged = merge_results(kept, reread)
+
+        assert [item[1][0] for item in merged] == ["top", "middle", "bottom"]
+
+
+class TestNearDuplicateIndex:
+    """Tests for NearDuplicateIndex."""
+
+    def test_find_nearest_with_same_config(self):
+        index = NearDuplicateIndex()
+        page = _page()
+        index.add("original", "cfg", image_signature(_encode(page)))
+        index.add("other", "cfg", image_signature(_encode(page.rotate(90))))
+        index.add("other-config", "en", image_signature(_encode(page)))
+
+        query = image_signature(_encode(page, "JPEG", quality=60))
+        matches = index.find(query, "cfg", max_distance=4)
+
+        assert [entry.cache_key for entry in matches] == ["original"]
+
+    def test_bounded(self):
+        index = NearDuplicateIndex(max_entries=2)
+        signature = image_signature(_encode(_page()))
+        for key in ["a", "b", "c"]:
+            index.add(key, "cfg", signature)
+
+        assert len(index) == 2
+        assert [e.cache_key for e in index.find(signature, "cfg", 0)] == ["b", "c"]
+
+    def test_persisted(self, tmp_path):
+        path = tmp_path / "index.npz"
+        index = NearDuplicateIndex(path=str(path))
+        signature = image_signature(_encode(_page()))
+        index.add("a", "cfg", signature)
+        index.add("b", "en", image_signature(_encode(_page(edited_line=1))))
+        index.save()
+
+        reloaded = NearDuplicateIndex(path=str(path))
+
+        assert reloaded.load() == 2
+        [entry] = reloaded.find(signature, "cfg", 0)
+        assert entry.cache_key == "a"
+        assert entry.signature == signature
+
+    def test_saved_periodically(self, tmp_path):
+        path = tmp_path / "index.npz"
+        index = NearDuplicateIndex(max_entries=1024, path=str(path))
+        signature = image_signature(_encode(_page()))
+
+        async def add(keys):
+            for key in keys:
+                await index.add_async(f"key-{key}", "cfg", signature)
+
+        asyncio.run(add(range(SAVE_EVERY_CHANGES - 1)))
+        assert not path.exists()
+
+        asyncio.run(add([SAVE_EVERY_CHANGES]))
+        assert NearDuplicateIndex(path=str(path)).load() == SAVE_EVERY_CHANGES
+
+    def test_missing_file_loads_nothing(self, tmp_path):
+        assert NearDuplicateIndex(path=str(tmp_path / "none.npz")).load() == 0
@@ -4,7 +4,9 @@ import io
 from pathlib import Path
 import pytest
 from PIL import Image
-from app.ocr_service import OCRService
+from app.ocr_service import OCRService, _time_pipeline_models
+from app.pipeline_options import DEFAULT_OPTIONS, PipelineOptions
+from app.zones import Zone
 
 @pytest.fixture(scope="module")
 def ocr_service():
@@ -82,3 +84,124 @@ class TestProcessImage:
 
         with pytest.raises(Exception):
             ocr_service.process_image(invalid_bytes)
+
+
+class TestProcessImages:
+    """Tests for OCRService.process_images method."""
+
+    def test_batch_matches_single(self, ocr_service):
+        """Test that batched results match per-image results."""
+        TEST_IMAGE_PATH = Path(__file__).parent / "test_images" / "一輝.png"
+
+        if not TEST_IMAGE_PATH.exists():
+            pytest.skip(f"Test image not found: {TEST_IMAGE_PATH}")
+
+        image_bytes = TEST_IMAGE_PATH.read_bytes()
+        results = ocr_service.process_images([image_bytes, image_bytes])
+
+        assert len(results) == 2
+        assert results[0][0][1][0] == "一輝"
+        assert results[1][0][1][0] == "一輝"
+
+    def test_invalid_image_isolated(self, ocr_service):
+        """Test that an invalid image only fails its own slot."""
+        img = Image.new("L", (100, 30), color=255)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+
+        results = ocr_service.process_images([b"not a valid image", buffer.getvalue()])
+
+        assert isinstance(results[0], Exception)
+        assert isinstance(results[1], list)
+
+
+class TestProcessZones:
+    """Tests for OCRService.process_zones method."""
+
+    def test_line_zone_matches_full_page(self, ocr_service):
+        """Test that a single-line zone around detected text recognizes it."""
+        TEST_IMAGE_PATH = Path(__file__).parent / "test_images" / "一輝.png"
+
+        if not TEST_IMAGE_PATH.exists():
+            pytest.skip(f"Test image not found: {TEST_IMAGE_PATH}")
+
+        image_bytes = TEST_IMAGE_PATH.read_bytes()
+        poly, _ = ocr_service.process_image(image_bytes)[0]
+        xs, ys = [p[0] for p in poly], [p[1] for p in poly]
+        box = [min(xs) - 4, min(ys) - 4, max(xs) + 4, max(ys) + 4]
+
+        results = ocr_service.process_zones(
+            image_bytes,
+            [Zone.from_box("name", box), Zone.from_box("blank", [0, 0, 8, 8])],
+        )
+
+        assert list(results) == ["name", "blank"]
+        [[zone_poly, (text, _)]] = results["name"]
+        assert text == "一輝"
+        assert zone_poly[0] == pytest.approx(box[:2])
+        assert results["blank"] == []
+
+
+class TestPipelineOptions:
+    """Tests for per-request pipeline options."""
+
+    def test_upright_options_match_default(self, ocr_service):
+        """Test that skipping orientation stages keeps upright results."""
+        image_bytes = (Path(__file__).parent / "test_images" / "一輝.png").read_bytes()
+        options = PipelineOptions(orientation="off", unwarp="off")
+
+        [fast] = ocr_service.process_images([image_bytes], options=options)
+
+        assert [text for _, (text, _) in fast] == [
+            text for _, (text, _) in ocr_service.process_image(image_bytes)
+        ]
+
+    def test_rec_batch_size_variant_is_cached(self, ocr_service):
+        """Test that a recognition batch size gets its own reused pipeline."""
+        options = PipelineOptions(rec_batch_size=1)
+
+        variant = ocr_service.pipeline(options)
+
+        assert variant is not ocr_service.ocr
+        assert ocr_service.pipeline(options) is variant
+        assert ocr_service.pipeline(DEFAULT_OPTIONS) is ocr_service.ocr
+
+
+class FakeModel:
+    """PaddleX-style model yielding one result per input lazily."""
+
+    batch_size = 4
+
+    def __call__(self, inputs):
+        for item in inputs:
+            yield item * 2
+
+
+class TestStageTiming:
+    """Tests for timing the models inside the PaddleOCR pipeline."""
+
+    def test_pipeline_models_timed(self):
+        """Test that lazily consumed model calls are added up per stage."""
+        pipeline = type("Pipeline", (), {})()
+        pipeline.text_det_model = FakeModel()
+        pipeline.text_rec_model = FakeModel()
+        ocr = type("OCR", (), {})()
+        ocr.paddlex_pipeline = pipeline
+        timings = {}
+
+        _time_pipeline_models(ocr, timings)
+        _time_pipeline_models(ocr, timings)
+
+        assert list(pipeline.text_det_model([1, 2])) == [2, 4]
+        assert list(pipeline.text_det_model([3])) == [6]
+        assert pipeline.text_rec_model.batch_size == 4
+        assert set(timings) == {"detect"}
+        assert timings["detect"][1] > 0
+
+    def test_stages_reported(self, ocr_service):
+        """Test that detection and recognition are reported as stages."""
+        image_path = Path(__file__).parent / "test_images" / "一輝.png"
+
+        _, info = ocr_service.process_image(image_path.read_bytes(), with_info=True)
+
+        assert {"predict", "detect", "recognize"} <= set(info["stages"])
@@ -0,0 +1,70 @@
+"""Tests for the packed classification dataset."""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from app.lib.generate_training_source import generate
+from app.lib.packed_dataset import (
+    has_packed_dataset,
+    iter_batches,
+    load_packed_dataset,
+    split_indices,
+)
+
+FONTS_DIR = Path(__file__).parent.parent / "fonts"
+FONT_PATHS = [
+    str(FONTS_DIR / "MPlus1p-Regular.ttf"),
+    str(FONTS_DIR / "MPlus1p-Bold.ttf"),
+]
+
+
+def _generate(tmp_path):
+    char_file = tmp_path / "chars.txt"
+    char_file.write_text("一\n輝\n鷗\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    generate(str(output_dir), [str(char_file)], FONT_PATHS, max_workers=1, packed=True)
+    return output_dir
+
+
+def test_packed_matches_classification_images(tmp_path):
+    output_dir = _generate(tmp_path)
+    assert has_packed_dataset(str(output_dir))
+
+    dataset = load_packed_dataset(str(output_dir))
+    assert isinstance(dataset.images, np.memmap)
+    assert dataset.images.shape == (6, 30, 30, 3)
+    assert dataset.class_names == ["4E00", "8F1D", "9DD7"]
+    assert dataset.labels.tolist() == [0, 0, 1, 1, 2, 2]
+
+    # クラス内はファイル名順 (Bold, Regular)
+    expected = Image.open(output_dir / "classification/8F1D/MPlus1p-Regular.jpg")
+    assert np.array_equal(dataset.images[3], np.asarray(expected.convert("RGB")))
+
+
+def test_unpacked_regeneration_removes_stale_pack(tmp_path):
+    output_dir = _generate(tmp_path)
+
+    generate(str(output_dir), [str(tmp_path / "chars.txt")], FONT_PATHS, max_workers=1)
+
+    assert not has_packed_dataset(str(output_dir))
+
+
+def test_split_indices_is_disjoint_and_deterministic():
+    train, val = split_indices(100, 0.2, seed=1)
+    assert len(train) == 80 and len(val) == 20
+    assert sorted(np.concatenate([train, val]).tolist()) == list(range(100))
+    assert np.array_equal(split_indices(100, 0.2, seed=1)[1], val)
+
+
+def test_iter_batches_covers_indices(tmp_path):
+    dataset = load_packed_dataset(str(_generate(tmp_path)))
+    indices = np.array([5, 0, 3, 1])
+
+    batches = list(iter_batches(dataset, indices, 3, rng=np.random.default_rng(0)))
+
+    assert [len(labels) for _, labels in batches] == [3, 1]
+    seen = np.concatenate([labels for _, labels in batches])
+    assert sorted(seen.tolist()) == sorted(dataset.labels[indices].tolist())
+    assert batches[0][0].dtype == np.uint8
@@ -0,0 +1,73 @@
+"""Tests for per-request pipeline options."""
+
+import pytest
+
+from app.pipeline_options import DEFAULT_OPTIONS, PipelineOptions, filter_confidence
+
+RESULTS = [[[[0, 0]], ("一", 0.95)], [[[1, 1]], ("輝", 0.4)]]
+
+
+class TestPipelineOptions:
+    """Tests for PipelineOptions."""
+
+    def test_defaults_change_nothing(self):
+        assert DEFAULT_OPTIONS.is_default
+        assert DEFAULT_OPTIONS.predict_kwargs() == {}
+        assert DEFAULT_OPTIONS.changed() == {}
+
+    def test_predict_kwargs(self):
+        options = PipelineOptions(
+            orientation="off",
+            unwarp="off",
+            det_limit_side_len=960,
+            det_limit_type="max",
+        )
+
+        assert options.predict_kwargs() == {
+            "use_doc_orientation_classify": False,
+            "use_textline_orientation": False,
+            "use_doc_unwarping": False,
+            "text_det_limit_side_len": 960,
+            "text_det_limit_type": "max",
+        }
+
+    def test_changed_lists_non_defaults(self):
+        options = PipelineOptions(orientation="off", rec_batch_size=16)
+
+        assert not options.is_default
+        assert options.changed() == {"orientation": "off", "rec_batch_size": 16}
+        # Batch size is a pipeline variant, not a predict() argument
+        assert "rec_batch_size" not in options.predict_kwargs()
+
+    def test_hashable_for_batch_grouping(self):
+        assert PipelineOptions(unwarp="off") == PipelineOptions(unwarp="off")
+        assert len({DEFAULT_OPTIONS, PipelineOptions(), PipelineOptions("off")}) == 2
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"orientation": "on"},
+            {"unwarp": "yes"},
+            {"det_limit_type": "mean"},
+            {"det_limit_side_len": 0},
+            {"rec_batch_size": 0},
+        ],
+    )
+    def test_invalid_values(self, kwargs):
+        with pytest.raises(ValueError):
+            PipelineOptions(**kwargs)
+
+
+class TestFilterConfidence:
+    """Tests for filter_confidence."""
+
+    def test_drops_low_scores(self):
+        assert filter_confidence(RESULTS, 0.5) == RESULTS[:1]
+
+    def test_zero_keeps_everything(self):
+        assert filter_confidence(RESULTS, 0.0) is RESULTS
+
+    def test_zone_results(self):
+        filtered = filter_confidence({"name": RESULTS, "date": []}, 0.5)
+
+        assert filtered == {"name": RESULTS[:1], "date": []}
@@ -0,0 +1,80 @@
+"""Tests for image preprocessing."""
+
+import io
+
+import pytest
+from PIL import Image, UnidentifiedImageError
+
+from app.preprocess import ImageTooLargeError, decode_image
+
+
+def _encode(image: Image.Image, format: str, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **kwargs)
+    return buffer.getvalue()
+
+
+class TestDecodeImage:
+    """Tests for decode_image."""
+
+    def test_full_resolution(self):
+        image_bytes = _encode(Image.new("RGBA", (120, 40)), "PNG")
+
+        image_array, info = decode_image(image_bytes)
+
+        assert image_array.shape == (40, 120, 3)
+        assert image_array.flags["C_CONTIGUOUS"]
+        assert info.memory_saved_bytes == 0
+        assert info.scale_x == info.scale_y == 1
+
+    def test_downscale_jpeg_with_draft(self):
+        image_bytes = _encode(Image.new("RGB", (4000, 3000), "white"), "JPEG")
+
+        image_array, info = decode_image(image_bytes, max_side=1000)
+
+        assert image_array.shape == (750, 1000, 3)
+        assert info.draft_decode is True
+        assert info.scale_x == pytest.approx(4)
+        assert info.scale_y == pytest.approx(4)
+        assert info.memory_saved_bytes == (4000 * 3000 - 1000 * 750) * 3
+
+    def test_exif_orientation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated 90 degrees clockwise
+        image_bytes = _encode(Image.new("RGB", (200, 100)), "JPEG", exif=exif)
+
+        image_array, info = decode_image(image_bytes)
+
+        assert image_array.shape == (200, 100, 3)
+        assert (info.original_width, info.original_height) == (100, 200)
+
+    def test_invalid_image(self):
+        with pytest.raises(UnidentifiedImageError):
+            decode_image(b"not a valid image")
+
+    def test_decode_from_file_object(self):
+        image_bytes = _encode(Image.new("RGB", (120, 40), "white"), "PNG")
+        upload = io.BytesIO(image_bytes)
+        upload.seek(10)
+
+        image_array, info = decode_image(upload)
+
+        assert image_array.shape == (40, 120, 3)
+        # Decoded buffer (RGB, 4 bytes per pixel) plus the array
+        assert info.peak_memory_bytes == 120 * 40 * 4 + 120 * 40 * 3
+
+    def test_peak_memory_counts_encoded_bytes(self):
+        image_bytes = _encode(Image.new("L", (100, 50)), "PNG")
+
+        _, info = decode_image(image_bytes)
+
+        assert info.peak_memory_bytes == (
+            len(image_bytes) + 100 * 50 + 100 * 50 * 4 + 100 * 50 * 3
+        )
+
+    def test_pixel_limit_checked_before_decoding(self):
+        image_bytes = _encode(Image.new("RGB", (200, 100)), "PNG")
+
+        with pytest.raises(ImageTooLargeError, match="200x100"):
+            decode_image(image_bytes, max_pixels=10_000)
+        decode_image(image_bytes, max_pixels=20_000)
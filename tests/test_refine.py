@@ -0,0 +1,107 @@
+import numpy as np
+from PIL import Image
+
+from app.refine import refine_texts, split_characters
+
+
+class FakeClassifier:
+    """Returns a fixed character per crop, in call order."""
+
+    def __init__(self, predictions, chars="鷗鴎森一二三四亜"):
+        self.predictions = list(predictions)
+        self.char_set = frozenset(chars)
+        self.calls = []
+
+    def classify(self, images, top_k=1):
+        self.calls.append(len(images))
+        return [[self.predictions.pop(0)] for _ in images]
+
+
+def _image():
+    return np.full((40, 100, 3), 255, dtype=np.uint8)
+
+
+def _poly(x0, y0, x1, y1):
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+
+def test_replaces_confident_disagreements_in_low_score_regions():
+    classifier = FakeClassifier([("鷗", 0.95), ("外", 0.5)])
+
+    result = refine_texts(
+        _image(),
+        ["森鴎", "本文"],
+        [0.4, 0.99],
+        [_poly(0, 0, 60, 30), _poly(0, 0, 60, 30)],
+        classifier,
+        threshold=0.8,
+    )
+
+    assert result.texts == ["鷗鴎", "本文"]
+    assert result.crops == 2
+    assert result.replaced == 1
+    assert classifier.calls == [2]
+
+
+def test_skips_half_width_text_and_respects_crop_budget():
+    classifier = FakeClassifier([("亜", 0.99)] * 3)
+
+    result = refine_texts(
+        _image(),
+        ["abc", "一二三", "四"],
+        [0.1, 0.3, 0.2],
+        [_poly(0, 0, 30, 10)] * 3,
+        classifier,
+        threshold=0.5,
+        max_crops=2,
+    )
+
+    # Lowest score first: "abc" is skipped, "四" fits, "一二三" exceeds the budget
+    assert result.texts == ["abc", "一二三", "亜"]
+    assert result.crops == 1
+
+
+def test_only_known_characters_replaced_above_recognizer_score():
+    classifier = FakeClassifier([("鷗", 0.95), ("亜", 0.92)], chars="鴎鷗亜一")
+
+    result = refine_texts(
+        _image(),
+        ["の鴎。", "一"],
+        [0.4, 0.93],
+        [_poly(0, 0, 90, 30), _poly(0, 0, 30, 30)],
+        classifier,
+        threshold=0.95,
+    )
+
+    # Kana and punctuation are not in the label set and never classified;
+    # "亜" scores above min_confidence but below the recognizer's 0.93
+    assert classifier.calls == [2]
+    assert result.texts == ["の鷗。", "一"]
+    assert result.replaced == 1
+
+
+def test_no_low_confidence_regions_skips_classifier():
+    classifier = FakeClassifier([])
+
+    result = refine_texts(
+        _image(), ["一"], [0.99], [_poly(0, 0, 10, 10)], classifier, threshold=0.5
+    )
+
+    assert result.texts == ["一"]
+    assert result.crops == 0
+    assert classifier.calls == []
+
+
+def test_split_characters_horizontal_and_vertical():
+    image = _image()
+    image[:, 50:] = 0
+
+    cells = split_characters(image, _poly(0, 0, 100, 20), 2)
+    assert [np.asarray(cell).min() for cell in cells] == [255, 0]
+    # Equal cells with a white margin on each side
+    assert cells[0].size == cells[1].size
+    assert cells[0].size[0] > 50
+
+    vertical = split_characters(image, _poly(0, 0, 20, 40), 4)
+    assert len(vertical) == 4
+    assert all(isinstance(cell, Image.Image) for cell in vertical)
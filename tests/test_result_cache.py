@@ -0,0 +1,98 @@
+"""Tests for ResultCache."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from app.result_cache import ResultCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """Tests for make_cache_key."""
+
+    def test_same_input_same_key(self):
+        assert make_cache_key(b"img", {"lang": "japan"}) == make_cache_key(
+            b"img", {"lang": "japan"}
+        )
+
+    def test_config_changes_key(self):
+        assert make_cache_key(b"img", {"lang": "japan"}) != make_cache_key(
+            b"img", {"lang": "en"}
+        )
+
+    def test_file_object_hashed_from_start(self):
+        with tempfile.SpooledTemporaryFile(max_size=4) as upload:
+            upload.write(b"image data")
+
+            assert make_cache_key(upload, {}) == make_cache_key(b"image data", {})
+
+
+class TestResultCache:
+    """Tests for ResultCache tiers and eviction."""
+
+    def test_hit_and_miss_counters(self):
+        cache = ResultCache()
+
+        assert cache.get("a") is None
+        cache.set("a", [[[0, 0]], ["一", 0.9]])
+
+        assert cache.get("a") == [[[0, 0]], ["一", 0.9]]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        ResultCache(disk_dir=str(tmp_path)).set("abcd", ["一輝"])
+
+        cache = ResultCache(disk_dir=str(tmp_path))
+
+        assert cache.get("abcd") == ["一輝"]
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_async_disk_tier(self, tmp_path):
+        async def scenario():
+            await ResultCache(disk_dir=str(tmp_path)).set_async("abcd", ["一輝"])
+            return await ResultCache(disk_dir=str(tmp_path)).get_async("abcd")
+
+        assert asyncio.run(scenario()) == ["一輝"]
+
+    def test_sweep_removes_expired_and_oldest(self, tmp_path):
+        cache = ResultCache(disk_dir=str(tmp_path), disk_max_entries=0)
+        for i, key in enumerate(["aa01", "aa02", "aa03"]):
+            cache.set(key, i)
+            path = tmp_path / "aa" / f"{key}.json"
+            os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))
+        expired = tmp_path / "bb" / "bb01.json"
+        cache.set("bb01", 9)
+        os.utime(expired, (time.time() - 7200, time.time() - 7200))
+
+        cache.disk_max_entries = 2
+        assert cache.sweep() == 2
+        assert not expired.exists()
+        assert not (tmp_path / "aa" / "aa01.json").exists()
+        assert cache.stats()["disk_entries"] == 2
+
+    def test_writes_over_limit_trigger_sweep(self, tmp_path):
+        cache = ResultCache(disk_dir=str(tmp_path), disk_max_entries=2)
+        for key in ["aa01", "aa02", "aa03", "aa04"]:
+            cache.set(key, key)
+
+        assert len(list(tmp_path.glob("*/*.json"))) <= 3
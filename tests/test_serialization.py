@@ -0,0 +1,100 @@
+"""Tests for response encoding and format negotiation."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app import serialization
+from app.models import OCRResponse
+from app.serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    columnar_payload,
+    encode,
+    negotiate_media_type,
+    ocr_payload,
+    zone_payload,
+)
+
+RESULTS = [
+    [[[10.4, 20.0], [50.0, 20.0], [50.0, 40.6], [10.0, 40.0]], ("一輝", 0.98)],
+    None,
+    [[[0.0, 50.0], [30.0, 50.0], [30.0, 70.0], [0.0, 70.0]], ("山田", 0.75)],
+]
+
+
+class TestNegotiation:
+    """Tests for negotiate_media_type."""
+
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (None, JSON_MEDIA_TYPE),
+            ("*/*", JSON_MEDIA_TYPE),
+            ("text/html", JSON_MEDIA_TYPE),
+            (COLUMNAR_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE),
+            (f"application/json;q=0.5, {COLUMNAR_MEDIA_TYPE}", COLUMNAR_MEDIA_TYPE),
+            (f"{COLUMNAR_MEDIA_TYPE};q=0.2, application/json", JSON_MEDIA_TYPE),
+        ],
+    )
+    def test_media_type(self, accept, expected):
+        assert negotiate_media_type(accept) == expected
+
+    def test_msgpack_needs_the_package(self, monkeypatch):
+        monkeypatch.setattr(serialization, "msgpack", None)
+
+        assert negotiate_media_type(MSGPACK_MEDIA_TYPE) == JSON_MEDIA_TYPE
+
+
+class TestPayloads:
+    """Tests for the response bodies."""
+
+    def test_json_matches_response_model(self):
+        payload = json.loads(encode(ocr_payload(RESULTS)))
+
+        assert OCRResponse.model_validate(payload).model_dump() == payload
+        assert payload["full_text"] == "一輝\n山田"
+
+    def test_zone_payload_matches_response_model(self):
+        payload = json.loads(encode(zone_payload({"name": RESULTS, "empty": []})))
+
+        assert OCRResponse.model_validate(payload).model_dump() == payload
+        assert payload["zones"]["name"]["confidence"] == 0.75
+        assert payload["message"] == "Recognized 1/2 zones"
+
+    def test_json_encoder_without_orjson(self, monkeypatch):
+        payload = columnar_payload(RESULTS)
+        expected = json.loads(encode(payload))
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        assert json.loads(encode(payload)) == expected
+
+    def test_columnar(self):
+        payload = json.loads(encode(columnar_payload(RESULTS)))
+
+        assert payload["count"] == 2
+        assert payload["texts"] == ["一輝", "山田"]
+        assert payload["scores"] == [0.98, 0.75]
+        assert payload["point_counts"] == [4, 4]
+        assert payload["coordinate_dtype"] == "int16"
+        assert payload["polygons"][:8] == [10, 20, 50, 20, 50, 41, 10, 40]
+
+    def test_columnar_zones(self):
+        payload = columnar_payload({"a": RESULTS[:1], "b": RESULTS[1:]})
+
+        assert payload["zones"] == ["a", "b"]
+
+    def test_binary_columns(self):
+        payload = columnar_payload(RESULTS, binary=True)
+
+        scores = np.frombuffer(payload["scores"], dtype="<f4")
+        polygons = np.frombuffer(payload["polygons"], dtype="<i2").reshape(-1, 4, 2)
+        assert scores == pytest.approx([0.98, 0.75])
+        assert polygons[1].tolist() == [[0, 50], [30, 50], [30, 70], [0, 70]]
+
+    def test_large_coordinates_use_int32(self):
+        results = [[[[0.0, 0.0], [40000.0, 0.0]], ("x", 1.0)]]
+
+        assert columnar_payload(results)["coordinate_dtype"] == "int32"
@@ -0,0 +1,22 @@
+"""Tests for stream event encoding."""
+
+import json
+
+from app.models import StreamDoneEvent
+from app.streaming import encode_event
+
+
+def test_encode_ndjson():
+    encoded = encode_event(StreamDoneEvent(total=2, succeeded=1), "ndjson")
+
+    assert encoded.endswith(b"\n")
+    assert json.loads(encoded) == {"event": "done", "total": 2, "succeeded": 1}
+
+
+def test_encode_sse():
+    encoded = encode_event(StreamDoneEvent(total=2, succeeded=1), "sse").decode()
+
+    event_line, data_line, *_ = encoded.split("\n")
+    assert event_line == "event: done"
+    assert json.loads(data_line.removeprefix("data: "))["total"] == 2
+    assert encoded.endswith("\n\n")
@@ -0,0 +1,102 @@
+"""Tests for region-of-interest zones and form templates."""
+
+import numpy as np
+import pytest
+
+from app.models import FormTemplate
+from app.zones import TemplateStore, Zone, crop_zone
+
+
+def _page():
+    image = np.full((100, 200, 3), 255, dtype=np.uint8)
+    image[20:40, 30:90] = 0
+    return image
+
+
+class TestCropZone:
+    """Tests for crop_zone."""
+
+    def test_box_crop_and_offset(self):
+        crop = crop_zone(_page(), Zone.from_box("a", [25, 15, 95, 45]))
+
+        assert crop.offset == (25, 15)
+        assert crop.image.shape == (30, 70, 3)
+        assert not crop.rotated
+        assert crop.image[10, 10].tolist() == [0, 0, 0]
+
+    def test_polygon_outside_is_white(self):
+        zone = Zone("tri", [(30, 20), (90, 20), (30, 40)])
+
+        crop = crop_zone(_page(), zone)
+
+        assert crop.image[1, 1].tolist() == [0, 0, 0]
+        assert crop.image[-1, -1].tolist() == [255, 255, 255]
+
+    def test_vertical_line_is_rotated(self):
+        crop = crop_zone(_page(), Zone.from_box("v", [0, 0, 10, 60]))
+
+        assert crop.rotated
+        assert crop.image.shape == (10, 60, 3)
+
+    def test_multiline_zone_is_not_rotated(self):
+        crop = crop_zone(_page(), Zone.from_box("v", [0, 0, 10, 60], multiline=True))
+
+        assert not crop.rotated
+
+    def test_zone_outside_image(self):
+        assert crop_zone(_page(), Zone.from_box("out", [300, 0, 400, 50])) is None
+
+    def test_relative_zone_scaling(self):
+        zone = Zone.from_box("a", [0.1, 0.2, 0.5, 0.6]).scaled(200, 100)
+
+        assert zone.points[0] == pytest.approx((20, 20))
+        assert zone.points[2] == pytest.approx((100, 60))
+
+
+class TestFormTemplate:
+    """Tests for zone validation."""
+
+    def test_box_or_polygon_required(self):
+        with pytest.raises(ValueError):
+            FormTemplate.model_validate({"zones": [{"name": "a"}]})
+
+    def test_invalid_box(self):
+        with pytest.raises(ValueError):
+            FormTemplate.model_validate({"zones": [{"name": "a", "box": [5, 5, 1, 1]}]})
+
+    def test_duplicate_names(self):
+        box = [0, 0, 10, 10]
+        with pytest.raises(ValueError):
+            FormTemplate.model_validate(
+                {"zones": [{"name": "a", "box": box}, {"name": "a", "box": box}]}
+            )
+
+    def test_to_zone(self):
+        template = FormTemplate.model_validate(
+            {"zones": [{"name": "a", "polygon": [[0, 0], [4, 0], [2, 3]]}]}
+        )
+
+        assert template.zones[0].to_zone() == Zone("a", [(0, 0), (4, 0), (2, 3)])
+
+
+class TestTemplateStore:
+    """Tests for TemplateStore."""
+
+    def test_save_get_delete(self, tmp_path):
+        store = TemplateStore(str(tmp_path / "templates"))
+        template = {"zones": [{"name": "a", "box": [0, 0, 10, 10]}]}
+
+        assert store.names() == []
+        store.save("invoice", template)
+
+        assert store.names() == ["invoice"]
+        assert store.get("invoice") == template
+        assert store.delete("invoice")
+        assert store.get("invoice") is None
+        assert not store.delete("invoice")
+
+    def test_rejects_path_names(self, tmp_path):
+        store = TemplateStore(str(tmp_path))
+
+        with pytest.raises(ValueError):
+            store.get("../secret")